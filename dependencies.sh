@@ -18,5 +18,4 @@ sudo apt-get install python-sklearn
 sudo apt-get install pip
 sudo pip3-install pyyaml
 sudo pip3 install Pillow
-sudo pip3 install networkx
-sudo pip3 install sharedmem
\ No newline at end of file
+sudo pip3 install networkx
\ No newline at end of file
@@ -26,20 +26,28 @@ even if advised of the possibility of such damage.
 """
 
 import sys
+import copy
 import numpy
 import os
 import inspect
 import json
+import time
+import multiprocessing
 
 import models.args as args
 import models.helper as helper
 import models.helperigraph as helperigraph
 
-from models.timing import Timing
-from models.similarity import Similarity
+import models.parallel as parallel
+import models.checkpoint as checkpoint
+import models.workers as workers
+import models.viewer as viewer
 
-import sharedmem
-from multiprocessing import Process
+from models.timing import Timing
+from models.similarity import SimilarityMatrix
+from models.bigraph import BGraph
+from models.twohop import TwoHopIndex
+from models.workers import WorkerPool, LocalPool, COUNTERS
 
 __maintainer__ = 'Alan Valejo'
 __author__ = 'Alan Valejo'
@@ -51,13 +59,21 @@ __docformat__ = 'markdown en'
 __version__ = '0.1'
 __date__ = '2018-10-05'
 
+TIMING_HEADER = ['Snippet', 'Time [m]', 'Time [s]']
+# Options of a sweep shared by all configurations, which cannot be changed
+SWEEP_SHARED = ['input', 'vertices', 'chunk_size', 'combine', 'binary_cache', 'conf', 'sweep', 'resume']
+# Matching methods split over the workers, run by the master with -w > 1
+PARALLEL_MATCHING = ['nmlp', 'rgmb', 'ldhem', 'ldlem', 'ldrm']
+# Similarity measures of vertex attributes, not kept by the compact graph
+COMPACT_UNSUPPORTED = ['lastfm_age']
+
 def main():
 	"""
 	Main entry point for the application when run from the command line.
 	"""
 
 	# Timing instanciation
-	timing = Timing(['Snippet', 'Time [m]', 'Time [s]'])
+	timing = Timing(TIMING_HEADER, [])
 
 	with timing.timeit_context_add('Pre-processing'):
 
@@ -66,118 +82,307 @@ def main():
 		parser = args.setup_parser(current_path + '/args/coarsening.json')
 		options = parser.parse_args()
 		args.update_json(options)
-		args.check_output(options)
 
 		# Log instanciation
 		log = helper.initialize_logger(dir='log', output='log')
 
-		if options.input and options.vertices is None:
-			log.warning('Vertices are required when input is given.')
-			sys.exit(1)
+		if options.sweep:
+			runs = configurations(options, log)
+		else:
+			args.check_output(options)
+			validate(options, log)
 
-		# Create default values for optional parameters
-		if options.reduction_factor is None:
-			options.reduction_factor = [0.5] * len(options.vertices)
-		if options.max_levels is None:
-			options.max_levels = [3] * len(options.vertices)
-		if options.matching is None:
-			options.matching = ['rgmb'] * len(options.vertices)
-		if options.similarity is None:
-			options.similarity = ['weighted_common_neighbors'] * len(options.vertices)
-		if options.itr is None:
-			options.itr = [10] * len(options.vertices)
-		if options.upper_bound is None:
-			options.upper_bound = [2.0] * len(options.vertices)
-		if options.global_min_vertices is None:
-			options.global_min_vertices = [None] * len(options.vertices)
-		if options.tolerance is None:
-			options.tolerance = [None] * len(options.vertices)
-
-		# Validation of list values
-		if len(options.reduction_factor) == 1:
-			options.reduction_factor = [options.reduction_factor[0]] * len(options.vertices)
-		if len(options.max_levels) == 1:
-			options.max_levels = [options.max_levels[0]] * len(options.vertices)
-		if len(options.matching) == 1:
-			options.matching = [options.matching[0]] * len(options.vertices)
-		if len(options.similarity) == 1:
-			options.similarity = [options.similarity[0]] * len(options.vertices)
-		if len(options.itr) == 1:
-			options.itr = [options.itr[0]] * len(options.vertices)
-		if len(options.upper_bound) == 1:
-			options.upper_bound = [options.upper_bound[0]] * len(options.vertices)
-		if len(options.global_min_vertices) == 1:
-			options.global_min_vertices = [options.global_min_vertices[0]] * len(options.vertices)
-		if len(options.tolerance) == 1:
-			options.tolerance = [options.tolerance[0]] * len(options.vertices)
-
-		# Verification of the dimension of the parameters
-		if len(options.vertices) != len(options.reduction_factor):
-			log.warning('Sizes of input arguments -v and -r do not match.')
-			sys.exit(1)
-		if len(options.vertices) != len(options.max_levels):
-			log.warning('Sizes of input arguments -v and -m do not match.')
-			sys.exit(1)
-		if len(options.vertices) != len(options.matching):
-			log.warning('Sizes of input arguments -v and -c do not match.')
-			sys.exit(1)
-		if len(options.vertices) != len(options.similarity):
-			log.warning('Sizes of input arguments -v and -s do not match.')
-			sys.exit(1)
-		if len(options.vertices) != len(options.itr):
-			log.warning('Size of input arguments -v and -imlp do not match.')
-			sys.exit(1)
-		if len(options.vertices) != len(options.upper_bound):
-			log.warning('Size of input arguments -v and -ub do not match.')
-			sys.exit(1)
-		if len(options.vertices) != len(options.global_min_vertices):
-			log.warning('Size of input arguments -v and -gmv do not match.')
+	if options.sweep:
+		sweep(options, runs, timing, log)
+	else:
+		coarsen(options, timing)
+
+def validate(options, log):
+	"""
+	Fill the default values of the options and validate them, exiting on
+	invalid ones.
+	"""
+
+	if options.input and options.vertices is None:
+		log.warning('Vertices are required when input is given.')
+		sys.exit(1)
+
+	# Create default values for optional parameters
+	if options.reduction_factor is None:
+		options.reduction_factor = [0.5] * len(options.vertices)
+	if options.max_levels is None:
+		options.max_levels = [3] * len(options.vertices)
+	if options.matching is None:
+		options.matching = ['rgmb'] * len(options.vertices)
+	if options.similarity is None:
+		options.similarity = ['weighted_common_neighbors'] * len(options.vertices)
+	if options.itr is None:
+		options.itr = [10] * len(options.vertices)
+	if options.upper_bound is None:
+		options.upper_bound = [2.0] * len(options.vertices)
+	if options.global_min_vertices is None:
+		options.global_min_vertices = [None] * len(options.vertices)
+	if options.tolerance is None:
+		options.tolerance = [0.05] * len(options.vertices)
+
+	# Validation of list values
+	if len(options.reduction_factor) == 1:
+		options.reduction_factor = [options.reduction_factor[0]] * len(options.vertices)
+	if len(options.max_levels) == 1:
+		options.max_levels = [options.max_levels[0]] * len(options.vertices)
+	if len(options.matching) == 1:
+		options.matching = [options.matching[0]] * len(options.vertices)
+	if len(options.similarity) == 1:
+		options.similarity = [options.similarity[0]] * len(options.vertices)
+	if len(options.itr) == 1:
+		options.itr = [options.itr[0]] * len(options.vertices)
+	if len(options.upper_bound) == 1:
+		options.upper_bound = [options.upper_bound[0]] * len(options.vertices)
+	if len(options.global_min_vertices) == 1:
+		options.global_min_vertices = [options.global_min_vertices[0]] * len(options.vertices)
+	if len(options.tolerance) == 1:
+		options.tolerance = [options.tolerance[0]] * len(options.vertices)
+
+	# Verification of the dimension of the parameters
+	if len(options.vertices) != len(options.reduction_factor):
+		log.warning('Sizes of input arguments -v and -r do not match.')
+		sys.exit(1)
+	if len(options.vertices) != len(options.max_levels):
+		log.warning('Sizes of input arguments -v and -m do not match.')
+		sys.exit(1)
+	if len(options.vertices) != len(options.matching):
+		log.warning('Sizes of input arguments -v and -c do not match.')
+		sys.exit(1)
+	if len(options.vertices) != len(options.similarity):
+		log.warning('Sizes of input arguments -v and -s do not match.')
+		sys.exit(1)
+	if len(options.vertices) != len(options.itr):
+		log.warning('Size of input arguments -v and -imlp do not match.')
+		sys.exit(1)
+	if len(options.vertices) != len(options.upper_bound):
+		log.warning('Size of input arguments -v and -ub do not match.')
+		sys.exit(1)
+	if len(options.vertices) != len(options.global_min_vertices):
+		log.warning('Size of input arguments -v and -gmv do not match.')
+		sys.exit(1)
+	if len(options.vertices) != len(options.tolerance):
+		log.warning('Size of input arguments -v and -gmv do not match.')
+		sys.exit(1)
+
+	# Validation of matching method
+	valid_matching = ['rgmb', 'gmb', 'nmlp', 'mlp', 'hem', 'lem', 'ldhem', 'ldlem', 'rm', 'ldrm']
+	for index, matching in enumerate(options.matching):
+		matching = matching.lower()
+		if matching not in valid_matching:
+			log.warning('Matching method is unvalid.')
 			sys.exit(1)
-		if len(options.vertices) != len(options.tolerance):
-			log.warning('Size of input arguments -v and -gmv do not match.')
+		options.matching[index] = matching
+
+	# Validation of similarity measure
+	valid_similarity = ['max_weight', 'weight', 'common_neighbors', 'weighted_common_neighbors',
+	'salton', 'preferential_attachment', 'jaccard', 'adamic_adar',
+	'resource_allocation', 'sorensen', 'hub_promoted', 'hub_depressed',
+	'leicht_holme_newman', 'lastfm_age']
+	for index, similarity in enumerate(options.similarity):
+		similarity = similarity.lower()
+		if similarity not in valid_similarity:
+			log.warning('Similarity measure is unvalid.')
 			sys.exit(1)
-
-		# Validation of matching method
-		valid_matching = ['rgmb', 'gmb', 'nmlp', 'mlp', 'hem', 'lem', 'rm']
-		for index, matching in enumerate(options.matching):
-			matching = matching.lower()
-			if matching not in valid_matching:
-				log.warning('Matching method is unvalid.')
+		options.similarity[index] = similarity
+
+	if options.compact:
+		for layer, similarity in enumerate(options.similarity):
+			if similarity in COMPACT_UNSUPPORTED:
+				text = 'Similarity measure ' + similarity
+				text += ' (setted in layer '
+				text += str(layer) + ') uses vertex attributes, which the compact graph does not keep.'
+				log.warning(text)
 				sys.exit(1)
-			options.matching[index] = matching
-
-		# Validation of similarity measure
-		valid_similarity = ['max_weight', 'weight', 'common_neighbors', 'weighted_common_neighbors',
-		'salton', 'preferential_attachment', 'jaccard', 'adamic_adar',
-		'resource_allocation', 'sorensen', 'hub_promoted', 'hub_depressed',
-		'leicht_holme_newman', 'lastfm_age']
-		for index, similarity in enumerate(options.similarity):
-			similarity = similarity.lower()
-			if similarity not in valid_similarity:
-				log.warning('Similarity measure is unvalid.')
+
+	if options.resume and options.checkpoint is None:
+		log.warning('Checkpoint directory is required to resume.')
+		sys.exit(1)
+
+	# Compact graphs use batch similarities unless pairwise ones are asked
+	if options.batch_similarity is None:
+		options.batch_similarity = options.compact
+	elif options.batch_similarity:
+		for layer, similarity in enumerate(options.similarity):
+			if not SimilarityMatrix.supports(similarity):
+				text = 'Similarity measure ' + similarity
+				text += ' (setted in layer '
+				text += str(layer) + ') has no batch version, using pairwise.'
+				log.warning(text)
+
+	for layer in range(len(options.vertices)):
+		if options.matching[layer] in ['rgmb', 'gmb', 'hem', 'lem', 'ldhem', 'ldlem', 'rm', 'ldrm']:
+			if options.global_min_vertices[layer] is not None:
+				options.global_min_vertices[layer] = None
+				text = 'Matching method ' + options.matching[layer]
+				text += ' (setted in layer '
+				text += str(layer) + ') does not accept -gmv parameter.'
+				log.warning(text)
+			if options.reduction_factor[layer] > 0.5:
+				options.reduction_factor[layer] = 0.5
+				text = 'Matching method ' + options.matching[layer]
+				text += ' (setted in layer '
+				text += str(layer) + ') does not accept -rf > 0.5.'
+				log.warning(text)
+
+def load(options):
+	"""
+	Load the input graph, as a BGraph if compact. Return it with its number
+	of edges.
+	"""
+
+	if options.compact:
+		graph = BGraph(helperigraph.read_ncol(options.input, options.vertices, options.chunk_size, options.combine, options.binary_cache))
+	else:
+		graph = helperigraph.load(options.input, options.vertices, options.chunk_size, options.combine, options.binary_cache)
+	graph['level'] = [0] * graph['layers']
+
+	return graph, graph.ecount()
+
+def configurations(options, log):
+	"""
+	Options of each configuration of a sweep file, a list of dictionaries
+	of options as in a -cnf file, applied over the command line options.
+	Each configuration writes to its own subdirectory, named by its 'name'
+	key or its position.
+	"""
+
+	if options.resume:
+		log.warning('A sweep cannot be resumed, resume each configuration instead.')
+		sys.exit(1)
+
+	with open(options.sweep) as f:
+		sweep = json.load(f)
+	directory = options.directory
+	if directory is None:
+		directory = os.path.dirname(os.path.abspath(options.input))
+
+	runs = []
+	for index, configuration in enumerate(sweep):
+		configuration = dict(configuration)
+		name = str(configuration.pop('name', index))
+		for key in SWEEP_SHARED:
+			if key in configuration:
+				log.warning('Option ' + key + ' (setted in configuration ' + name + ') is shared by the whole sweep.')
 				sys.exit(1)
-			options.similarity[index] = similarity
-
-		for layer in range(len(options.vertices)):
-			if options.matching[layer] in ['rgmb', 'gmb', 'hem', 'lem', 'rm']:
-				if options.global_min_vertices[layer] is not None:
-					options.global_min_vertices[layer] = None
-					text = 'Matching method ' + options.matching[layer]
-					text += ' (setted in layer '
-					text += str(layer) + ') does not accept -gmv parameter.'
-					log.warning(text)
-				if options.reduction_factor[layer] > 0.5:
-					options.reduction_factor[layer] = 0.5
-					text = 'Matching method ' + options.matching[layer]
-					text += ' (setted in layer '
-					text += str(layer) + ') does not accept -rf > 0.5.'
-					log.warning(text)
+		run = copy.deepcopy(options)
+		vars(run).update(configuration)
+		run.directory = os.path.join(directory, name)
+		if run.checkpoint:
+			run.checkpoint = os.path.join(run.checkpoint, name)
+		args.check_output(run)
+		validate(run, log)
+		runs.append(run)
+
+	return runs
+
+def sweep(options, runs, timing, log):
+	"""
+	Run the configurations of a sweep on the same input. The graph is loaded
+	once and the structures of its first level, i.e., two-hopes indices and
+	batch similarities, are built once, see workers.share. The
+	configurations then run in forked processes, sweep_processes at a time,
+	a new one starting as soon as any finishes. Exit on failed ones, after
+	all have finished.
+	"""
+
+	with timing.timeit_context_add('Load'):
+		shared = copy.copy(options)
+		shared.compact = all(run.compact for run in runs)
+		graph, source_ecount = load(shared)
+		graphs = {shared.compact: graph}
+		if True not in graphs and any(run.compact for run in runs):
+			graphs[True] = BGraph.from_mgraph(graph)
+
+	with timing.timeit_context_add('Similarity'):
+		for run in runs:
+			measures = run.similarity if run.batch_similarity else []
+			workers.share(graphs[run.compact], run.compact, (run.twohop_topk, run.hub_degree, run.hub_policy), measures)
+
+	with timing.timeit_context_add('Sweep'):
+		# Runs are not daemonic, so they can fork their own workers
+		processes = options.sweep_processes or multiprocessing.cpu_count()
+		pending = list(runs)
+		running = []
+		failed = []
+		while pending or running:
+			for process, run in list(running):
+				if not process.is_alive():
+					process.join()
+					running.remove((process, run))
+					if process.exitcode != 0:
+						failed.append(os.path.basename(os.path.normpath(run.directory)))
+			while pending and len(running) < processes:
+				run = pending.pop(0)
+				process = multiprocessing.Process(target=coarsen, args=(run, Timing(TIMING_HEADER, []), graphs[run.compact], source_ecount))
+				process.start()
+				running.append((process, run))
+			if running:
+				time.sleep(0.05)
+
+	if options.show_timing:
+		timing.print_tabular()
+	if failed:
+		log.warning('Configurations ' + ', '.join(failed) + ' of the sweep failed.')
+		sys.exit(1)
+
+def coarsen(options, timing, graph=None, source_ecount=None):
+	"""
+	Coarsen a graph, see hierarchy, and save its hierarchy.
+	"""
+
+	hierarchy_levels, hierarchy_graphs, source_ecount, counters = hierarchy(options, timing, graph, source_ecount)
+
+	# Save
+	with timing.timeit_context_add('Save'):
+		save(options, hierarchy_levels, hierarchy_graphs, source_ecount)
+
+	for counter in COUNTERS:
+		values = [task_counters[counter] for task_counters in counters if counter in task_counters]
+		if values:
+			timing.add_counter(counter, sum(values))
+
+	if options.show_timing:
+		timing.print_tabular()
+	if options.save_timing_csv:
+		timing.save_csv(options.output + '-timing.csv')
+	if options.save_timing_json:
+		timing.save_json(options.output + '-timing.json')
+
+def hierarchy(options, timing, graph=None, source_ecount=None):
+	"""
+	Coarsen a graph. The input graph is loaded, after forking the workers,
+	unless it is given or the run is resumed. The given graph is not
+	changed, except for the successor of its vertices. Return the levels and
+	the graphs of the hierarchy, all coarse levels if save_hierarchy, else
+	the last one, the number of edges of the input and the counters of the
+	matching tasks.
+	"""
 
 	# Load bipartite graph
 	with timing.timeit_context_add('Load'):
-		graph = helperigraph.load(options.input, options.vertices)
-		graph['level'] = [0] * graph['layers']
-		source_ecount = graph.ecount()
+		# Workers are forked before loading, so they do not inherit the graph
+		if options.workers > 1:
+			pool = WorkerPool(max(options.workers, len(options.vertices)), options.compact, options.twohop_topk, options.hub_degree, options.hub_policy)
+			parallel.executor = pool
+		else:
+			pool = LocalPool(options.compact, options.twohop_topk, options.hub_degree, options.hub_policy)
+		graphs, levels = [], []
+		if options.resume:
+			graphs, levels, source_ecount = checkpoint.load(options.checkpoint, options.compact, options.save_hierarchy)
+		elif options.checkpoint:
+			checkpoint.clear(options.checkpoint)
+		depth = len(checkpoint.indices(options.checkpoint)) if options.checkpoint else 0
+		hierarchy_graphs = graphs if options.save_hierarchy else []
+		hierarchy_levels = levels if options.save_hierarchy else []
+		if graphs:
+			graph = graphs[-1]
+		elif graph is None:
+			graph, source_ecount = load(options)
 		# f = open(options.attr)
 		# js = json.load(f)
 		# for element in js['nodes']:
@@ -197,17 +402,19 @@ def main():
 
 	# Coarsening
 	with timing.timeit_context_add('Coarsening'):
-		hierarchy_graphs = []
-		hierarchy_levels = []
+		counters = []
+		successor = None
 		running = True
 		while running:
 			running = False
 
-			membership = sharedmem.full(graph.vcount(), range(graph.vcount()), dtype='int')
-			levels = graph['level']
+			pool.publish(graph)
+			membership = pool.membership(graph.vcount())
+			levels = graph['level'][:]
 			contract = False
 
-			processes = []
+			results = []
+			local_tasks = []
 			for layer in range(len(graph['vertices'])):
 
 				matching_layer = True
@@ -222,10 +429,8 @@ def main():
 					running = True
 					levels[layer] += 1
 
-					graph['similarity'] = getattr(Similarity(graph, graph['adjlist']), options.similarity[layer])
 					start = sum(graph['vertices'][0:layer])
 					end = sum(graph['vertices'][0:layer + 1])
-					vertices = range(start, end)
 
 					param = dict(reduction_factor=options.reduction_factor[layer])
 
@@ -233,122 +438,145 @@ def main():
 						param['upper_bound'] = options.upper_bound[layer]
 						param['n'] = options.vertices[layer]
 						param['global_min_vertices'] = options.global_min_vertices[layer]
-					if options.matching[layer] in ['mlp', 'nmlp', 'gmb', 'rgmb']:
-						param['vertices'] = vertices
+					if options.matching[layer] in PARALLEL_MATCHING:
+						param['workers'] = options.workers
+					if options.matching[layer] in ['gmb'] and options.gmb_topk:
+						param['topk'] = options.gmb_topk
 					if options.matching[layer] in ['mlp']:
 						param['tolerance'] = options.tolerance[layer]
 						param['itr'] = options.itr[layer]
+						param['synchronous'] = options.synchronous
 					# TODO - Here to run co-cluster
-					if options.matching[layer] in ['hem', 'lem', 'rm']:
-						one_mode_graph = graph.weighted_one_mode_projection(vertices)
-						matching_method = getattr(one_mode_graph, options.matching[layer])
+					similarity = (options.similarity[layer], options.batch_similarity, options.cache_memory, options.cache_policy)
+					projection = dict(topk=options.projection_topk, threshold=options.projection_threshold, significance=options.projection_backbone)
+					task = pool.task(method=options.matching[layer], param=param, vertices=(start, end), similarity=similarity, projection=projection)
+					# Parallel matchings run here and send proposals to the workers
+					if options.workers > 1 and options.matching[layer] in PARALLEL_MATCHING:
+						local_tasks.append(task)
 					else:
-						matching_method = getattr(graph, options.matching[layer])
-
-					processes.append(Process(target=matching_method, args=[membership], kwargs=param))
-
-			for p in processes:
-				p.start()
-			for p in processes:
-				p.join()
+						results.append(pool.submit(task))
+
+			# Local matchings use a two-hopes index with the options of the
+			# workers, dropped afterwards since the given graph may be reused
+			if local_tasks:
+				graph['twohop'] = TwoHopIndex(graph.biadjacency(), options.twohop_topk, options.hub_degree, options.hub_policy)
+			for task in local_tasks:
+				pool.current = task
+				# Proposals are scored by the workers, projections by the master
+				if task['method'] in ['nmlp', 'rgmb']:
+					getattr(graph, task['method'])(membership, vertices=range(*task['vertices']), **task['param'])
+				else:
+					counters.append(workers.local(task, graph, membership))
+			if local_tasks:
+				graph['twohop'] = None
+				graph['similarity'] = None
+			counters.extend(result.get() for result in results)
 
 			if contract:
-				coarse = graph.contract(membership)
+				if options.contract_sparse:
+					coarse = graph.contract_sparse(membership)
+				else:
+					coarse = graph.contract(membership)
 				coarse['level'] = levels
 
 				if coarse.vcount() == graph.vcount():
 					break
 
+				successor = graph.successor if isinstance(graph, BGraph) else graph.vs['successor']
 				graph = coarse
+				if options.checkpoint:
+					depth += 1
+					checkpoint.save(options.checkpoint, depth, graph, successor, source_ecount)
 				if options.save_hierarchy or not running:
 					hierarchy_graphs.append(graph)
 					hierarchy_levels.append(levels[:])
+		pool.close()
+		parallel.executor = None
 
-	# Save
-	with timing.timeit_context_add('Save'):
+	return hierarchy_levels, hierarchy_graphs, source_ecount, counters
 
-		output = options.output
-		for index, obj in enumerate(reversed(zip(hierarchy_levels, hierarchy_graphs))):
-			levels, graph = obj
-
-			if options.save_conf:
-				# with open(output + '_' + str(index) + '.conf', 'w+') as f:
-				# with open(output + 'l' + ''.join(str(options.reduction_factor[0]).split('.')) + 'r' + ''.join(str(options.reduction_factor[1]).split('.')) + 'nl' + str(levels[0]) + 'nr' + str(levels[1]) + '.conf', 'w+') as f:
-				with open(output + '.conf', 'w+') as f:
-					d = {}
-					d['source_input'] = options.input
-					d['source_vertices'] = [options.vertices[0], options.vertices[1]]
-					d['source_vcount'] = options.vertices[0] + options.vertices[1]
-					d['source_ecount'] = source_ecount
-					d['ecount'] = graph.ecount()
-					d['vcount'] = graph.vcount()
-					d['vertices'] = graph['vertices']
-					d['reduction_factor'] = options.reduction_factor
-					d['max_levels'] = options.max_levels
-					# Added this line for MLBGViewer
-					d['total_levels'] = hierarchy_levels[-1]
-					d['similarity'] = options.similarity
-					d['matching'] = options.matching
-					d['level'] = levels
-					d['upper_bound'] = options.upper_bound
-					d['global_min_vertices'] = options.global_min_vertices
-					d['itr'] = options.itr
-					json.dump(d, f, indent=4)
-
-			if options.save_ncol:
-				# graph.write(output + '_' + str(index) + '.ncol', format='ncol')
-				graph.write(output + 'l' + ''.join(str(options.reduction_factor[0]).split('.')) + 'r' + ''.join(str(options.reduction_factor[1]).split('.')) + 'nl' + str(levels[0]) + 'nr' + str(levels[1]) + '.ncol', format='ncol')
-
-			if options.save_source:
-				# with open(output + '_' + str(index) + '.source', 'w+') as f:
-				with open(output + 'l' + ''.join(str(options.reduction_factor[0]).split('.')) + 'r' + ''.join(str(options.reduction_factor[1]).split('.')) + 'nl' + str(levels[0]) + 'nr' + str(levels[1]) + '.source', 'w+') as f:
-					for v in graph.vs():
-						f.write(' '.join(map(str, v['source'])) + '\n')
-
-			if options.save_predecessor:
-				with open(output + '_' + str(index) + '.predecessor', 'w+') as f:
-					for v in graph.vs():
-						f.write(' '.join(map(str, v['predecessor'])) + '\n')
-
-			if options.save_successor:
-				numpy.savetxt(output + '_' + str(index) + '.successor', graph.vs['successor'], fmt='%d')
-
-			if options.save_weight:
-				numpy.savetxt(output + '_' + str(index) + '.weight', graph.vs['weight'], fmt='%d')
-
-			if options.save_gml:
-				del graph['adjlist']
-				del graph['similarity']
-				graph['layers'] = str(graph['layers'])
-				if(type(graph['vertices']) is str):
-					graph['vertices'] = graph['vertices'].split(",")
-				if(type(graph['level']) is str):
-					graph['level'] = graph['level'].split(",")
-				graph['vertices'] = ' '.join(map(str, graph['vertices']))
-				graph['level'] = ' '.join(map(str, graph['level']))
-				graph.vs['name'] = map(str, range(0, graph.vcount()))
-				graph.vs['type'] = map(str, graph.vs['type'])
-				graph.vs['weight'] = map(str, graph.vs['weight'])
-				graph.vs['successor'] = map(str, graph.vs['successor'])
-				for v in graph.vs():
-					if(type(v['source']) is str):
-						v['source'] = v['source'].split(",")
-					if(type(v['predecessor']) is str):
-						v['predecessor'] = v['predecessor'].split(",")
-					v['source'] = ','.join(map(str, v['source']))
-					v['predecessor'] = ','.join(map(str, v['predecessor']))
-				# graph.write(output + '_' + str(index) + '.gml', format='gml')
-				graph.write(output + 'l' + ''.join(str(options.reduction_factor[0]).split('.')) + 'r' + ''.join(str(options.reduction_factor[1]).split('.')) + 'nl' + str(levels[0]) + 'nr' + str(levels[1]) + '.gml', format='gml')
-
-			if not options.save_hierarchy:
-				break
+def save(options, hierarchy_levels, hierarchy_graphs, source_ecount):
+	"""
+	Save the files of the hierarchy, from the coarsest level.
+	"""
 
-	if options.show_timing:
-		timing.print_tabular()
-	if options.save_timing_csv:
-		timing.save_csv(output + '-timing.csv')
-	if options.save_timing_json:
-		timing.save_json(output + '-timing.json')
+	output = options.output
+	for index, obj in enumerate(reversed(zip(hierarchy_levels, hierarchy_graphs))):
+		levels, graph = obj
+		if options.save_json:
+			with open(output + 'l' + ''.join(str(options.reduction_factor[0]).split('.')) + 'r' + ''.join(str(options.reduction_factor[1]).split('.')) + 'nl' + str(levels[0]) + 'nr' + str(levels[1]) + '.json', 'w+') as f:
+				viewer.write(graph, f)
+
+		if isinstance(graph, BGraph):
+			graph = graph.to_mgraph()
+
+		if options.save_conf:
+			# with open(output + '_' + str(index) + '.conf', 'w+') as f:
+			# with open(output + 'l' + ''.join(str(options.reduction_factor[0]).split('.')) + 'r' + ''.join(str(options.reduction_factor[1]).split('.')) + 'nl' + str(levels[0]) + 'nr' + str(levels[1]) + '.conf', 'w+') as f:
+			with open(output + '.conf', 'w+') as f:
+				d = {}
+				d['source_input'] = options.input
+				d['source_vertices'] = [options.vertices[0], options.vertices[1]]
+				d['source_vcount'] = options.vertices[0] + options.vertices[1]
+				d['source_ecount'] = source_ecount
+				d['ecount'] = graph.ecount()
+				d['vcount'] = graph.vcount()
+				d['vertices'] = graph['vertices']
+				d['reduction_factor'] = options.reduction_factor
+				d['max_levels'] = options.max_levels
+				# Added this line for MLBGViewer
+				d['total_levels'] = hierarchy_levels[-1]
+				d['similarity'] = options.similarity
+				d['matching'] = options.matching
+				d['level'] = levels
+				d['upper_bound'] = options.upper_bound
+				d['global_min_vertices'] = options.global_min_vertices
+				d['itr'] = options.itr
+				json.dump(d, f, indent=4)
+
+		if options.save_ncol:
+			# graph.write(output + '_' + str(index) + '.ncol', format='ncol')
+			graph.write(output + 'l' + ''.join(str(options.reduction_factor[0]).split('.')) + 'r' + ''.join(str(options.reduction_factor[1]).split('.')) + 'nl' + str(levels[0]) + 'nr' + str(levels[1]) + '.ncol', format='ncol')
+
+		if options.save_source:
+			# with open(output + '_' + str(index) + '.source', 'w+') as f:
+			with open(output + 'l' + ''.join(str(options.reduction_factor[0]).split('.')) + 'r' + ''.join(str(options.reduction_factor[1]).split('.')) + 'nl' + str(levels[0]) + 'nr' + str(levels[1]) + '.source', 'w+') as f:
+				graph['lineage'].flatten().write(f)
+
+		if options.save_predecessor:
+			with open(output + '_' + str(index) + '.predecessor', 'w+') as f:
+				graph['lineage'].write(f)
+
+		if options.save_successor:
+			numpy.savetxt(output + '_' + str(index) + '.successor', graph.vs['successor'], fmt='%d')
+
+		if options.save_weight:
+			numpy.savetxt(output + '_' + str(index) + '.weight', graph.vs['weight'], fmt='%d')
+
+		if options.save_gml:
+			lineage = graph['lineage']
+			del graph['adjlist']
+			del graph['similarity']
+			del graph['lineage']
+			del graph['twohop']
+			graph['layers'] = str(graph['layers'])
+			if(type(graph['vertices']) is str):
+				graph['vertices'] = graph['vertices'].split(",")
+			if(type(graph['level']) is str):
+				graph['level'] = graph['level'].split(",")
+			graph['vertices'] = ' '.join(map(str, graph['vertices']))
+			graph['level'] = ' '.join(map(str, graph['level']))
+			graph.vs['name'] = map(str, range(0, graph.vcount()))
+			graph.vs['type'] = map(str, graph.vs['type'])
+			graph.vs['weight'] = map(str, graph.vs['weight'])
+			graph.vs['successor'] = map(str, graph.vs['successor'])
+			graph.vs['source'] = lineage.flatten().to_strings(',')
+			graph.vs['predecessor'] = lineage.to_strings(',')
+			# graph.write(output + '_' + str(index) + '.gml', format='gml')
+			graph.write(output + 'l' + ''.join(str(options.reduction_factor[0]).split('.')) + 'r' + ''.join(str(options.reduction_factor[1]).split('.')) + 'nl' + str(levels[0]) + 'nr' + str(levels[1]) + '.gml', format='gml')
+
+		if not options.save_hierarchy:
+			break
 
 if __name__ == "__main__":
 	sys.exit(main())
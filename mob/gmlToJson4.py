@@ -0,0 +1,148 @@
+####################################################################################
+# Streaming conversion of a .gml file to the .json format read by the viewer.      #
+# Based on gmlToJson3.py by Diego S. Cintra.                                       #
+# Date: 17 october 2026                                                            #
+####################################################################################
+import os
+import re
+import sys
+import json
+import math
+import shutil
+import tempfile
+
+# Bytes read from the .gml file at a time, and buffer size of the output files
+CHUNK = 1 << 20
+# Comments, quoted strings (possibly unterminated at the end of a chunk), brackets and keys or numbers
+TOKEN = re.compile(r'#[^\n]*|"[^"]*"?|\[|\]|[^\s\[\]"]+')
+# Characters that must be escaped in a .json string
+ESCAPE = re.compile(r'[\x00-\x1f\\\x7f-\xff]')
+
+# @desc Splits a .gml file into tokens, one chunk at a time. A chunk is cut at its last line break, and a string still open there is carried to the next chunk.
+# @param {File} gml Open .gml file.
+# @returns {Generator} Lists of tokens, without comments.
+def tokens(gml):
+    rest = ''
+    while True:
+        chunk = gml.read(CHUNK)
+        buf = rest + chunk
+        if not chunk:
+            end = len(buf)
+        else:
+            end = buf.rfind('\n') + 1
+        found = TOKEN.findall(buf, 0, end)
+        # An open string continues in the next chunk
+        if found and found[-1][0] == '"' and (len(found[-1]) == 1 or found[-1][-1] != '"'):
+            if not chunk:
+                raise ValueError('Unterminated string at the end of the .gml file.')
+            end = buf.rfind('"', 0, end)
+            found.pop()
+        rest = buf[end:]
+        if found:
+            yield [token for token in found if token[0] != '#']
+        if not chunk:
+            break
+
+# @desc Converts a .gml string to a .json string.
+# @param {String} text String, without its quotes.
+# @returns {String} Quoted .json string.
+def string(text):
+    if ESCAPE.search(text) is None:
+        return '"' + text + '"'
+    try:
+        return json.dumps(text.decode('utf-8'))
+    except UnicodeDecodeError:
+        return json.dumps(text.decode('latin-1'))
+
+# @desc Converts a .gml value to a .json value: strings are kept as strings, integers and reals as numbers.
+# @param {String} token Value token.
+# @returns {String} .json value.
+def literal(token):
+    if token[0] == '"':
+        return string(token[1:-1])
+    try:
+        return str(int(token))
+    except ValueError:
+        pass
+    try:
+        number = float(token)
+    except ValueError:
+        return string(token)
+    # Infinities and NaNs are not .json numbers
+    if math.isinf(number) or math.isnan(number):
+        return string(token)
+    return repr(number)
+
+# @desc Formats a list of key and value pairs as a .json object.
+# @param {List} pairs Keys and .json values.
+# @returns {String} .json object.
+def record(pairs):
+    return '{' + ','.join(['"%s":%s' % pair for pair in pairs]) + '}'
+
+# @desc Converts a .gml file to the .json format read by the viewer, with the graph attributes in "graphInfo", nodes in "nodes" and edges in "links". The .gml file is read once, in chunks, and nodes are written as they are read; edges are buffered in a temporary file, since nodes and edges may be interleaved, and appended at the end. Memory does not depend on the size of the file.
+# @param {String} gml_file .gml input file name.
+# @param {String} json_file .json output file name.
+def convert(gml_file, json_file):
+    gml = open(gml_file, 'rb')
+    jason = open(json_file, 'wb', CHUNK)
+    links = tempfile.TemporaryFile(dir=os.path.dirname(os.path.abspath(json_file)), bufsize=CHUNK)
+    # Open lists, as [key, pairs], graph attributes and separators of the next node and edge
+    stack = []
+    info = []
+    nodeSeparator = '\n'
+    linkSeparator = '\n'
+    key = None
+    jason.write('{"nodes": [')
+    for found in tokens(gml):
+        for token in found:
+            if key is None:
+                if token == ']':
+                    if not stack:
+                        raise ValueError('Unbalanced "]" in the .gml file.')
+                    name, pairs = stack.pop()
+                    depth = len(stack)
+                    if depth == 1 and name == 'node':
+                        jason.write(nodeSeparator + record(pairs))
+                        nodeSeparator = ',\n'
+                    elif depth == 1 and name == 'edge':
+                        links.write(linkSeparator + record(pairs))
+                        linkSeparator = ',\n'
+                    elif depth == 1:
+                        info.append((name, record(pairs)))
+                    elif depth > 1:
+                        stack[-1][1].append((name, record(pairs)))
+                elif token == '[':
+                    raise ValueError('List without key in the .gml file.')
+                else:
+                    key = token
+            else:
+                if token == '[':
+                    stack.append((key, []))
+                elif token == ']':
+                    raise ValueError('Key ' + key + ' without value in the .gml file.')
+                elif len(stack) > 1:
+                    stack[-1][1].append((key, literal(token)))
+                elif len(stack) == 1:
+                    info.append((key, literal(token)))
+                key = None
+    if stack or key is not None:
+        raise ValueError('Unexpected end of the .gml file.')
+
+    # Append edges and graph attributes
+    jason.write('\n],\n"links": [')
+    links.seek(0)
+    shutil.copyfileobj(links, jason, CHUNK)
+    jason.write('\n],\n"graphInfo": [' + record(info) + ']}\n')
+    links.close()
+    jason.close()
+    gml.close()
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print "Usage: python gmlToJson4.py input.gml output.json"
+        sys.exit(-1)
+    try:
+        convert(sys.argv[1], sys.argv[2])
+    except ValueError as error:
+        print str(error) + " Program exiting with -1"
+        sys.exit(-1)
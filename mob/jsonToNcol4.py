@@ -0,0 +1,149 @@
+####################################################################################
+# Streaming conversion of the links of a .json file to .ncol, used by coarsening.  #
+# Based on jsonToNcol3.py by Diego Silva Cintra.                                   #
+# Date: 17 october 2026                                                            #
+####################################################################################
+import re
+import sys
+import argparse
+
+# Bytes read from the .json file at a time, and buffer size of the .ncol file
+CHUNK = 1 << 20
+# Strings, strings still open at the end of a chunk, punctuation and numbers or literals
+TOKEN = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|"[^"\\]*(?:\\.[^"\\]*)*\\?\Z|[{}\[\]:,]|[^\s{}\[\]:,"]+')
+# Fields of a link written to .ncol, in order
+FIELDS = ['source', 'target', 'weight']
+
+# @desc Splits a .json file into tokens, one chunk at a time. The last token of a chunk may be cut, so it is carried to the next chunk.
+# @param {File} jsonFile Open .json file.
+# @returns {Generator} Lists of tokens.
+def tokens(jsonFile):
+    rest = ''
+    while True:
+        chunk = jsonFile.read(CHUNK)
+        buf = rest + chunk
+        found = TOKEN.findall(buf)
+        rest = ''
+        if chunk and found and buf.endswith(found[-1]):
+            rest = found.pop()
+        if found:
+            yield found
+        if not chunk:
+            if rest:
+                raise ValueError('Unexpected end of the .json file.')
+            break
+
+# @desc Removes the quotes of a .json string or number token.
+# @param {String} token Scalar token.
+# @returns {String} Token without quotes.
+def unquote(token):
+    if token[0] == '"':
+        return token[1:-1]
+    return token
+
+# @desc Formats the edges read from a chunk as .ncol lines.
+# @param {List} edges Lists of source, target and weight.
+# @returns {String} .ncol lines.
+def ncolLines(edges):
+    return ''.join(['%s %s %s\n' % tuple(edge) for edge in edges])
+
+# @desc Writes the links of a .json graph to a .ncol file, one "source target weight" line per link, with weight 1 if a link has none. Only the structure of the file is followed, any formatting, including minified .json, is accepted. The file is read in chunks and the lines of each chunk are written at once, so memory does not depend on the size of the file.
+# @param {String} json_file .json input file name.
+# @param {String} ncol_file .ncol output file name.
+# @returns {List} Number of vertices of each layer in "graphInfo", if any, None otherwise.
+def convert(json_file, ncol_file):
+    jsonFile = open(json_file, 'rb')
+    ncolFile = open(ncol_file, 'wb', CHUNK)
+    # Open containers, '{' or '[', and top level key of the current array
+    stack = []
+    section = None
+    # Last key read, and if the next string is a key
+    key = None
+    expectKey = False
+    edge = None
+    vertices = None
+    for found in tokens(jsonFile):
+        edges = []
+        for token in found:
+            c = token[0]
+            if c == '{' or c == '[':
+                if len(stack) == 1:
+                    section = key
+                stack.append(c)
+                expectKey = c == '{'
+                if c == '{' and len(stack) == 3 and section == 'links':
+                    edge = [None, None, '1']
+            elif c == '}' or c == ']':
+                if not stack:
+                    raise ValueError('Unbalanced "' + c + '" in the .json file.')
+                if c == '}' and len(stack) == 3 and section == 'links':
+                    if edge[0] is None or edge[1] is None:
+                        raise ValueError('Link without source or target in the .json file.')
+                    edges.append(edge)
+                stack.pop()
+                expectKey = False
+            elif c == ',':
+                expectKey = stack[-1] == '{' if stack else False
+            elif c == ':':
+                pass
+            elif expectKey:
+                key = token[1:-1]
+                expectKey = False
+            elif len(stack) == 3:
+                if section == 'links' and key in FIELDS:
+                    edge[FIELDS.index(key)] = unquote(token)
+                elif section == 'graphInfo' and key == 'vertices':
+                    vertices = unquote(token).split()
+        ncolFile.write(ncolLines(edges))
+    if stack:
+        raise ValueError('Unexpected end of the .json file.')
+    ncolFile.close()
+    jsonFile.close()
+    if vertices is not None:
+        return [int(float(n)) for n in vertices]
+    return None
+
+# @desc Writes the binary cache of a .ncol file, memory-mapped by coarsening.py with --binary_cache instead of parsing the .ncol.
+# @param {String} ncol_file .ncol file name.
+# @param {List} vertices Number of vertices of each layer.
+# @param {String} combine Weight of repeated edges: sum, max or last occurrence.
+def writeCache(ncol_file, vertices, combine):
+    import models.helperigraph as helperigraph
+    helperigraph.read_ncol(ncol_file, vertices, combine=combine, cache=True)
+
+if __name__ == "__main__":
+    # Instantiate argument parser
+    description = 'Program to convert .json file to .ncol format (used in igraph), following the structure of the file.'
+    parser = argparse.ArgumentParser(description=description)
+    parser._action_groups.pop()
+
+    # Add argument group (required)
+    required = parser.add_argument_group('required arguments')
+    required.add_argument('-i', '--input', required=True, dest='input', action='store', type=str, default=None, help='.json input file name.');
+    required.add_argument('-o', '--output', required=True, dest='output', action='store', type=str, default=None, help='.ncol output file name.');
+    # Add argument group (optional)
+    optional = parser.add_argument_group('optional arguments')
+    optional.add_argument('-b', '--binary_cache', dest='binary_cache', action='store_true', default=False, help='also write the binary cache of the .ncol, read by coarsening.py with --binary_cache.');
+    optional.add_argument('-v', '--vertices', dest='vertices', action='store', type=int, nargs='+', default=None, help='number of vertices of each layer, by default the "vertices" of "graphInfo".');
+    optional.add_argument('-c', '--combine', dest='combine', action='store', choices=['sum', 'max', 'last'], default='last', help='weight of repeated edges in the binary cache, as in coarsening.py.');
+
+    # Run the parser
+    options = parser.parse_args()
+
+    # Step 1 - Write the links of the .json file to the .ncol file
+    try:
+        vertices = convert(options.input, options.output)
+    except ValueError as error:
+        print str(error) + " Program exiting with -1"
+        sys.exit(-1)
+    # Step 2 - Write the binary cache, if the number of vertices is known
+    if options.binary_cache:
+        vertices = options.vertices or vertices
+        if vertices is None or len(vertices) < 2:
+            print "Number of vertices unknown, binary cache not written."
+        else:
+            try:
+                writeCache(options.output, vertices, options.combine)
+            except ValueError as error:
+                print str(error) + " Program exiting with -1"
+                sys.exit(-1)
@@ -0,0 +1,259 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+BGraph (Compact bipartite graph)
+=====================================================
+
+igraph-free bipartite graph for the coarsening loop. The n0 x n1
+biadjacency is kept as CSR (rows of the first layer) and CSC (rows of the
+second layer) numpy arrays, plus per-vertex weight and type arrays. Vertex
+ids are global, i.e., the second layer starts at n0, as in MGraph.
+
+Conversion from and to MGraph is expected only at load and save.
+
+This file is part of MOB.
+
+MOB is a free software and non-commercial use only: you can be use it for
+creating unlimited applications, distribute in binary or object form only,
+modify source-code and distribute modifications (derivative works). Please,
+giving credit to the author by citing the papers. License will expire in 2018,
+July, and will be renewed.
+
+Owner or contributors are not liable for any direct, indirect, incidental,
+special, exemplary, or consequential damages, (such as loss of data or profits,
+and others) arising in any way out of the use of this software,
+even if advised of the possibility of such damage.
+"""
+
+import numpy
+import contraction
+
+from lineage import Lineage
+from matching import Matching
+from twohop import TwoHopIndex
+from scipy.sparse import csr_matrix, coo_matrix
+
+__maintainer__ = 'Alan Valejo'
+__credits__ = ['Alan Valejo', 'Vinicius Ferreira', 'Maria Cristina Ferreira de Oliveira', 'Alneu de Andrade Lopes']
+__homepage__ = 'http://www.alanvalejo.com.br/software?name=MOB'
+__version__ = '0.1'
+__date__ = '2026-10-17'
+
+class BGraph(Matching):
+
+	def __init__(self, biadjacency, weight=None, lineage=None):
+		"""
+		Create a compact graph from a scipy.sparse n0 x n1 biadjacency
+		"""
+
+		biadjacency = csr_matrix(biadjacency)
+		biadjacency.sum_duplicates()
+		biadjacency.sort_indices()
+		self.biadjacency_csr = biadjacency
+		self.biadjacency_csc = biadjacency.T.tocsr()
+		self.biadjacency_csc.sort_indices()
+		n0, n1 = biadjacency.shape
+		self.shape = (n0, n1)
+		self.start = [0, n0]
+		self.rows = [(self.biadjacency_csr.indptr, self.biadjacency_csr.indices), (self.biadjacency_csc.indptr, self.biadjacency_csc.indices)]
+		self.type = numpy.repeat(numpy.arange(2, dtype=numpy.int8), [n0, n1])
+		if weight is None:
+			weight = numpy.ones(n0 + n1, dtype=numpy.int64)
+		self.weight = numpy.asarray(weight)
+		self.successor = None
+		rows = numpy.repeat(numpy.arange(n0, dtype=numpy.int64), numpy.diff(biadjacency.indptr))
+		self._edge_keys = rows * n1 + biadjacency.indices
+		self._degree = numpy.concatenate((numpy.diff(self.rows[0][0]), numpy.diff(self.rows[1][0])))
+		self._attributes = {}
+		self['layers'] = 2
+		self['vertices'] = [n0, n1]
+		self['similarity'] = None
+		self['twohop'] = None
+		if lineage is None:
+			lineage = Lineage.identity(n0 + n1)
+		self['lineage'] = lineage
+
+	@classmethod
+	def from_mgraph(cls, graph):
+		"""
+		Create a compact graph from a bipartite MGraph
+		"""
+
+		compact = cls(graph.biadjacency(), numpy.array(graph.vs['weight']), graph['lineage'])
+		for attr in graph.attributes():
+			if attr not in ['adjlist', 'similarity', 'twohop', 'lineage', 'vertices', 'layers']:
+				compact[attr] = graph[attr]
+
+		return compact
+
+	def to_mgraph(self):
+		"""
+		Create a MGraph with the same vertices, edges and attributes
+		"""
+
+		from mob import MGraph
+		from helperigraph import widen
+
+		graph = MGraph(self.vcount(), self.get_edgelist())
+		graph.es['weight'] = widen(self.biadjacency_csr.data)
+		graph.vs['weight'] = self.weight.tolist()
+		graph.vs['type'] = self.type.tolist()
+		graph.vs['name'] = range(graph.vcount())
+		if self.successor is None:
+			graph.vs['successor'] = [None] * graph.vcount()
+		else:
+			graph.vs['successor'] = self.successor.tolist()
+		for attr, value in self._attributes.iteritems():
+			if attr not in ['adjlist', 'similarity', 'twohop']:
+				graph[attr] = value
+		graph['similarity'] = None
+		graph['twohop'] = None
+		graph['adjlist'] = map(set, graph.get_adjlist())
+
+		return graph
+
+	def __getitem__(self, key):
+		"""
+		Graph attribute, as in igraph, or edge weight if key is a pair of
+		vertices
+		"""
+
+		if isinstance(key, tuple):
+			return self.edge_weight(*key)
+		# Adjacency sets are only built if a pairwise similarity asks for them
+		if key == 'adjlist' and key not in self._attributes:
+			self._attributes[key] = [set(self.neighbors(vertex).tolist()) for vertex in xrange(self.vcount())]
+		return self._attributes[key]
+
+	def __setitem__(self, key, value):
+		self._attributes[key] = value
+
+	def __delitem__(self, key):
+		del self._attributes[key]
+
+	def attributes(self):
+		return self._attributes.keys()
+
+	def vcount(self):
+		return len(self.type)
+
+	def ecount(self):
+		return self.biadjacency_csr.nnz
+
+	def get_edgelist(self):
+		coo = self.biadjacency_csr.tocoo()
+		return zip(coo.row.tolist(), (coo.col + self.start[1]).tolist())
+
+	def degree(self, vertices=None):
+		if vertices is None:
+			return self._degree.tolist()
+		if isinstance(vertices, (int, long, numpy.integer)):
+			return int(self._degree[vertices])
+		return self._degree[vertices].tolist()
+
+	def strength(self, vertices=None, weights=None):
+		if weights is None:
+			return self.degree(vertices)
+		values = numpy.concatenate((numpy.asarray(self.biadjacency_csr.sum(axis=1)).ravel(), numpy.asarray(self.biadjacency_csc.sum(axis=1)).ravel()))
+		if vertices is None:
+			return values.tolist()
+		if isinstance(vertices, (int, long, numpy.integer)):
+			return values[vertices]
+		return values[vertices].tolist()
+
+	def vertex_weights(self):
+		return self.weight.tolist()
+
+	def biadjacency(self):
+		return self.biadjacency_csr
+
+	def neighbors(self, vertex):
+		"""
+		Neighbors of a vertex as global ids
+		"""
+
+		layer = self.type[vertex]
+		indptr, indices = self.rows[layer]
+		local = vertex - self.start[layer]
+		return indices[indptr[local]:indptr[local + 1]] + self.start[1 - layer]
+
+	def edge_weight(self, u, v):
+		"""
+		Weight of the edge (u, v), searching its packed key u * n1 + v
+		"""
+
+		if u > v:
+			u, v = v, u
+		key = u * self.shape[1] + v - self.start[1]
+		position = self._edge_keys.searchsorted(key)
+		if position == len(self._edge_keys) or self._edge_keys[position] != key:
+			raise ValueError('Edge (%d, %d) does not exist' % (u, v))
+		return self.biadjacency_csr.data[position].item()
+
+	def twohops(self, vertex):
+		"""
+		Two-hopes neighborhood of a vertex, i.e., vertices of the same type
+		that share at least one neighbor with it. The index is set by the
+		caller with the topk and hub options of the run, see
+		coarsening.hierarchy and workers.attach, or built without them.
+		"""
+
+		if self['twohop'] is None:
+			self['twohop'] = TwoHopIndex(self.biadjacency_csr)
+		return self['twohop'].twohops(vertex)
+
+	def weighted_one_mode_projection(self, vertices):
+		"""
+		Application of a one-mode projection to a bipartite network generates
+		two unipartite networks, one for each layer, so that vertices with
+		common neighbors are connected by edges in their respective projection.
+		"""
+
+		from mob import MGraph
+
+		graph = MGraph()
+		graph.add_vertices(len(vertices))
+		graph.vs['name'] = list(vertices)
+		name_to_id = dict(zip(vertices, range(graph.vcount())))
+
+		edges = []
+		weights = []
+		visited = [0] * self.vcount()
+		for vertex in vertices:
+			for twohop, score in self.scored_twohops(vertex, skip=visited):
+				edges.append((name_to_id[vertex], name_to_id[twohop]))
+				weights.append(score)
+			visited[vertex] = 1
+
+		if len(edges) > 0:
+			graph.add_edges(edges)
+			graph.es['weight'] = weights
+
+		return graph
+
+	def contract(self, matching):
+		"""
+		Create coarse graph from matching of groups
+		"""
+
+		successor, types = contraction.relabel(matching, self.type)
+		size = len(types)
+		self.successor = successor
+		vertices = numpy.bincount(types, minlength=2)
+		weight = contraction.aggregate(successor, self.weight, size)
+
+		coo = self.biadjacency_csr.tocoo()
+		rows = successor[coo.row]
+		cols = successor[coo.col + self.start[1]] - vertices[0]
+		biadjacency = coo_matrix((coo.data, (rows, cols)), shape=tuple(vertices))
+
+		coarse = BGraph(biadjacency, weight, Lineage.from_membership(successor, size, self['lineage']))
+		for attr in self.attributes():
+			if attr not in ['adjlist', 'similarity', 'twohop', 'lineage', 'vertices', 'layers']:
+				coarse[attr] = self[attr]
+
+		return coarse
+
+	# Contraction of compact graphs is always vectorized
+	contract_sparse = contract
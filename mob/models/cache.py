@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Similarity cache
+=====================================================
+
+Bounded cache for pairwise similarity measures. A pair (u, v) is keyed by
+the packed integer min(u, v) * n + max(u, v) and the number of entries is
+bounded by a memory cap, evicting entries with LRU or CLOCK policies.
+Hits, misses and evictions are published to shared memory, so the counters
+of matchers running in child processes can be reported by the parent.
+
+This file is part of MOB.
+
+MOB is a free software and non-commercial use only: you can be use it for
+creating unlimited applications, distribute in binary or object form only,
+modify source-code and distribute modifications (derivative works). Please,
+giving credit to the author by citing the papers. License will expire in 2018,
+July, and will be renewed.
+
+Owner or contributors are not liable for any direct, indirect, incidental,
+special, exemplary, or consequential damages, (such as loss of data or profits,
+and others) arising in any way out of the use of this software,
+even if advised of the possibility of such damage.
+"""
+
+import collections
+
+from multiprocessing.sharedctypes import RawArray
+
+__maintainer__ = 'Alan Valejo'
+__credits__ = ['Alan Valejo', 'Vinicius Ferreira', 'Maria Cristina Ferreira de Oliveira', 'Alneu de Andrade Lopes']
+__homepage__ = 'http://www.alanvalejo.com.br/software?name=MOB'
+__version__ = '0.1'
+__date__ = '2026-10-17'
+
+# Approximate memory per entry in bytes, including the dictionary slot
+ENTRY_BYTES = {'lru': 200, 'clock': 150}
+COUNTERS = ['hits', 'misses', 'evictions']
+
+class SimilarityCache(object):
+
+	def __init__(self, similarity, n, memory=1024.0, policy='clock'):
+		"""
+		Wrap a pairwise similarity of a graph with n vertices. The memory cap
+		is given in megabytes.
+		"""
+
+		if policy not in ENTRY_BYTES:
+			raise ValueError('Cache policy must be one of ' + ', '.join(sorted(ENTRY_BYTES)))
+		self.similarity = similarity
+		self.n = n
+		self.policy = policy
+		self.capacity = max(1, int(memory * 1024 * 1024 / ENTRY_BYTES[policy]))
+		self.hits = self.misses = self.evictions = 0
+		self.shared = RawArray('l', len(COUNTERS))
+		if policy == 'lru':
+			self.entries = collections.OrderedDict()
+			self.get = self.get_lru
+		else:
+			self.slots = {}
+			self.keys = []
+			self.values = []
+			self.referenced = bytearray()
+			self.hand = 0
+			self.get = self.get_clock
+
+	def __call__(self, u, v):
+		if u < v:
+			return self.get(u * self.n + v, u, v)
+		return self.get(v * self.n + u, u, v)
+
+	def get_lru(self, key, u, v):
+		entries = self.entries
+		if key in entries:
+			self.hits += 1
+			value = entries.pop(key)
+			entries[key] = value
+			return value
+		self.misses += 1
+		value = self.similarity(u, v)
+		if len(entries) >= self.capacity:
+			entries.popitem(last=False)
+			self.evictions += 1
+		entries[key] = value
+		return value
+
+	def get_clock(self, key, u, v):
+		slot = self.slots.get(key)
+		if slot is not None:
+			self.hits += 1
+			self.referenced[slot] = 1
+			return self.values[slot]
+		self.misses += 1
+		value = self.similarity(u, v)
+		if len(self.keys) < self.capacity:
+			self.slots[key] = len(self.keys)
+			self.keys.append(key)
+			self.values.append(value)
+			self.referenced.append(0)
+			return value
+		# Second chance: skip and clear referenced slots
+		referenced = self.referenced
+		while referenced[self.hand]:
+			referenced[self.hand] = 0
+			self.hand = (self.hand + 1) % self.capacity
+		slot = self.hand
+		self.hand = (self.hand + 1) % self.capacity
+		del self.slots[self.keys[slot]]
+		self.evictions += 1
+		self.slots[key] = slot
+		self.keys[slot] = key
+		self.values[slot] = value
+		return value
+
+	def publish(self):
+		"""
+		Copy the counters to shared memory, to be read by the parent
+		process after the matching.
+		"""
+
+		for index, counter in enumerate(COUNTERS):
+			self.shared[index] = getattr(self, counter)
+
+	def stats(self):
+		""" Dictionary with hits, misses and evictions. """
+
+		return dict(zip(COUNTERS, self.shared))
@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Checkpoint
+=====================================================
+
+Level-by-level checkpoint of a coarsening run. Each contracted level is
+written to level-<index>.npz in the checkpoint directory as soon as it is
+built: the biadjacency, the vertex weights, its lineage, the successor of
+the previous level, the levels of each layer and the state of the random
+generators after the level. A level is written to a temporary file and
+renamed, so a crash leaves only complete levels.
+
+This file is part of MOB.
+
+MOB is a free software and non-commercial use only: you can be use it for
+creating unlimited applications, distribute in binary or object form only,
+modify source-code and distribute modifications (derivative works). Please,
+giving credit to the author by citing the papers. License will expire in 2018,
+July, and will be renewed.
+
+Owner or contributors are not liable for any direct, indirect, incidental,
+special, exemplary, or consequential damages, (such as loss of data or profits,
+and others) arising in any way out of the use of this software,
+even if advised of the possibility of such damage.
+"""
+
+import os
+import re
+import numpy
+import random
+
+from bigraph import BGraph
+from lineage import Lineage
+from scipy.sparse import csr_matrix
+
+__maintainer__ = 'Alan Valejo'
+__credits__ = ['Alan Valejo', 'Vinicius Ferreira', 'Maria Cristina Ferreira de Oliveira', 'Alneu de Andrade Lopes']
+__homepage__ = 'http://www.alanvalejo.com.br/software?name=MOB'
+__version__ = '0.1'
+__date__ = '2026-10-17'
+
+def path(directory, index):
+	return os.path.join(directory, 'level-%d.npz' % index)
+
+def indices(directory):
+	""" Indices of the levels saved in a directory, in increasing order. """
+
+	if not os.path.isdir(directory):
+		return []
+	matches = [re.match(r'^level-(\d+)\.npz$', name) for name in os.listdir(directory)]
+	return sorted(int(match.group(1)) for match in matches if match)
+
+def clear(directory):
+	""" Remove the levels saved in a directory by a previous run. """
+
+	for index in indices(directory):
+		os.remove(path(directory, index))
+
+def save(directory, index, graph, successor, source_ecount):
+	"""
+	Save a contracted level and the random generators state. The successor
+	is the membership of the previous level relabeled to this level.
+	"""
+
+	if not os.path.isdir(directory):
+		os.makedirs(directory)
+	biadjacency = csr_matrix(graph.biadjacency())
+	lineage = graph['lineage']
+	version, state, gauss = random.getstate()
+	name, keys, position, has_gauss, cached_gaussian = numpy.random.get_state()
+	arrays = dict(data=biadjacency.data, indices=biadjacency.indices, indptr=biadjacency.indptr, shape=biadjacency.shape)
+	arrays['weight'] = numpy.asarray(graph.vertex_weights(), dtype=numpy.int64)
+	arrays['offsets'] = lineage.offsets
+	arrays['members'] = lineage.indices
+	arrays['successor'] = numpy.asarray(successor, dtype=numpy.int64)
+	arrays['level'] = numpy.asarray(graph['level'], dtype=numpy.int64)
+	arrays['source_ecount'] = source_ecount
+	arrays['random_state'] = numpy.asarray(state + (version,), dtype=numpy.int64)
+	arrays['random_gauss'] = numpy.nan if gauss is None else gauss
+	arrays['numpy_keys'] = keys
+	arrays['numpy_state'] = numpy.array([position, has_gauss], dtype=numpy.int64)
+	arrays['numpy_gauss'] = cached_gaussian
+	temporary = path(directory, index) + '.tmp'
+	with open(temporary, 'wb') as f:
+		numpy.savez(f, **arrays)
+	os.rename(temporary, path(directory, index))
+
+def load(directory, compact=False, hierarchy=False):
+	"""
+	Load the last saved level and restore the random generators. Return the
+	loaded graphs, all levels if hierarchy, else only the last one, in
+	increasing order, with the levels of each layer and the number of edges
+	of the original graph. Graphs are MGraph unless compact.
+	"""
+
+	saved = indices(directory)
+	if not saved:
+		return [], [], None
+	if saved != range(1, len(saved) + 1):
+		raise ValueError('Missing levels in checkpoint ' + directory)
+
+	graphs, levels = [], []
+	parent = None
+	previous = None
+	for index in saved:
+		with numpy.load(path(directory, index)) as arrays:
+			if parent is None:
+				parent = Lineage.identity(len(arrays['members']))
+			lineage = Lineage(arrays['offsets'], arrays['members'], parent)
+			parent = lineage
+			if previous is not None:
+				previous.successor = arrays['successor']
+			if not hierarchy and index != saved[-1]:
+				continue
+			biadjacency = csr_matrix((arrays['data'], arrays['indices'], arrays['indptr']), shape=tuple(arrays['shape']))
+			graph = BGraph(biadjacency, arrays['weight'], lineage)
+			graph['level'] = arrays['level'].tolist()
+			graphs.append(graph)
+			levels.append(graph['level'][:])
+			previous = graph
+			if index == saved[-1]:
+				source_ecount = int(arrays['source_ecount'])
+				state = arrays['random_state'].tolist()
+				gauss = float(arrays['random_gauss'])
+				random.setstate((state[-1], tuple(state[:-1]), None if numpy.isnan(gauss) else gauss))
+				position, has_gauss = arrays['numpy_state'].tolist()
+				numpy.random.set_state(('MT19937', arrays['numpy_keys'], position, has_gauss, float(arrays['numpy_gauss'])))
+
+	if not compact:
+		graphs = [graph.to_mgraph() for graph in graphs]
+
+	return graphs, levels, source_ecount
@@ -1,13 +1,22 @@
 #!/usr/bin/env python
 # coding: utf-8
 
+import os
+import json
 import numpy
+import shutil
+import hashlib
 import helper
 import networkx as nx
 
 from mob import MGraph
+from lineage import Lineage
 from itertools import izip
 from scipy.sparse import csr_matrix
+from scipy.sparse.sputils import get_index_dtype
+
+# Weight dtype of the edges read from ncol files
+WEIGHT = numpy.float32
 
 def igraph_to_nx(graph):
 	nx_graph = nx.Graph()
@@ -18,10 +27,26 @@ def igraph_to_nx(graph):
 	nx_graph.add_weighted_edges_from(nx_edges)
 	return nx_graph
 
+def widen(weights):
+	"""
+	Python floats of edge weights. float32 weights become the float of their
+	shortest decimal, so a weight read as 0.464 is written as 0.464 and not
+	0.463999986649. The decimal is computed once per distinct weight.
+	"""
+
+	weights = numpy.asarray(weights)
+	if weights.dtype != WEIGHT or len(weights) == 0:
+		return weights.tolist()
+	values, inverse = numpy.unique(weights, return_inverse=True)
+	return values.astype(str).astype(numpy.float64)[inverse].tolist()
+
 def create_bipartite_graph(vertices, edges, weights=None):
 
 	# edge_attrs={'weight': weights}
-	graph = MGraph(sum(vertices), list(edges))
+	# igraph reads a (edges x 2) numpy array without converting it to a list
+	if not isinstance(edges, numpy.ndarray):
+		edges = list(edges)
+	graph = MGraph(sum(vertices), edges)
 	if weights is None:
 		weights = 1
 	graph.es['weight'] = weights
@@ -32,35 +57,205 @@ def create_bipartite_graph(vertices, edges, weights=None):
 	graph.vs['type'] = types
 	graph.vs['name'] = range(graph.vcount())
 	graph.vs['successor'] = [None] * graph.vcount()
-	for v in graph.vs():
-		v['source'] = [v.index]
-		v['predecessor'] = [v.index]
+	graph['lineage'] = Lineage.identity(graph.vcount())
 	graph['adjlist'] = map(set, graph.get_adjlist())
 	graph['vertices'] = vertices
 	graph['layers'] = len(vertices)
 	graph['similarity'] = None
+	graph['twohop'] = None
 	# Not allow direct graphs
 	if graph.is_directed():
 		graph.to_undirected(combine_edges=None)
 
 	return graph
 
-def load(filename, vertices):
+def parse_ncol(block, columns=None):
 	"""
-	Load ncol npartite graph and generate special attributes
+	Parse a block of whole ncol lines into a (lines x 2) int32 array of
+	vertex ids and, if there is a third column, a float32 array of weights.
+	Unweighted blocks are parsed as int32; weighted ones as float64, which
+	is exact for the ids, and converted at once, so only a block is held in
+	float64.
 	"""
 
-	data = numpy.loadtxt(filename, skiprows=0, dtype='string')
-	dict_edges = dict()
-	for row in data:
-		if len(row) == 3:
-			dict_edges[(int(row[0]), int(row[1]))] = float(row[2])
-		else:
-			dict_edges[(int(row[0]), int(row[1]))] = 1
+	if '#' in block:
+		block = '\n'.join(line.split('#', 1)[0] for line in block.splitlines())
+	if columns is None:
+		for line in block.splitlines():
+			if line.strip():
+				columns = len(line.split())
+				break
+	# numpy.fromstring reads a blank block as [-1]
+	if columns is None or not block.strip():
+		return None, None, columns
+	values = numpy.fromstring(block, dtype=numpy.int32 if columns == 2 else numpy.float64, sep=' ')
+	if len(values) % columns:
+		raise ValueError('Malformed ncol: all lines must have ' + str(columns) + ' columns')
+	values = values.reshape(-1, columns)
+	ids = values[:, :2].astype(numpy.int32, copy=False)
+	weights = values[:, 2].astype(WEIGHT) if columns > 2 else None
+
+	return ids, weights, columns
+
+def combine_edges(rows, cols, weights, n1, combine='last'):
+	"""
+	Merge repeated edges (rows, cols) with the combine rule: sum, max or
+	last, i.e., the last occurrence wins. Edges are sorted by their packed
+	key row * n1 + col, which is only held while sorting.
+	"""
 
-	edges, weights = izip(*dict_edges.items())
+	order = numpy.argsort(rows.astype(numpy.int64) * n1 + cols, kind='mergesort')
+	rows, cols, weights = rows[order], cols[order], weights[order]
+	del order
+	starts = numpy.flatnonzero(numpy.r_[True, (rows[1:] != rows[:-1]) | (cols[1:] != cols[:-1])])
+	if combine == 'sum':
+		weights = numpy.add.reduceat(weights, starts)
+	elif combine == 'max':
+		weights = numpy.maximum.reduceat(weights, starts)
+	else:
+		weights = weights[numpy.r_[starts[1:], len(rows)] - 1]
 
-	return create_bipartite_graph(vertices, edges, weights)
+	return rows[starts], cols[starts], weights
+
+def read_cache(filename, vertices, combine, chunk_size=64):
+	"""
+	Memory-map the binary cache of a ncol, written by read_ncol. The cache
+	is valid if the input has the same size and sha1 digest, which is only
+	computed if the modification time changed, and was read with the same
+	vertices and combine rule. Return None if it is not valid.
+	"""
+
+	directory = filename + '.cache'
+	try:
+		with open(os.path.join(directory, 'meta.json')) as f:
+			meta = json.load(f)
+		stat = os.stat(filename)
+	except (IOError, OSError, ValueError):
+		return None
+	if meta['size'] != stat.st_size or meta['vertices'] != list(vertices[:2]) or meta['combine'] != combine:
+		return None
+	if meta['mtime'] != stat.st_mtime:
+		digest = hashlib.sha1()
+		with open(filename, 'rb') as f:
+			for data in iter(lambda: f.read(int(chunk_size * 1024 * 1024)), ''):
+				digest.update(data)
+		if digest.hexdigest() != meta['sha1']:
+			return None
+		meta['mtime'] = stat.st_mtime
+		try:
+			with open(os.path.join(directory, 'meta.json'), 'w') as f:
+				json.dump(meta, f)
+		except (IOError, OSError):
+			pass
+
+	try:
+		arrays = [numpy.load(os.path.join(directory, name + '.npy'), mmap_mode='r') for name in ['weights', 'indices', 'indptr']]
+	except (IOError, OSError, ValueError):
+		return None
+	# Caches whose indices and indptr dtypes differ would be copied by scipy
+	if arrays[1].dtype != arrays[2].dtype:
+		return None
+
+	return csr_matrix(tuple(arrays), shape=tuple(vertices[:2]), copy=False)
+
+def write_cache(filename, biadjacency, meta):
+	"""
+	Write the arrays of a csr biadjacency and its meta data next to the
+	input, replacing an old cache. Failures are ignored.
+	"""
+
+	directory = filename + '.cache'
+	temporary = directory + '.' + str(os.getpid())
+	try:
+		os.makedirs(temporary)
+		numpy.save(os.path.join(temporary, 'weights.npy'), biadjacency.data)
+		numpy.save(os.path.join(temporary, 'indices.npy'), biadjacency.indices)
+		numpy.save(os.path.join(temporary, 'indptr.npy'), biadjacency.indptr)
+		with open(os.path.join(temporary, 'meta.json'), 'w') as f:
+			json.dump(meta, f)
+		if os.path.exists(directory):
+			shutil.rmtree(directory)
+		os.rename(temporary, directory)
+	except (IOError, OSError):
+		shutil.rmtree(temporary, ignore_errors=True)
+
+def read_ncol(filename, vertices, chunk_size=64, combine='last', cache=False):
+	"""
+	Read a bipartite ncol in chunks of chunk_size megabytes into a n0 x n1
+	csr biadjacency. Edges are kept as int32 row and column arrays and
+	float32 weights, and repeated edges are merged with the combine rule,
+	see combine_edges. If cache, the biadjacency is memory-mapped from a
+	binary cache next to the input, see read_cache, or the cache is
+	written after parsing.
+	"""
+
+	if combine not in ['sum', 'max', 'last']:
+		raise ValueError('Combine rule must be sum, max or last')
+	if cache:
+		biadjacency = read_cache(filename, vertices, combine, chunk_size)
+		if biadjacency is not None:
+			return biadjacency
+	digest = hashlib.sha1()
+	n0, n1 = vertices[0], vertices[1]
+	rows = numpy.empty(0, dtype=numpy.int32)
+	cols = numpy.empty(0, dtype=numpy.int32)
+	weights = numpy.empty(0, dtype=WEIGHT)
+	pending_rows, pending_cols, pending_weights = [], [], []
+	pending, columns, tail = 0, None, ''
+
+	with open(filename, 'rb') as f:
+		while True:
+			data = f.read(int(chunk_size * 1024 * 1024))
+			digest.update(data)
+			block = tail + data
+			tail = ''
+			if data:
+				# Keep the incomplete last line for the next chunk
+				cut = block.rfind('\n') + 1
+				block, tail = block[:cut], block[cut:]
+			ids, chunk_weights, columns = parse_ncol(block, columns)
+			if ids is not None and len(ids) > 0:
+				row = numpy.minimum(ids[:, 0], ids[:, 1])
+				col = numpy.maximum(ids[:, 0], ids[:, 1]) - n0
+				if row.min() < 0 or row.max() >= n0 or col.min() < 0 or col.max() >= n1:
+					raise ValueError('Edges must link vertices 0..n0-1 to vertices n0..n0+n1-1')
+				pending_rows.append(row)
+				pending_cols.append(col)
+				if chunk_weights is None:
+					chunk_weights = numpy.ones(len(ids), dtype=WEIGHT)
+				pending_weights.append(chunk_weights)
+				pending += len(ids)
+			# Merge pending chunks once they are as large as the merged edges
+			if pending > 0 and (pending >= len(rows) or not data):
+				rows, cols, weights = combine_edges(numpy.concatenate([rows] + pending_rows), numpy.concatenate([cols] + pending_cols), numpy.concatenate([weights] + pending_weights), n1, combine)
+				pending_rows, pending_cols, pending_weights, pending = [], [], [], 0
+			if not data:
+				break
+
+	# indices and indptr share a dtype, so scipy keeps them, and their cache, as is
+	index = get_index_dtype(maxval=max(len(rows), n1))
+	indptr = numpy.zeros(n0 + 1, dtype=index)
+	numpy.cumsum(numpy.bincount(rows, minlength=n0), out=indptr[1:])
+	del rows
+
+	biadjacency = csr_matrix((weights, cols.astype(index, copy=False), indptr), shape=(n0, n1), copy=False)
+	if cache:
+		stat = os.stat(filename)
+		meta = dict(size=stat.st_size, mtime=stat.st_mtime, sha1=digest.hexdigest(), vertices=[n0, n1], combine=combine)
+		write_cache(filename, biadjacency, meta)
+
+	return biadjacency
+
+def load(filename, vertices, chunk_size=64, combine='last', cache=False):
+	"""
+	Load ncol npartite graph and generate special attributes
+	"""
+
+	coo = read_ncol(filename, vertices, chunk_size, combine, cache).tocoo()
+	edges = numpy.column_stack((coo.row, coo.col + vertices[0]))
+
+	# Weights are set as a list, so igraph keeps Python floats
+	return create_bipartite_graph(vertices, edges, widen(coo.data))
 
 def load_csr(filename):
 	"""
@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Lineage
+=====================================================
+
+Array based storage of the vertex lineage of a coarsening hierarchy.
+
+Each level keeps only its predecessors, i.e., the vertices of the previous
+level merged into each super-vertex, as CSR-style int32 offsets/indices
+arrays. The original vertices (source) of a super-vertex are expanded
+lazily following the chain of levels.
+
+This file is part of MOB.
+
+MOB is a free software and non-commercial use only: you can be use it for
+creating unlimited applications, distribute in binary or object form only,
+modify source-code and distribute modifications (derivative works). Please,
+giving credit to the author by citing the papers. License will expire in 2018,
+July, and will be renewed.
+
+Owner or contributors are not liable for any direct, indirect, incidental,
+special, exemplary, or consequential damages, (such as loss of data or profits,
+and others) arising in any way out of the use of this software,
+even if advised of the possibility of such damage.
+"""
+
+import numpy
+import contraction
+
+__maintainer__ = 'Alan Valejo'
+__credits__ = ['Alan Valejo', 'Vinicius Ferreira', 'Maria Cristina Ferreira de Oliveira', 'Alneu de Andrade Lopes']
+__homepage__ = 'http://www.alanvalejo.com.br/software?name=MOB'
+__version__ = '0.1'
+__date__ = '2026-10-17'
+
+def ranges(starts, lengths):
+	"""
+	Concatenation of range(start, start + length) for each pair.
+	"""
+
+	lengths = numpy.asarray(lengths, dtype=numpy.int64)
+	shift = numpy.cumsum(lengths) - lengths - numpy.asarray(starts, dtype=numpy.int64)
+	return numpy.arange(lengths.sum()) - numpy.repeat(shift, lengths)
+
+class Lineage(object):
+	"""
+	Predecessors of each vertex of a level: the members of vertex i are
+	indices[offsets[i]:offsets[i + 1]], given as vertex ids of the parent
+	level. The parent lineage is None in the original graph.
+	"""
+
+	def __init__(self, offsets, indices, parent=None):
+		self.offsets = numpy.asarray(offsets, dtype=numpy.int32)
+		self.indices = numpy.asarray(indices, dtype=numpy.int32)
+		self.parent = parent
+		self._flat = None
+
+	@classmethod
+	def identity(cls, size):
+		""" Lineage of the original graph, each vertex is its own source. """
+
+		return cls(numpy.arange(size + 1), numpy.arange(size))
+
+	@classmethod
+	def from_membership(cls, successor, size, parent=None):
+		""" Build the lineage of a coarse level from the successor array. """
+
+		offsets, indices = contraction.groups(numpy.asarray(successor, dtype=numpy.int64), size)
+		return cls(offsets, indices, parent)
+
+	def __len__(self):
+		return len(self.offsets) - 1
+
+	def __getitem__(self, vertex):
+		""" Predecessors of a vertex. """
+
+		return self.indices[self.offsets[vertex]:self.offsets[vertex + 1]]
+
+	def sizes(self):
+		return numpy.diff(self.offsets)
+
+	def expand_many(self, vertices):
+		"""
+		Original vertices of the given vertices, as (offsets, indices)
+		relative to the vertices order.
+		"""
+
+		vertices = numpy.asarray(vertices, dtype=numpy.int64)
+		starts = self.offsets[vertices]
+		lengths = self.offsets[vertices + 1] - starts
+		offsets = numpy.zeros(len(vertices) + 1, dtype=numpy.int64)
+		numpy.cumsum(lengths, out=offsets[1:])
+		indices = self.indices[ranges(starts, lengths)]
+		if self.parent is None:
+			return offsets, indices
+		parent_offsets, parent_indices = self.parent.expand_many(indices)
+
+		return parent_offsets[offsets], parent_indices
+
+	def expand(self, vertex):
+		""" Original vertices (source) of a vertex. """
+
+		if self._flat is not None:
+			return self._flat[vertex]
+		offsets, indices = self.expand_many([vertex])
+		return indices
+
+	def flatten(self):
+		""" Lineage of all vertices expanded to the original vertices. """
+
+		if self.parent is None:
+			return self
+		if self._flat is None:
+			offsets, indices = self.expand_many(numpy.arange(len(self)))
+			self._flat = Lineage(offsets, indices)
+		return self._flat
+
+	def to_strings(self, sep=','):
+		""" One string per vertex with its members joined by sep. """
+
+		indices = self.indices.astype(str)
+		offsets = self.offsets.tolist()
+		return [sep.join(indices[offsets[i]:offsets[i + 1]]) for i in xrange(len(self))]
+
+	def write(self, f, sep=' '):
+		""" Write one line per vertex with its members. """
+
+		for line in self.to_strings(sep):
+			f.write(line + '\n')
@@ -0,0 +1,583 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Matching
+=====================================================
+
+Matching strategies restricted to the two-hopes neighborhood of bipartite
+networks. The strategies are written against a small set of primitives, so
+they are shared by the igraph based MGraph and by the array based BGraph:
+
+	vcount(), degree(vertices), strength(vertices, weights),
+	twohops(vertex), vertex_weights() and graph['similarity'].
+
+This file is part of MOB.
+
+MOB is a free software and non-commercial use only: you can be use it for
+creating unlimited applications, distribute in binary or object form only,
+modify source-code and distribute modifications (derivative works). Please,
+giving credit to the author by citing the papers. License will expire in 2018,
+July, and will be renewed.
+
+Owner or contributors are not liable for any direct, indirect, incidental,
+special, exemplary, or consequential damages, (such as loss of data or profits,
+and others) arising in any way out of the use of this software,
+even if advised of the possibility of such damage.
+"""
+
+import heapq
+import operator
+import numpy
+import random
+import math
+import collections
+import parallel
+
+from twohop import truncate, disparity
+from itertools import izip
+from scipy.sparse import csr_matrix
+__maintainer__ = 'Alan Valejo'
+__credits__ = ['Alan Valejo', 'Vinicius Ferreira', 'Maria Cristina Ferreira de Oliveira', 'Alneu de Andrade Lopes']
+__homepage__ = 'http://www.alanvalejo.com.br/software?name=MOB'
+__version__ = '0.1'
+__date__ = '2026-10-17'
+
+# Number of batches of each sweep of synchronous_mlp
+MLP_BATCHES = 8
+
+class Matching(object):
+
+	def scored_twohops(self, vertex, skip=None, keep=None):
+		"""
+		Pairs (twohop, score) of the two-hopes neighbors of a vertex that
+		are not marked in skip and, if given, for which keep is true, e.g.,
+		a capacity check. Batch similarities give the whole row at once,
+		pairwise similarities are only called for the remaining neighbors.
+		"""
+
+		similarity = self['similarity']
+		if hasattr(similarity, 'row'):
+			twohops, scores = similarity.row(vertex)
+			pairs = izip(twohops.tolist(), scores.tolist())
+			if skip is None and keep is None:
+				return list(pairs)
+			return [(twohop, score) for twohop, score in pairs if (skip is None or skip[twohop] != 1) and (keep is None or keep(twohop))]
+
+		twohops = self.twohops(vertex)
+		if skip is not None:
+			twohops = [twohop for twohop in twohops if skip[twohop] != 1]
+		if keep is not None:
+			twohops = [twohop for twohop in twohops if keep(twohop)]
+		return [(twohop, similarity(vertex, twohop)) for twohop in twohops]
+
+	def gmb(self, matching, vertices=None, reduction_factor=0.5, reverse=True, topk=None):
+		"""
+		Matches are restricted between vertices that are not adjacent
+		but are only allowed to match with neighbors of its neighbors,
+		i.e. two-hopes neighborhood
+		"""
+
+		if topk:
+			return self.bounded_gmb(matching, vertices, reduction_factor, reverse, topk)
+
+		# Search two-hopes neighborhood for each vertex in selected layer
+		dict_edges = dict()
+		visited = [0] * self.vcount()
+		for vertex in vertices:
+			for twohop, score in self.scored_twohops(vertex, skip=visited):
+				dict_edges[(vertex, twohop)] = score
+			visited[vertex] = 1
+
+		# Select promising matches or pair of vertices
+		visited = [0] * self.vcount()
+		edges = sorted(dict_edges.items(), key=operator.itemgetter(1), reverse=reverse)
+		merge_count = int(reduction_factor * len(vertices))
+		for edge, value in edges:
+			vertex = edge[0]
+			neighbor = edge[1]
+			if (visited[vertex] != 1) and (visited[neighbor] != 1):
+				matching[neighbor] = vertex
+				matching[vertex] = vertex
+				visited[neighbor] = 1
+				visited[vertex] = 1
+				merge_count -= 1
+			if merge_count == 0:
+				break
+
+	def bounded_gmb(self, matching, vertices, reduction_factor=0.5, reverse=True, topk=8):
+		"""
+		gmb with memory bounded by the number of vertices times topk: only
+		the topk best two-hopes neighbors of each vertex are kept, selected
+		with a heap, as a sorted run of fixed-size arrays. The greedy pass is
+		a k-way merge of the runs, with a heap holding the head of each run
+		and skipping candidates already matched.
+		"""
+
+		size = len(vertices)
+		candidates = numpy.full((size, topk), -1, dtype=numpy.int64)
+		keys = numpy.zeros((size, topk), dtype=numpy.float64)
+		# Best first in a min-heap: negated scores if reverse
+		sign = -1.0 if reverse else 1.0
+		for row, vertex in enumerate(vertices):
+			best = heapq.nsmallest(topk, ((sign * score, twohop) for twohop, score in self.scored_twohops(vertex)))
+			for column, (key, twohop) in enumerate(best):
+				candidates[row, column] = twohop
+				keys[row, column] = key
+		candidates, keys = candidates.tolist(), keys.tolist()
+
+		heap = [(keys[row][0], vertex, row, 0) for row, vertex in enumerate(vertices) if candidates[row][0] >= 0]
+		heapq.heapify(heap)
+		visited = [0] * self.vcount()
+		merge_count = int(reduction_factor * size)
+		while heap and merge_count > 0:
+			key, vertex, row, column = heapq.heappop(heap)
+			if visited[vertex] == 1:
+				continue
+			neighbor = candidates[row][column]
+			if visited[neighbor] != 1:
+				matching[neighbor] = vertex
+				matching[vertex] = vertex
+				visited[neighbor] = 1
+				visited[vertex] = 1
+				merge_count -= 1
+				continue
+			# Next candidate of the run
+			column += 1
+			if column < topk and candidates[row][column] >= 0:
+				heapq.heappush(heap, (keys[row][column], vertex, row, column))
+
+	def rgmb(self, matching, vertices=None, reduction_factor=0.5, seed_priority='random', workers=1):
+		"""
+		Matches are restricted between vertices that are not adjacent
+		but are only allowed to match with neighbors of its neighbors,
+		i.e. two-hopes neighborhood. This version use a random seed.
+		"""
+
+		# Select seed set expansion
+		if seed_priority == 'strength':
+			vertices_score = numpy.array(self.strength(vertices, weights='weight'))
+			vertices_id = numpy.argsort(vertices_score)[::-1]
+		if seed_priority == 'degree':
+			vertices_score = numpy.array(self.degree(vertices))
+			vertices_id = numpy.argsort(vertices_score)[::-1]
+		if seed_priority == 'random':
+			vertices_id = vertices
+			vertices_id = random.sample(vertices_id, len(vertices_id))
+
+		if workers > 1:
+			self.parallel_rgmb(matching, list(vertices_id), int(reduction_factor * len(vertices)), workers)
+			return
+
+		# Find the matching
+		visited = [0] * self.vcount()
+		index = 0
+		merge_count = int(reduction_factor * len(vertices))
+		while merge_count > 0 and index < len(vertices):
+			# Randomly select a vertex v of V
+			vertex = vertices_id[index]
+			if visited[vertex] == 1:
+				index += 1
+				continue
+			# Select the edge (v, u) of E wich maximum score
+			# Tow hopes restriction: It ensures that the match only occurs
+			# between vertices of the same type
+			_max = 0.0
+			neighbor = vertex
+			for twohop, score in self.scored_twohops(vertex, skip=visited):
+				if score > _max:
+					_max = score
+					neighbor = twohop
+			matching[neighbor] = vertex
+			matching[vertex] = vertex
+			visited[neighbor] = 1
+			visited[vertex] = 1
+			merge_count -= 1
+			index += 1
+
+	def parallel_rgmb(self, matching, vertices_id, merge_count, workers):
+		"""
+		Parallel version of rgmb, see parallel module. A candidate is
+		invalid if it was visited earlier in the same round.
+		"""
+
+		if not vertices_id:
+			return
+		# Build lazy indexes and similarities before forking the workers
+		if parallel.executor is None:
+			self.scored_twohops(vertices_id[0])
+		visited = parallel.array('visited', self.vcount(), 'b')
+		pool = parallel.pool(workers, graph=self, visited=visited)
+		active = vertices_id
+		while merge_count > 0 and active:
+			proposals = parallel.propose(pool, workers, parallel.propose_rgmb, active)
+			retry = []
+			for vertex, candidates in izip(active, proposals):
+				if visited[vertex] == 1:
+					continue
+				neighbor = next((twohop for twohop in candidates if visited[twohop] != 1), None)
+				if neighbor is None:
+					if len(candidates) == parallel.CANDIDATES:
+						retry.append(vertex)
+						continue
+					neighbor = vertex
+				matching[neighbor] = vertex
+				matching[vertex] = vertex
+				visited[neighbor] = 1
+				visited[vertex] = 1
+				merge_count -= 1
+				if merge_count == 0:
+					break
+			active = retry
+		pool.close()
+		pool.join()
+
+	def nmlp(self, matching, vertices=None, reduction_factor=0.5, seed_priority='degree', upper_bound=1.4, n=None, global_min_vertices=None, reverse=True, workers=1):
+		"""
+		Naive matching via weight-constrained label propagation and neigborhood.
+		"""
+
+		# Select seed set expansion
+		if seed_priority == 'strength':
+			vertices_score = self.strength(vertices, weights='weight')
+			dictionary = dict(zip(vertices, vertices_score))
+			vertices_id = sorted(dictionary, key=dictionary.__getitem__, reverse=reverse)
+		if seed_priority == 'degree':
+			vertices_score = self.degree(vertices)
+			dictionary = dict(zip(vertices, vertices_score))
+			vertices_id = sorted(dictionary, key=dictionary.__getitem__, reverse=reverse)
+		if seed_priority == 'random':
+			vertices_id = random.sample(vertices, len(vertices))
+
+		min_vertices = int((1 - reduction_factor) * len(vertices))
+		if global_min_vertices is not None and global_min_vertices > min_vertices:
+			if global_min_vertices >= len(vertices):
+				return
+			min_vertices = global_min_vertices
+		if min_vertices < 1:
+			min_vertices = 1
+
+		max_size = int(math.ceil((upper_bound * n) / min_vertices))
+		if workers > 1:
+			self.parallel_nmlp(matching, vertices_id, min_vertices, max_size, workers)
+			return
+
+		number_of_vertices = len(vertices)
+		visited = [0] * self.vcount()
+		weight = self.vertex_weights()
+		weight_of_sv = self.vertex_weights()
+
+		for vertex in vertices_id:
+			if visited[vertex] == 1:
+				continue
+			# Tow hopes restriction: It ensures that the match only occurs
+			# between vertices of the same type
+			# Select the edge (v, u) of E wich maximum score via neigborhood
+			# Find the best twohop neighbor
+			_max = 0.0
+			neighbor = vertex
+			fits = lambda twohop: weight_of_sv[matching[twohop]] + weight[vertex] <= max_size
+			for twohop, score in self.scored_twohops(vertex, keep=fits):
+				if (score > _max):
+					_max = score
+					neighbor = twohop
+			# If a neighbor was fund, match them togheter
+			if (vertex != neighbor) and (matching[vertex] != matching[neighbor]):
+				if visited[neighbor] == 1:
+					weight_of_sv[matching[neighbor]] += weight[vertex]
+					weight_of_sv[matching[vertex]] -= weight[vertex]
+					matching[vertex] = matching[neighbor]
+				else:
+					weight_of_sv[matching[vertex]] += weight[vertex]
+					weight_of_sv[matching[neighbor]] -= weight[vertex]
+					matching[neighbor] = matching[vertex]
+				number_of_vertices -= 1
+				visited[vertex] = visited[neighbor] = 1
+				if number_of_vertices <= min_vertices:
+					break
+
+	def parallel_nmlp(self, matching, vertices_id, min_vertices, max_size, workers):
+		"""
+		Parallel version of nmlp, see parallel module. A candidate is
+		invalid if its super-vertex can no longer receive the vertex.
+		"""
+
+		if not vertices_id:
+			return
+		# Build lazy indexes and similarities before forking the workers
+		if parallel.executor is None:
+			self.scored_twohops(vertices_id[0])
+		number_of_vertices = len(vertices_id)
+		weight = self.vertex_weights()
+		weight_of_sv = parallel.array('weight_of_sv', weight, 'd')
+		shared_weight = parallel.array('weight', weight, 'd')
+		visited = [0] * self.vcount()
+		pool = parallel.pool(workers, graph=self, matching=matching, weight_of_sv=weight_of_sv, weight=shared_weight, max_size=max_size)
+		active = list(vertices_id)
+		while active:
+			proposals = parallel.propose(pool, workers, parallel.propose_nmlp, active)
+			retry = []
+			for vertex, candidates in izip(active, proposals):
+				if visited[vertex] == 1:
+					continue
+				neighbor = next((twohop for twohop in candidates if weight_of_sv[matching[twohop]] + weight[vertex] <= max_size), None)
+				if neighbor is None:
+					if len(candidates) == parallel.CANDIDATES:
+						retry.append(vertex)
+					continue
+				if matching[vertex] == matching[neighbor]:
+					continue
+				if visited[neighbor] == 1:
+					weight_of_sv[matching[neighbor]] += weight[vertex]
+					weight_of_sv[matching[vertex]] -= weight[vertex]
+					matching[vertex] = matching[neighbor]
+				else:
+					weight_of_sv[matching[vertex]] += weight[vertex]
+					weight_of_sv[matching[neighbor]] -= weight[vertex]
+					matching[neighbor] = matching[vertex]
+				number_of_vertices -= 1
+				visited[vertex] = visited[neighbor] = 1
+				if number_of_vertices <= min_vertices:
+					retry = []
+					break
+			active = retry
+		pool.close()
+		pool.join()
+
+	def mlp(self, membership, vertices=None, seed_priority='random', reduction_factor=0.5, itr=10, tolerance=0.05, upper_bound=0.2, n=None, global_min_vertices=None, reverse=True, synchronous=False):
+		"""
+		Naive matching via weight-constrained label propagation and neigborhood.
+		"""
+		if global_min_vertices:
+			min_vertices = global_min_vertices
+		else:
+			min_vertices = int((1 - reduction_factor) * len(vertices))
+		if min_vertices < 1:
+			min_vertices = 1
+
+		max_size = int(math.ceil(((1.0 + upper_bound) * n) / min_vertices))
+		if synchronous:
+			return self.synchronous_mlp(membership, vertices, min_vertices, max_size, seed_priority, itr, tolerance, reverse)
+		number_of_vertices = len(vertices)
+		weight = self.vertex_weights()
+		weight_of_sv = self.vertex_weights()
+		degree = self.degree()
+		strength = self.strength()
+		label_dict = dict(zip(vertices, vertices))
+
+		# Select seed set expansion: case of strength or degree seed
+		if seed_priority == 'strength':
+			vertices_score = numpy.array(self.strength(vertices, weights='weight'))
+			dictionary = dict(zip(vertices, vertices_score))
+			vertices_id = sorted(dictionary, key=dictionary.__getitem__, reverse=reverse)
+		if seed_priority == 'degree':
+			vertices_score = numpy.array(self.degree(vertices))
+			dictionary = dict(zip(vertices, vertices_score))
+			vertices_id = sorted(dictionary, key=dictionary.__getitem__, reverse=reverse)
+
+		tolerance = tolerance * len(vertices)
+		swap = tolerance + 1
+		while (tolerance < swap) and (itr):
+			swap = 0
+			itr -= 1
+
+			# Select seed set expansion: case of random seed
+			if seed_priority == 'random':
+				vertices_id = vertices
+				vertices_id = random.sample(vertices_id, len(vertices_id))
+
+			for vertex in vertices_id:
+
+				if degree[vertex] == 0:
+					continue
+
+				# Update neigborhood edge density
+				# Tow hopes restriction: It ensures that the match only occurs
+				# between vertices of the same type
+				Q = collections.defaultdict(float)
+				fits = lambda neighbor: weight_of_sv[label_dict[neighbor]] + weight[vertex] <= max_size
+				for neighbor, score in self.scored_twohops(vertex, keep=fits):
+					if score > 0.0:
+						Q[label_dict[neighbor]] += score
+
+				for li in Q.keys():
+					Q[li] = (Q[li] - strength[vertex])
+
+				if Q:
+					# Select the dominant label
+					dominant_label = max(Q.iteritems(), key=operator.itemgetter(1))[0]
+					prev_label = label_dict[vertex]
+					# If a dominant label was fund, match them togheter
+					# and update data structures
+					if dominant_label != prev_label:
+						swap += 1
+						# Update vertex label
+						label_dict[vertex] = dominant_label
+						# Update the super-vertex weight
+						weight_of_sv[prev_label] -= weight[vertex]
+						weight_of_sv[dominant_label] += weight[vertex]
+						# Vertify the size-constraint restriction
+						if weight_of_sv[prev_label] == 0:
+							number_of_vertices -= 1
+						if number_of_vertices <= min_vertices:
+							tolerance = swap
+							break
+
+		for key, value in label_dict.iteritems():
+			membership[key] = value
+
+	def similarity_matrix(self, vertices):
+		"""
+		Sparse matrix with the positive scores of the two-hopes pairs of the
+		vertices, in local ids, i.e., positions in vertices.
+		"""
+
+		similarity = self['similarity']
+		# Whole layers of batch similarities are already a sparse product
+		if hasattr(similarity, 'scores') and len(vertices) > 0:
+			layer = similarity.index.layer_of(vertices[0])
+			matrix = similarity.scores(layer)
+			if list(vertices) == range(similarity.start[layer], similarity.start[layer] + matrix.shape[0]):
+				positive = matrix.copy()
+				positive.data[positive.data < 0.0] = 0.0
+				positive.eliminate_zeros()
+				return positive
+
+		local = numpy.full(self.vcount(), -1, dtype=numpy.int64)
+		local[vertices] = numpy.arange(len(vertices))
+		if hasattr(similarity, 'row'):
+			rows = [similarity.row(vertex) for vertex in vertices]
+			sizes = [len(twohops) for twohops, scores in rows]
+			cols = numpy.concatenate([twohops for twohops, scores in rows] + [numpy.zeros(0, dtype=numpy.int64)])
+			data = numpy.concatenate([scores for twohops, scores in rows] + [numpy.zeros(0)])
+			rows = numpy.repeat(numpy.arange(len(vertices)), sizes)
+		else:
+			rows, cols, data = [], [], []
+			for row, vertex in enumerate(vertices):
+				for twohop, score in self.scored_twohops(vertex):
+					rows.append(row)
+					cols.append(twohop)
+					data.append(score)
+		cols = local[numpy.array(cols, dtype=numpy.int64)]
+		rows, data = numpy.array(rows, dtype=numpy.int64), numpy.array(data, dtype=numpy.float64)
+		inside = (cols >= 0) & (data > 0.0)
+
+		return csr_matrix((data[inside], (rows[inside], cols[inside])), shape=(len(vertices), len(vertices)))
+
+	def synchronous_mlp(self, membership, vertices, min_vertices, max_size, seed_priority='random', itr=10, tolerance=0.05, reverse=True):
+		"""
+		Semi-synchronous mlp. Each sweep splits the vertices in batches and
+		the label scores of a whole batch are the sparse product of its rows
+		of the similarity matrix and the label-indicator matrix. Each vertex
+		of the batch takes its dominant label among those with capacity, as
+		in mlp. Moves are conflict-free, i.e., a label does not receive and
+		lose vertices in the same batch, and moves into a label are accepted
+		by decreasing score while the super-vertex weight stays within
+		max_size. The number of super-vertices is checked after each batch.
+		"""
+
+		vertices = list(vertices)
+		size = len(vertices)
+		similarity = self.similarity_matrix(vertices)
+		weight = numpy.asarray(self.vertex_weights(), dtype=numpy.float64)[vertices]
+		label = numpy.arange(size)
+		weight_of_sv = weight.copy()
+		number_of_vertices = size
+
+		if seed_priority == 'strength':
+			order = numpy.argsort(numpy.array(self.strength(vertices, weights='weight')), kind='mergesort')
+		if seed_priority == 'degree':
+			order = numpy.argsort(numpy.array(self.degree(vertices)), kind='mergesort')
+		if seed_priority in ['strength', 'degree'] and reverse:
+			order = order[::-1]
+
+		tolerance = tolerance * size
+		swap = tolerance + 1
+		while (tolerance < swap) and (itr) and number_of_vertices > min_vertices:
+			swap = 0
+			itr -= 1
+			if seed_priority == 'random':
+				order = numpy.random.permutation(size)
+			for batch in numpy.array_split(order, min(MLP_BATCHES, size)):
+				indicator = csr_matrix((numpy.ones(size), (numpy.arange(size), label)), shape=(size, size))
+				scores = (similarity[batch] * indicator).tocoo()
+				rows, labels, data = scores.row, scores.col, scores.data
+				# Capacity of each candidate label, as in mlp
+				valid = (data > 0.0) & (weight_of_sv[labels] + weight[batch[rows]] <= max_size)
+				rows, labels, data = rows[valid], labels[valid], data[valid]
+				if len(rows) == 0:
+					continue
+				# Dominant label of each row, ties broken by the smallest label
+				grouped = numpy.lexsort((labels, -data, rows))
+				rows, labels, data = rows[grouped], labels[grouped], data[grouped]
+				first = numpy.r_[True, rows[1:] != rows[:-1]]
+				moving, target, gain = batch[rows[first]], labels[first], data[first]
+				changed = label[moving] != target
+				moving, target, gain = moving[changed], target[changed], gain[changed]
+				# Conflict-free moves: a label either receives or loses vertices,
+				# depending on whether its best move is incoming or outgoing
+				rank = numpy.empty(len(moving), dtype=numpy.int64)
+				rank[numpy.lexsort((moving, -gain))] = numpy.arange(len(moving))
+				best_out = numpy.full(size, len(moving), dtype=numpy.int64)
+				best_in = numpy.full(size, len(moving), dtype=numpy.int64)
+				numpy.minimum.at(best_out, label[moving], rank)
+				numpy.minimum.at(best_in, target, rank)
+				receiver = best_in < best_out
+				free = receiver[target] & ~receiver[label[moving]]
+				moving, target, rank = moving[free], target[free], rank[free]
+				# Moves into a label by decreasing score, while it fits
+				accepted = numpy.lexsort((rank, target))
+				moving, target = moving[accepted], target[accepted]
+				added = numpy.cumsum(weight[moving])
+				starts = numpy.r_[True, target[1:] != target[:-1]]
+				offset = numpy.maximum.accumulate(numpy.where(starts, added - weight[moving], 0.0))
+				fits = weight_of_sv[target] + added - offset <= max_size
+				moving, target, rank = moving[fits], target[fits], rank[accepted][fits]
+				# Each move empties at most one label, so the best moves are kept
+				# to not go below min_vertices
+				if len(moving) > number_of_vertices - min_vertices:
+					best = numpy.argsort(rank)[:number_of_vertices - min_vertices]
+					moving, target = moving[best], target[best]
+				numpy.subtract.at(weight_of_sv, label[moving], weight[moving])
+				numpy.add.at(weight_of_sv, target, weight[moving])
+				label[moving] = target
+				swap += len(moving)
+				number_of_vertices = numpy.count_nonzero(weight_of_sv)
+				if number_of_vertices <= min_vertices:
+					break
+
+		vertices = numpy.array(vertices)
+		membership_values = vertices[label]
+		for vertex, value in izip(vertices.tolist(), membership_values.tolist()):
+			membership[vertex] = value
+
+	def sparse_projection(self, vertices, topk=None, threshold=None, significance=None):
+		"""
+		Weighted one-mode projection of the vertices built from the sparse
+		similarity matrix of the layer, keeping only the links with score
+		above threshold, among the topk strongest of an endpoint, or in the
+		disparity backbone of an endpoint at the given significance level.
+		"""
+
+		from mob import MGraph
+
+		matrix = self.similarity_matrix(vertices)
+		if threshold is not None:
+			matrix.data[matrix.data < threshold] = 0.0
+			matrix.eliminate_zeros()
+		if topk is not None:
+			matrix = truncate(matrix, topk)
+		if significance is not None:
+			matrix = disparity(matrix, significance)
+		# A link is kept if an endpoint keeps it
+		matrix = matrix.maximum(matrix.T).tocoo()
+		upper = matrix.row < matrix.col
+
+		graph = MGraph()
+		graph.add_vertices(len(vertices))
+		graph.vs['name'] = list(vertices)
+		if upper.any():
+			graph.add_edges(zip(matrix.row[upper].tolist(), matrix.col[upper].tolist()))
+			graph.es['weight'] = matrix.data[upper].tolist()
+
+		return graph
@@ -26,16 +26,16 @@ and others) arising in any way out of the use of this software,
 even if advised of the possibility of such damage.
 """
 
-import operator
 import numpy
-import random
-import math
-import collections
 import igraph
+import parallel
+import contraction
 
-from itertools import izip
-from random import sample
+from lineage import Lineage
+from matching import Matching
+from itertools import izip, chain
 from igraph import Graph
+from scipy.sparse import csr_matrix
 
 __maintainer__ = 'Alan Valejo'
 __author__ = 'Alan Valejo'
@@ -45,12 +45,44 @@ __homepage__ = 'http://www.alanvalejo.com.br/software?name=MOB'
 __version__ = '0.1'
 __date__ = '2016-12-01'
 
-class MGraph(Graph):
+# Number of edges converted to lists at a time by scan_edges
+SCAN_CHUNK = 1 << 20
+
+class MGraph(Graph, Matching):
 
 	def __init__(self, *args, **kwargs):
 
 		super(Graph, self).__init__(*args, **kwargs)
 
+	def twohops(self, vertex):
+		"""
+		Two-hopes neighborhood of a vertex, i.e., vertices of the same type
+		that share at least one neighbor with it
+		"""
+
+		if self['twohop'] is not None:
+			return self['twohop'].twohops(vertex)
+		neighborhood = self.neighborhood(vertices=vertex, order=2)
+		return neighborhood[(len(self['adjlist'][vertex]) + 1):]
+
+	def vertex_weights(self):
+		"""
+		List with the weight of each vertex
+		"""
+
+		return self.vs['weight']
+
+	def biadjacency(self):
+		"""
+		Weighted n0 x n1 biadjacency as scipy.sparse.csr_matrix
+		"""
+
+		n0, n1 = self['vertices']
+		edges = numpy.array(self.get_edgelist(), dtype=numpy.int64).reshape(-1, 2)
+		rows = edges.min(axis=1)
+		cols = edges.max(axis=1) - n0
+		return csr_matrix((numpy.array(self.es['weight']), (rows, cols)), shape=(n0, n1))
+
 	def contract(self, matching):
 		"""
 		Create coarse graph from matching of groups
@@ -61,8 +93,6 @@ class MGraph(Graph):
 		weights = []
 		matching = numpy.array(matching)
 		uniqid = 0
-		source = {}
-		predecessor = {}
 		attrs = set(self.vs.attributes()) - set(['predecessor', 'id', 'successor', 'weight', 'name', 'type', 'source'])
 		nan = []
 		for attr in attrs:
@@ -82,15 +112,10 @@ class MGraph(Graph):
 				vertices = numpy.where(matching_line == cluster_id)[0]
 				weight = 0
 				attr_aux = [-1] * attr_size
-				if len(vertices) > 0:
-					source[uniqid] = []
-					predecessor[uniqid] = []
 				for vertex in vertices:
 					vertex = vertex + start
 					self.vs[vertex]['successor'] = uniqid
 					weight += self.vs[vertex]['weight']
-					source[uniqid].extend(self.vs[vertex]['source'])
-					predecessor[uniqid].append(vertex)
 					for idx, attr in enumerate(attrs):
 						if self.vs[vertex][attr] is not None:
 							attr_aux[idx] += int(self.vs[vertex][attr])
@@ -113,12 +138,10 @@ class MGraph(Graph):
 		coarse['layers'] = self['layers']
 		coarse['vertices'] = []
 		coarse['similarity'] = None
+		coarse['twohop'] = None
 		for layer in xrange(self['layers']):
 			coarse['vertices'].append(len(coarse.vs.select(type=layer)))
-		for vertex, source in source.iteritems():
-			coarse.vs[vertex]['source'] = source
-		for vertex, predecessor in predecessor.iteritems():
-			coarse.vs[vertex]['predecessor'] = predecessor
+		coarse['lineage'] = Lineage.from_membership(self.vs['successor'], uniqid, self['lineage'])
 
 		# Contract edges
 		dict_edges = dict()
@@ -140,6 +163,45 @@ class MGraph(Graph):
 
 		return coarse
 
+	def contract_sparse(self, matching):
+		"""
+		Create coarse graph from matching of groups using vectorized
+		operations over the membership array: relabel with numpy.unique,
+		sum vertex weights with bincount and merge parallel edges sorting
+		packed 64-bit keys.
+		"""
+
+		# Contract vertices: Referencing the original graph of the coarse graph
+		successor, types = contraction.relabel(matching, self.vs['type'])
+		size = len(types)
+		self.vs['successor'] = successor.tolist()
+		weights = contraction.aggregate(successor, self.vs['weight'], size)
+
+		# Create coarse graph
+		coarse = MGraph()
+		coarse.add_vertices(size)
+		coarse.vs['type'] = types.tolist()
+		coarse.vs['weight'] = weights.tolist()
+		coarse.vs['name'] = range(coarse.vcount())
+		coarse.vs['successor'] = [None] * coarse.vcount()
+		if 'age' in self.vs.attributes():
+			values = [0 if value is None else int(value) for value in self.vs['age']]
+			coarse.vs['age'] = (contraction.aggregate(successor, values, size) - 1).tolist()
+		coarse['layers'] = self['layers']
+		coarse['vertices'] = numpy.bincount(types, minlength=self['layers']).tolist()
+		coarse['similarity'] = None
+		coarse['twohop'] = None
+		coarse['lineage'] = Lineage.from_membership(successor, size, self['lineage'])
+
+		# Contract edges
+		edges, weights = contraction.merge_edges(self.get_edgelist(), self.es['weight'], successor, size)
+		if len(edges) > 0:
+			coarse.add_edges(edges.tolist())
+			coarse.es['weight'] = weights.tolist()
+			coarse['adjlist'] = map(set, coarse.get_adjlist())
+
+		return coarse
+
 	def contract_slow(self, matching):
 		"""
 		Create coarse graph from matching of groups
@@ -148,7 +210,6 @@ class MGraph(Graph):
 		# Contract vertices: Referencing the original graph of the coarse graph
 		types = []
 		weights = []
-		source = []
 		types_size = [0] * len(self['vertices'])
 		cl = igraph.Clustering(matching)
 		cl = filter(None, list(cl))
@@ -156,7 +217,6 @@ class MGraph(Graph):
 			self.vs[vertices]['successor'] = uniqid
 			weights.append(sum(self.vs[vertices]['weight']))
 			types.append(self.vs[vertices]['type'][0])
-			source.append(list(numpy.concatenate(self.vs[vertices]['source'])))
 			types_size[self.vs[vertices]['type'][0]] += 1
 
 		# Create coarse graph
@@ -167,10 +227,10 @@ class MGraph(Graph):
 		coarse.vs['name'] = range(coarse.vcount())
 		coarse.vs['successor'] = [None] * coarse.vcount()
 		coarse['similarity'] = None
+		coarse['twohop'] = None
 		coarse['layers'] = self['layers']
 		coarse['vertices'] = types_size
-		coarse.vs['source'] = source
-		coarse.vs['predecessor'] = cl
+		coarse['lineage'] = Lineage.from_membership(self.vs['successor'], uniqid + 1, self['lineage'])
 
 		# Contract edges
 		dict_edges = dict()
@@ -192,92 +252,6 @@ class MGraph(Graph):
 
 		return coarse
 
-	def gmb(self, matching, vertices=None, reduction_factor=0.5, reverse=True):
-		"""
-		Matches are restricted between vertices that are not adjacent
-		but are only allowed to match with neighbors of its neighbors,
-		i.e. two-hopes neighborhood
-		"""
-
-		# Search two-hopes neighborhood for each vertex in selected layer
-		dict_edges = dict()
-		visited = [0] * self.vcount()
-		for vertex in vertices:
-			neighborhood = self.neighborhood(vertices=vertex, order=2)
-			twohops = neighborhood[(len(self['adjlist'][vertex]) + 1):]
-			for twohop in twohops:
-				if visited[twohop] == 1:
-					continue
-				dict_edges[(vertex, twohop)] = self['similarity'](vertex, twohop)
-			visited[vertex] = 1
-
-		# Select promising matches or pair of vertices
-		visited = [0] * self.vcount()
-		edges = sorted(dict_edges.items(), key=operator.itemgetter(1), reverse=reverse)
-		merge_count = int(reduction_factor * len(vertices))
-		for edge, value in edges:
-			vertex = edge[0]
-			neighbor = edge[1]
-			if (visited[vertex] != 1) and (visited[neighbor] != 1):
-				matching[neighbor] = vertex
-				matching[vertex] = vertex
-				visited[neighbor] = 1
-				visited[vertex] = 1
-				merge_count -= 1
-			if merge_count == 0:
-				break
-
-	def rgmb(self, matching, vertices=None, reduction_factor=0.5, seed_priority='random'):
-		"""
-		Matches are restricted between vertices that are not adjacent
-		but are only allowed to match with neighbors of its neighbors,
-		i.e. two-hopes neighborhood. This version use a random seed.
-		"""
-
-		# Select seed set expansion
-		if seed_priority == 'strength':
-			vertices_score = numpy.array(self.strength(vertices, weights='weight'))
-			vertices_id = numpy.argsort(vertices_score)[::-1]
-		if seed_priority == 'degree':
-			vertices_score = numpy.array(self.degree(vertices))
-			vertices_id = numpy.argsort(vertices_score)[::-1]
-		if seed_priority == 'random':
-			vertices_id = vertices
-			vertices_id = random.sample(vertices_id, len(vertices_id))
-
-		# Find the matching
-		visited = [0] * self.vcount()
-		index = 0
-		merge_count = int(reduction_factor * len(vertices))
-		while merge_count > 0 and index < len(vertices):
-			# Randomly select a vertex v of V
-			vertex = vertices_id[index]
-			if visited[vertex] == 1:
-				index += 1
-				continue
-			# Select the edge (v, u) of E wich maximum score
-			# Tow hopes restriction: It ensures that the match only occurs
-			# between vertices of the same type
-			neighborhood = self.neighborhood(vertices=vertex, order=2)
-			twohops = neighborhood[(len(self['adjlist'][vertex]) + 1):]
-			# twohops = set((twohop for onehop in self['adjlist'][vertex] for twohop in self['adjlist'][onehop])) - set([vertex])
-			_max = 0.0
-			neighbor = vertex
-			for twohop in twohops:
-				if visited[twohop] == 1:
-					continue
-				# Calling a function of a module from a string
-				score = self['similarity'](vertex, twohop)
-				if score > _max:
-					_max = score
-					neighbor = twohop
-			matching[neighbor] = vertex
-			matching[vertex] = vertex
-			visited[neighbor] = 1
-			visited[vertex] = 1
-			merge_count -= 1
-			index += 1
-
 	def rm(self, matching, reduction_factor=0.5):
 		"""
 		Random Matching: Select a maximal matching using a
@@ -305,25 +279,40 @@ class MGraph(Graph):
 		merge_count = int(reduction_factor * self.vcount())
 		return self.get_sorted_edges(merge_count, matching)
 
+	def ldrm(self, matching, reduction_factor=0.5, workers=1):
+		"""
+		Locally-dominant Random Matching: rm computed in rounds of mutual
+		pointers, with random edge priorities, see get_dominant_edges.
+		"""
+
+		merge_count = int(reduction_factor * self.vcount())
+		return self.get_dominant_edges(merge_count, matching, weight=numpy.random.permutation(self.ecount()), workers=workers)
+
+	def ldlem(self, matching, reduction_factor=0.5, workers=1):
+		"""
+		Locally-dominant Light Edge Matching: lem computed in rounds of
+		mutual pointers, see get_dominant_edges.
+		"""
+
+		merge_count = int(reduction_factor * self.vcount())
+		return self.get_dominant_edges(merge_count, matching, reverse=False, workers=workers)
+
+	def ldhem(self, matching, reduction_factor=0.5, workers=1):
+		"""
+		Locally-dominant Heavy Edge Matching: hem computed in rounds of
+		mutual pointers, see get_dominant_edges.
+		"""
+
+		merge_count = int(reduction_factor * self.vcount())
+		return self.get_dominant_edges(merge_count, matching, workers=workers)
+
 	def get_random_edges(self, merge_count, matching):
 		"""
 		Return a random independent edge set in a graph, i.e., is a set
 		of edges without common vertices random selected.
 		"""
 
-		visited = [0] * self.vcount()
-		edges = sample(self.es(), self.ecount())
-		for edge in edges:
-			if (visited[edge.tuple[0]] == 0) and (visited[edge.tuple[1]] == 0):
-				u = self.vs[edge.tuple[0]]['name']
-				v = self.vs[edge.tuple[1]]['name']
-				matching[u] = u
-				matching[v] = u
-				visited[edge.tuple[1]] = 1
-				visited[edge.tuple[0]] = 1
-				merge_count -= 1
-			if merge_count == 0:
-				break
+		return self.scan_edges(numpy.random.permutation(self.ecount()), merge_count, matching)
 
 	def get_sorted_edges(self, merge_count, matching, reverse=True):
 		"""
@@ -332,19 +321,138 @@ class MGraph(Graph):
 		minimizes the cut.
 		"""
 
-		visited = [0] * self.vcount()
-		edges = sorted(self.es(), key=lambda edge: edge['weight'], reverse=reverse)
-		for edge in edges:
-			if (visited[edge.tuple[0]] == 0) and (visited[edge.tuple[1]] == 0):
-				u = self.vs[edge.tuple[0]]['name']
-				v = self.vs[edge.tuple[1]]['name']
-				matching[u] = u
-				matching[v] = u
-				visited[edge.tuple[1]] = 1
-				visited[edge.tuple[0]] = 1
-				merge_count -= 1
-			if merge_count == 0:
+		edges, weight = self.edge_arrays()
+		if reverse:
+			weight = -weight
+		return self.scan_edges(numpy.argsort(weight, kind='mergesort'), merge_count, matching, edges)
+
+	def edge_arrays(self):
+		"""
+		Edges as a m x 2 int32 array and their weights as a float64 array
+		"""
+
+		edges = numpy.fromiter(chain.from_iterable(self.get_edgelist()), dtype=numpy.int32, count=2 * self.ecount()).reshape(-1, 2)
+		weight = numpy.fromiter(self.es['weight'], dtype=numpy.float64, count=self.ecount())
+
+		return edges, weight
+
+	def scan_edges(self, order, merge_count, matching, edges=None):
+		"""
+		Greedy maximal matching scanning the edges in the given order, a
+		chunk of the edge arrays at a time
+		"""
+
+		if edges is None:
+			edges, _ = self.edge_arrays()
+		name = self.vs['name']
+		visited = bytearray(self.vcount())
+		for start in xrange(0, len(order), SCAN_CHUNK):
+			chunk = order[start:start + SCAN_CHUNK]
+			for u, v in izip(edges[chunk, 0].tolist(), edges[chunk, 1].tolist()):
+				if merge_count <= 0:
+					return
+				if not visited[u] and not visited[v]:
+					matching[name[u]] = name[u]
+					matching[name[v]] = name[u]
+					visited[u] = visited[v] = 1
+					merge_count -= 1
+
+	def get_dominant_edges(self, merge_count, matching, reverse=True, weight=None, workers=1):
+		"""
+		Locally-dominant matching over the edge arrays of the graph, a
+		1/2-approximation of the maximum weight matching, as the greedy
+		get_sorted_edges. In each round every vertex points to its heaviest
+		(or lightest, if not reverse) edge to an unmatched vertex, ties broken
+		by edge id, and edges pointed by both endpoints are matched. Each round
+		is a few passes over the edge arrays, without sorting. Other edge
+		priorities can be given as weight, e.g., random ones. With workers,
+		the pointers of each round are computed in parallel, see
+		parallel_dominant_edges.
+		"""
+
+		if self.ecount() == 0 or merge_count <= 0:
+			return
+		edges, edge_weight = self.edge_arrays()
+		if weight is None:
+			weight = edge_weight
+		weight = numpy.asarray(weight, dtype=numpy.float64)
+		if not reverse:
+			weight = -weight
+		# Each edge is seen from both endpoints, grouped by source vertex
+		ids = numpy.concatenate((numpy.arange(len(edges)), numpy.arange(len(edges))))
+		source = numpy.concatenate((edges[:, 0], edges[:, 1]))
+		order = contraction.group(source, self.vcount())
+		source = source[order]
+		target = numpy.concatenate((edges[:, 1], edges[:, 0]))[order]
+		ids = ids[order]
+		if workers > 1:
+			return self.parallel_dominant_edges(merge_count, matching, edges, weight, source, target, ids, workers)
+		name = self.vs['name']
+		weight = weight[ids]
+		matched = numpy.zeros(self.vcount(), dtype=bool)
+		while merge_count > 0 and len(ids) > 0:
+			starts = numpy.flatnonzero(numpy.r_[True, source[1:] != source[:-1]])
+			sizes = numpy.diff(numpy.r_[starts, len(source)])
+			best = numpy.repeat(numpy.maximum.reduceat(weight, starts), sizes)
+			candidates = numpy.where(weight == best, ids, len(edges))
+			pointer = numpy.repeat(numpy.minimum.reduceat(candidates, starts), sizes)
+			# Edges pointed by both endpoints, taken once from the first one
+			pointed = pointer == ids
+			mutual = numpy.bincount(ids[pointed], minlength=len(edges))
+			selected = pointed & (mutual[ids] == 2) & (source == edges[ids, 0])
+			u, v = source[selected], target[selected]
+			if len(u) > merge_count:
+				heaviest = numpy.argsort(-weight[selected], kind='mergesort')[:merge_count]
+				u, v = u[heaviest], v[heaviest]
+			for vertex, twohop in izip(u.tolist(), v.tolist()):
+				matching[name[vertex]] = name[vertex]
+				matching[name[twohop]] = name[vertex]
+			matched[u] = True
+			matched[v] = True
+			merge_count -= len(u)
+			alive = ~(matched[source] | matched[target])
+			source, target, ids, weight = source[alive], target[alive], ids[alive], weight[alive]
+
+	def parallel_dominant_edges(self, merge_count, matching, edges, weight, source, target, ids, workers):
+		"""
+		Parallel rounds of get_dominant_edges, see parallel module. The
+		grouped edge arrays are published once and, each round, ranges of
+		vertices are split among the workers, which point each vertex to
+		its best edge against the matched vertices of the round start. The
+		master matches the mutual pointers, in vertex order, as the serial
+		rounds, so the result does not depend on the number of workers.
+		"""
+
+		name = self.vs['name']
+		size = len(edges)
+		offsets = numpy.zeros(self.vcount() + 1, dtype=numpy.int64)
+		numpy.cumsum(numpy.bincount(source, minlength=self.vcount()), out=offsets[1:])
+		matched = parallel.array('matched', self.vcount(), 'b')
+		shared = dict(source=source, target=target, ids=ids, weight=weight[ids], offsets=offsets)
+		shared = dict((key, parallel.static(key, value)) for key, value in shared.iteritems())
+		pool = parallel.pool(workers, matched=matched, size=size, **shared)
+		bounds = parallel.ranges(offsets, workers)
+		flags = parallel.view(matched, numpy.int8)
+		while merge_count > 0:
+			pointer = numpy.concatenate(pool.map(parallel.point_dominant, bounds))
+			# Edges pointed by both endpoints, taken once from the first one
+			u = numpy.flatnonzero(pointer < size)
+			u = u[u == edges[pointer[u], 0]]
+			u = u[pointer[edges[pointer[u], 1]] == pointer[u]]
+			if len(u) == 0:
 				break
+			v = edges[pointer[u], 1]
+			if len(u) > merge_count:
+				heaviest = numpy.argsort(-weight[pointer[u]], kind='mergesort')[:merge_count]
+				u, v = u[heaviest], v[heaviest]
+			for vertex, twohop in izip(u.tolist(), v.tolist()):
+				matching[name[vertex]] = name[vertex]
+				matching[name[twohop]] = name[vertex]
+			flags[u] = 1
+			flags[v] = 1
+			merge_count -= len(u)
+		pool.close()
+		pool.join()
 
 	def weighted_one_mode_projection(self, vertices):
 		"""
@@ -361,12 +469,8 @@ class MGraph(Graph):
 		dict_edges = dict()
 		visited = [0] * self.vcount()
 		for vertex in vertices:
-			neighborhood = self.neighborhood(vertices=vertex, order=2)
-			twohops = neighborhood[(len(self['adjlist'][vertex]) + 1):]
-			for twohop in twohops:
-				if visited[twohop] == 1:
-					continue
-				dict_edges[(name_to_id[vertex], name_to_id[twohop])] = self['similarity'](vertex, twohop)
+			for twohop, score in self.scored_twohops(vertex, skip=visited):
+				dict_edges[(name_to_id[vertex], name_to_id[twohop])] = score
 			visited[vertex] = 1
 
 		if len(dict_edges) > 0:
@@ -375,161 +479,3 @@ class MGraph(Graph):
 			graph.es['weight'] = weights
 
 		return graph
-
-	def nmlp(self, matching, vertices=None, reduction_factor=0.5, seed_priority='degree', upper_bound=1.4, n=None, global_min_vertices=None, reverse=True):
-		"""
-		Naive matching via weight-constrained label propagation and neigborhood.
-		"""
-
-		# Select seed set expansion
-		if seed_priority == 'strength':
-			vertices_score = self.strength(vertices, weights='weight')
-			dictionary = dict(zip(vertices, vertices_score))
-			vertices_id = sorted(dictionary, key=dictionary.__getitem__, reverse=reverse)
-		if seed_priority == 'degree':
-			vertices_score = self.degree(vertices)
-			dictionary = dict(zip(vertices, vertices_score))
-			vertices_id = sorted(dictionary, key=dictionary.__getitem__, reverse=reverse)
-		if seed_priority == 'random':
-			vertices_id = random.sample(vertices, len(vertices))
-
-		min_vertices = int((1 - reduction_factor) * len(vertices))
-		if global_min_vertices is not None and global_min_vertices > min_vertices:
-			if global_min_vertices >= len(vertices):
-				return
-			min_vertices = global_min_vertices
-		if min_vertices < 1:
-			min_vertices = 1
-
-		number_of_vertices = len(vertices)
-		visited = [0] * self.vcount()
-		max_size = int(math.ceil((upper_bound * n) / min_vertices))
-		weight_of_sv = self.vs['weight']
-		similarity_dict = collections.defaultdict(float)
-
-		for vertex in vertices_id:
-			if visited[vertex] == 1:
-				continue
-			# Tow hopes restriction: It ensures that the match only occurs
-			# between vertices of the same type
-			neighborhood = self.neighborhood(vertices=vertex, order=2)
-			twohops = neighborhood[(len(self['adjlist'][vertex]) + 1):]
-			# Select the edge (v, u) of E wich maximum score via neigborhood
-			# Find the best twohop neighbor
-			_max = 0.0
-			neighbor = vertex
-			for twohop in twohops:
-				if weight_of_sv[matching[twohop]] + self.vs[vertex]['weight'] <= max_size:
-					if vertex < twohop:
-						u, v = vertex, twohop
-					else:
-						u, v = twohop, vertex
-					if not similarity_dict.get((u, v), False):
-						similarity_dict[(u, v)] = self['similarity'](vertex, twohop)
-					score = similarity_dict[(u, v)]
-					if (score > _max):
-						_max = score
-						neighbor = twohop
-			# If a neighbor was fund, match them togheter
-			if (vertex != neighbor) and (matching[vertex] != matching[neighbor]):
-				if visited[neighbor] == 1:
-					weight_of_sv[matching[neighbor]] += self.vs[vertex]['weight']
-					weight_of_sv[matching[vertex]] -= self.vs[vertex]['weight']
-					matching[vertex] = matching[neighbor]
-				else:
-					weight_of_sv[matching[vertex]] += self.vs[vertex]['weight']
-					weight_of_sv[matching[neighbor]] -= self.vs[vertex]['weight']
-					matching[neighbor] = matching[vertex]
-				number_of_vertices -= 1
-				visited[vertex] = visited[neighbor] = 1
-				if number_of_vertices <= min_vertices:
-					break
-
-	def mlp(self, membership, vertices=None, seed_priority='random', reduction_factor=0.5, itr=10, tolerance=0.05, upper_bound=0.2, n=None, global_min_vertices=None, reverse=True):
-		"""
-		Naive matching via weight-constrained label propagation and neigborhood.
-		"""
-		if global_min_vertices:
-			min_vertices = global_min_vertices
-		else:
-			min_vertices = int((1 - reduction_factor) * len(vertices))
-		if min_vertices < 1:
-			min_vertices = 1
-
-		max_size = int(math.ceil(((1.0 + upper_bound) * n) / min_vertices))
-		number_of_vertices = len(vertices)
-		weight_of_sv = self.vs['weight']
-		label_dict = dict(zip(vertices, vertices))
-		twohops_dict = collections.defaultdict(float)
-		similarity_dict = collections.defaultdict(float)
-
-		# Select seed set expansion: case of strength or degree seed
-		if seed_priority == 'strength':
-			vertices_score = numpy.array(self.strength(vertices, weights='weight'))
-			dictionary = dict(zip(vertices, vertices_score))
-			vertices_id = sorted(dictionary, key=dictionary.__getitem__, reverse=reverse)
-		if seed_priority == 'degree':
-			vertices_score = numpy.array(self.degree(vertices))
-			dictionary = dict(zip(vertices, vertices_score))
-			vertices_id = sorted(dictionary, key=dictionary.__getitem__, reverse=reverse)
-
-		tolerance = tolerance * len(vertices)
-		swap = tolerance + 1
-		while (tolerance < swap) and (itr):
-			swap = 0
-			itr -= 1
-
-			# Select seed set expansion: case of random seed
-			if seed_priority == 'random':
-				vertices_id = vertices
-				vertices_id = random.sample(vertices_id, len(vertices_id))
-
-			for vertex in vertices_id:
-
-				if self.degree(vertex) == 0:
-					continue
-
-				# Tow hopes restriction: It ensures that the match only occurs
-				# between vertices of the same type
-				if not twohops_dict.get(vertex, False):
-					neighborhood = self.neighborhood(vertices=vertex, order=2)
-					twohops_dict[vertex] = neighborhood[(len(self['adjlist'][vertex]) + 1):]
-
-				# Update neigborhood edge density
-				Q = collections.defaultdict(float)
-				for neighbor in twohops_dict[vertex]:
-					if weight_of_sv[label_dict[neighbor]] + self.vs[vertex]['weight'] <= max_size:
-						if vertex < neighbor:
-							u, v = vertex, neighbor
-						else:
-							u, v = neighbor, vertex
-						if not similarity_dict.get((u, v), False):
-							similarity_dict[(u, v)] = self['similarity'](u, v)
-						if similarity_dict[(u, v)] > 0.0:
-							Q[label_dict[neighbor]] += similarity_dict[(u, v)]
-
-				for li in Q.keys():
-					Q[li] = (Q[li] - self.strength(vertex))
-
-				if Q:
-					# Select the dominant label
-					dominant_label = max(Q.iteritems(), key=operator.itemgetter(1))[0]
-					prev_label = label_dict[vertex]
-					# If a dominant label was fund, match them togheter
-					# and update data structures
-					if dominant_label != prev_label:
-						swap += 1
-						# Update vertex label
-						label_dict[vertex] = dominant_label
-						# Update the super-vertex weight
-						weight_of_sv[prev_label] -= self.vs[vertex]['weight']
-						weight_of_sv[dominant_label] += self.vs[vertex]['weight']
-						# Vertify the size-constraint restriction
-						if weight_of_sv[prev_label] == 0:
-							number_of_vertices -= 1
-						if number_of_vertices <= min_vertices:
-							tolerance = swap
-							break
-
-		for key, value in label_dict.iteritems():
-			membership[key] = value
@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Parallel matching
+=====================================================
+
+Intra-layer parallel matching. Each round, the active seed vertices are
+split among workers, which propose the best candidates of each seed
+against the state of the round start. The proposals are then applied in
+seed priority order, taking the first candidate still valid after the
+earlier matches of the round. Seeds whose candidates were all invalidated
+propose again in the next round. Results depend only on the seed order,
+not on the number of workers. Locally-dominant matchings split the pointer
+step of each round over ranges of vertices in the same way.
+
+Workers are forked after the state is published, so the graph is shared
+copy-on-write and the visited, label and super-vertex weight arrays live in
+shared memory, updated by the master between rounds. If a persistent
+WorkerPool is set as executor, its workers are used instead.
+
+This file is part of MOB.
+
+MOB is a free software and non-commercial use only: you can be use it for
+creating unlimited applications, distribute in binary or object form only,
+modify source-code and distribute modifications (derivative works). Please,
+giving credit to the author by citing the papers. License will expire in 2018,
+July, and will be renewed.
+
+Owner or contributors are not liable for any direct, indirect, incidental,
+special, exemplary, or consequential damages, (such as loss of data or profits,
+and others) arising in any way out of the use of this software,
+even if advised of the possibility of such damage.
+"""
+
+import numpy
+import operator
+import multiprocessing
+
+from multiprocessing.sharedctypes import RawArray
+
+__maintainer__ = 'Alan Valejo'
+__credits__ = ['Alan Valejo', 'Vinicius Ferreira', 'Maria Cristina Ferreira de Oliveira', 'Alneu de Andrade Lopes']
+__homepage__ = 'http://www.alanvalejo.com.br/software?name=MOB'
+__version__ = '0.1'
+__date__ = '2026-10-17'
+
+# State seen by the workers, published before they are forked
+state = {}
+# Persistent WorkerPool, see workers module, used instead of forking
+executor = None
+# Number of candidates proposed for each seed
+CANDIDATES = 8
+
+def split(items, parts):
+	""" Split a list in contiguous chunks, a few per worker. """
+
+	size = max(1, -(-len(items) // (parts * 4)))
+	return [items[index:index + size] for index in xrange(0, len(items), size)]
+
+def propose(pool, workers, function, vertices):
+	""" Proposals of all vertices, in the same order. """
+
+	proposals = []
+	for chunk in pool.map(function, split(vertices, workers)):
+		proposals.extend(chunk)
+	return proposals
+
+def propose_rgmb(vertices):
+	"""
+	Best candidates of each vertex: the two-hopes neighbors with positive
+	score not yet visited, by decreasing score.
+	"""
+
+	graph, visited = state['graph'], state['visited']
+	proposals = []
+	for vertex in vertices:
+		pairs = [pair for pair in graph.scored_twohops(vertex, skip=visited) if pair[1] > 0.0]
+		pairs.sort(key=operator.itemgetter(1), reverse=True)
+		proposals.append([twohop for twohop, score in pairs[:CANDIDATES]])
+	return proposals
+
+def propose_nmlp(vertices):
+	"""
+	Best candidates of each vertex: the two-hopes neighbors with positive
+	score whose super-vertex can receive the vertex without exceeding the
+	maximum size, by decreasing score.
+	"""
+
+	graph, matching, weight_of_sv = state['graph'], state['matching'], state['weight_of_sv']
+	weight, max_size = state['weight'], state['max_size']
+	proposals = []
+	for vertex in vertices:
+		fits = lambda twohop: weight_of_sv[matching[twohop]] + weight[vertex] <= max_size
+		pairs = [pair for pair in graph.scored_twohops(vertex, keep=fits) if pair[1] > 0.0]
+		pairs.sort(key=operator.itemgetter(1), reverse=True)
+		proposals.append([twohop for twohop, score in pairs[:CANDIDATES]])
+	return proposals
+
+def ranges(offsets, parts):
+	"""
+	Split the vertices of a grouped edge array, with the given offsets, in
+	contiguous (start, end) ranges with about the same number of edges, a
+	few per worker.
+	"""
+
+	cuts = numpy.searchsorted(offsets, numpy.linspace(0, offsets[-1], parts * 4 + 1))
+	cuts = numpy.unique(numpy.r_[0, cuts, len(offsets) - 1])
+	return zip(cuts[:-1].tolist(), cuts[1:].tolist())
+
+def point_dominant(bounds):
+	"""
+	Pointer of each vertex of a range, see Matching.get_dominant_edges: the
+	id of its highest priority edge to an unmatched vertex, ties broken by
+	the lowest id, or the number of edges if there is none.
+	"""
+
+	start, end = bounds
+	offsets, matched, size = state['offsets'], view(state['matched'], numpy.int8), state['size']
+	begin, finish = offsets[start], offsets[end]
+	source, target = state['source'][begin:finish], state['target'][begin:finish]
+	alive = (matched[source] == 0) & (matched[target] == 0)
+	source, ids, weight = source[alive], state['ids'][begin:finish][alive], state['weight'][begin:finish][alive]
+	pointer = numpy.full(end - start, size, dtype=numpy.int64)
+	if len(source) == 0:
+		return pointer
+	starts = numpy.flatnonzero(numpy.r_[True, source[1:] != source[:-1]])
+	sizes = numpy.diff(numpy.r_[starts, len(source)])
+	best = numpy.repeat(numpy.maximum.reduceat(weight, starts), sizes)
+	candidates = numpy.where(weight == best, ids, size)
+	pointer[source[starts] - start] = numpy.minimum.reduceat(candidates, starts)
+	return pointer
+
+def view(value, dtype):
+	""" Numpy view of a shared array, see array. """
+
+	if isinstance(value, numpy.ndarray):
+		return value
+	return numpy.frombuffer(value, dtype=dtype)
+
+def static(name, values):
+	"""
+	Read-only numpy array seen by the workers: published in the persistent
+	pool if there is one, otherwise inherited by the forked workers.
+	"""
+
+	if executor is not None:
+		return executor.array(name, values, values.dtype)
+	return values
+
+def array(name, initial, typecode):
+	"""
+	Shared array with the size or the values of initial, in the persistent
+	pool if there is one.
+	"""
+
+	if executor is not None:
+		return executor.array(name, initial, numpy.dtype(typecode))
+	return RawArray(typecode, initial)
+
+def pool(workers, **kwargs):
+	"""
+	Publish the state and fork the workers, or open a session in the
+	persistent pool.
+	"""
+
+	if executor is not None:
+		return executor.session(**kwargs)
+	state.clear()
+	state.update(kwargs)
+	return multiprocessing.Pool(workers)
@@ -34,6 +34,9 @@ Required:
 import math
 import numpy
 
+from twohop import pattern
+from scipy.sparse import csr_matrix, diags
+
 __maintainer__ = 'Alan Valejo'
 __author__ = 'Alan Valejo'
 __email__ = 'alanvalejo@gmail.com'
@@ -131,7 +134,7 @@ class Similarity(object):
 		for isect in self.adjlist[i].intersection(self.adjlist[j]):
 			degree = self.graph.degree(isect)
 			if degree != 0:
-				score += 1 / degree
+				score += 1.0 / degree
 		return score
 
 	def sorensen(self, i, j):
@@ -352,3 +355,124 @@ class Similarity(object):
 			return (1.0 / (self.graph.vs[j]['age'] - self.graph.vs[i]['age']))
 		else:
 			return 1.1
+
+class SimilarityMatrix(object):
+	"""
+	Batch version of the similarity measures: scores of all two-hopes pairs
+	of a layer are computed at once from sparse products of the biadjacency,
+	e.g., B * B^T for common neighbors or B * diag(1 / log(degree)) * B^T for
+	adamic adar, and degree normalizations are vector operations. Scores
+	follow the pattern of a TwoHopIndex and each layer is built on first use.
+	"""
+
+	measures = ['common_neighbors', 'weighted_common_neighbors', 'preferential_attachment',
+	'jaccard', 'salton', 'adamic_adar', 'resource_allocation', 'sorensen',
+	'hub_promoted', 'hub_depressed', 'leicht_holme_newman']
+
+	def __init__(self, index, measure):
+		self.index = index
+		self.measure = measure
+		self.start = index.start
+		self.layers = [None, None]
+
+	@classmethod
+	def supports(cls, measure):
+		return measure in cls.measures
+
+	def scores(self, layer):
+		""" Sparse matrix with the scores of the two-hopes pairs of a layer. """
+
+		if self.layers[layer] is None:
+			counts = self.index.counts(layer).tocoo()
+			weighted = csr_matrix(self.index.biadjacency, dtype=numpy.float64)
+			if layer == 1:
+				weighted = weighted.T.tocsr()
+			unweighted = pattern(self.index.biadjacency, layer)
+			self.degree = numpy.asarray(unweighted.sum(axis=1), dtype=numpy.float64).ravel()
+			self.counterpart_degree = numpy.asarray(unweighted.sum(axis=0), dtype=numpy.float64).ravel()
+			self.weighted, self.unweighted, self.layer = weighted, unweighted, layer
+			data = getattr(self, self.measure)(counts.row, counts.col, counts.data.astype(numpy.float64))
+			self.layers[layer] = csr_matrix((data, (counts.row, counts.col)), shape=counts.shape)
+			self.layers[layer].sort_indices()
+			del self.weighted, self.unweighted, self.layer
+		return self.layers[layer]
+
+	def row(self, vertex):
+		""" Two-hopes neighbors of a vertex, as global ids, and their scores. """
+
+		layer = self.index.layer_of(vertex)
+		matrix = self.scores(layer)
+		local = vertex - self.start[layer]
+		begin, end = matrix.indptr[local], matrix.indptr[local + 1]
+
+		return matrix.indices[begin:end] + self.start[layer], matrix.data[begin:end]
+
+	def __call__(self, i, j):
+		""" Score of a single pair, zero if they are not two-hopes neighbors. """
+
+		twohops, scores = self.row(i)
+		position = twohops.searchsorted(j)
+		if position == len(twohops) or twohops[position] != j:
+			return 0.0
+		return scores[position].item()
+
+	def entries(self, matrix, rows, cols):
+		"""
+		Values of a sparse product at the (rows, cols) positions, searching
+		their packed keys row * n + col among the sorted keys of the product.
+		"""
+
+		matrix = csr_matrix(matrix)
+		matrix.sort_indices()
+		width = numpy.int64(matrix.shape[1])
+		keys = numpy.repeat(numpy.arange(matrix.shape[0], dtype=numpy.int64), numpy.diff(matrix.indptr)) * width + matrix.indices
+		wanted = numpy.asarray(rows, dtype=numpy.int64) * width + numpy.asarray(cols, dtype=numpy.int64)
+		position = numpy.minimum(keys.searchsorted(wanted), max(len(keys) - 1, 0))
+		values = numpy.zeros(len(wanted), dtype=numpy.float64)
+		if len(keys) > 0:
+			found = keys[position] == wanted
+			values[found] = matrix.data[position[found]]
+
+		return values
+
+	def common_neighbors(self, rows, cols, isect):
+		return isect
+
+	def weighted_common_neighbors(self, rows, cols, isect):
+		product = self.index.product(self.layer, self.weighted, self.unweighted)
+		return (self.entries(product, rows, cols) + self.entries(product, cols, rows)) / 2.0
+
+	def preferential_attachment(self, rows, cols, isect):
+		return self.degree[rows] * self.degree[cols]
+
+	def jaccard(self, rows, cols, isect):
+		return isect / (self.degree[rows] + self.degree[cols] - isect)
+
+	def salton(self, rows, cols, isect):
+		return isect / numpy.sqrt(self.degree[rows] * self.degree[cols])
+
+	def adamic_adar(self, rows, cols, isect):
+		inverse_log = numpy.zeros(len(self.counterpart_degree))
+		hubs = self.counterpart_degree > 1
+		inverse_log[hubs] = 1.0 / numpy.log(self.counterpart_degree[hubs])
+		product = self.index.product(self.layer, self.unweighted * diags(inverse_log), self.unweighted)
+		return self.entries(product, rows, cols)
+
+	def resource_allocation(self, rows, cols, isect):
+		inverse = numpy.zeros(len(self.counterpart_degree))
+		connected = self.counterpart_degree > 0
+		inverse[connected] = 1.0 / self.counterpart_degree[connected]
+		product = self.index.product(self.layer, self.unweighted * diags(inverse), self.unweighted)
+		return self.entries(product, rows, cols)
+
+	def sorensen(self, rows, cols, isect):
+		return 2 * isect / (self.degree[rows] * self.degree[cols])
+
+	def hub_promoted(self, rows, cols, isect):
+		return isect / numpy.minimum(self.degree[rows], self.degree[cols])
+
+	def hub_depressed(self, rows, cols, isect):
+		return isect / numpy.maximum(self.degree[rows], self.degree[cols])
+
+	def leicht_holme_newman(self, rows, cols, isect):
+		return isect / (self.degree[rows] * self.degree[cols])
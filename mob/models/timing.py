@@ -58,6 +58,7 @@ class Timing(object):
 		self.header = header
 		self.rows = rows
 		self.elapsed_set = []
+		self.counters = []
 
 	def get_now(self):
 		self.start = time.time()
@@ -73,6 +74,8 @@ class Timing(object):
 		print row_format.format(*self.header)
 		for row, iten in zip(self.rows, self.elapsed_set):
 			print row_format.format(row, *iten)
+		for name, value in self.counters:
+			print format_str.format(name) + ' ' + str(value)
 
 	def save_csv(self, output):
 		with open(output, 'wb') as csvfile:
@@ -80,13 +83,20 @@ class Timing(object):
 			writer.writerow(self.header)
 			for row, iten in zip(self.rows, self.elapsed_set):
 				writer.writerow([row] + iten)
+			for name, value in self.counters:
+				writer.writerow([name, value])
 
 	def save_json(self, output):
 		dictionary = dict(zip(self.rows, self.elapsed_set))
 		dictionary['header'] = self.header
+		if self.counters:
+			dictionary['counters'] = dict(self.counters)
 		with open(output, 'wb') as jsonfile:
 			json.dump(dictionary, jsonfile, indent=4)
 
+	def add_counter(self, name, value):
+		self.counters.append((name, value))
+
 	def get_array(self):
 		return self.elapsed_set
 
@@ -0,0 +1,264 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Two-hopes index
+=====================================================
+
+Two-hopes neighborhood of the vertices of each layer of a bipartite
+network. The index of a layer is the sparsity pattern of the co-occurrence
+product B * B^T of the unweighted biadjacency B, i.e., the entry (u, v)
+holds the number of common neighbors of u and v. Each layer is built once
+per level, on first use, and shared by all matching strategies.
+
+This file is part of MOB.
+
+MOB is a free software and non-commercial use only: you can be use it for
+creating unlimited applications, distribute in binary or object form only,
+modify source-code and distribute modifications (derivative works). Please,
+giving credit to the author by citing the papers. License will expire in 2018,
+July, and will be renewed.
+
+Owner or contributors are not liable for any direct, indirect, incidental,
+special, exemplary, or consequential damages, (such as loss of data or profits,
+and others) arising in any way out of the use of this software,
+even if advised of the possibility of such damage.
+"""
+
+import numpy
+
+from scipy.sparse import csr_matrix
+
+__maintainer__ = 'Alan Valejo'
+__credits__ = ['Alan Valejo', 'Vinicius Ferreira', 'Maria Cristina Ferreira de Oliveira', 'Alneu de Andrade Lopes']
+__homepage__ = 'http://www.alanvalejo.com.br/software?name=MOB'
+__version__ = '0.1'
+__date__ = '2026-10-17'
+
+def pattern(biadjacency, layer):
+	"""
+	Unweighted biadjacency with the rows of the given layer.
+	"""
+
+	result = csr_matrix(biadjacency, copy=True)
+	result.data = numpy.ones(len(result.data), dtype=numpy.int32)
+	if layer == 1:
+		result = result.T.tocsr()
+
+	return result
+
+def cooccurrence(biadjacency, layer, split=None):
+	"""
+	Number of common neighbors between vertices of a layer, i.e., the
+	B * B^T product of the unweighted biadjacency without the diagonal,
+	with hubs handled as given by split, see hub_split.
+	"""
+
+	unweighted = pattern(biadjacency, layer)
+
+	return offdiagonal(hub_product(unweighted, unweighted, split))
+
+def hub_sizes(degree, hub_degree):
+	"""
+	Number of sampled neighbors of each hub, so that each one expands about
+	as many pairs as a vertex with hub_degree neighbors.
+	"""
+
+	return numpy.minimum(degree, numpy.maximum(1, hub_degree * hub_degree // numpy.maximum(degree, 1)))
+
+def hub_split(unweighted, hub_degree, hub_policy='sample'):
+	"""
+	Entries of the unweighted biadjacency of a layer in hub columns, i.e.,
+	counterpart vertices with more than hub_degree neighbors, and, with
+	the sample policy, a random sample of them for each hub, as 0/1
+	matrices. None if there are no hubs.
+	"""
+
+	rows = numpy.repeat(numpy.arange(unweighted.shape[0]), numpy.diff(unweighted.indptr))
+	columns = unweighted.indices
+	degree = numpy.bincount(columns, minlength=unweighted.shape[1])
+	hub = (degree > hub_degree)[columns]
+	if not hub.any():
+		return None
+	rows, columns = rows[hub], columns[hub]
+	ones = numpy.ones(len(columns), dtype=numpy.int32)
+	entries = csr_matrix((ones, (rows, columns)), shape=unweighted.shape)
+	if hub_policy != 'sample':
+		return entries, None
+
+	# Random rank of each neighbor of a hub
+	order = numpy.lexsort((numpy.random.random(len(columns)), columns))
+	starts = numpy.searchsorted(columns[order], columns[order])
+	rank = numpy.empty(len(order), dtype=numpy.int64)
+	rank[order] = numpy.arange(len(order)) - starts
+	sampled = rank < hub_sizes(degree, hub_degree)[columns]
+	sample = csr_matrix((ones[sampled], (rows[sampled], columns[sampled])), shape=unweighted.shape)
+
+	return entries, sample
+
+def hub_product(left, right, split=None):
+	"""
+	Product left * right^T of two matrices with the pattern of a layer of
+	the biadjacency. Hub columns of split are dropped or, if sampled, only
+	pair each of their neighbors with the sample, counting each pair once.
+	"""
+
+	if split is None:
+		return left * right.T
+	entries, sample = split
+	left_hub, right_hub = csr_matrix(left.multiply(entries)), csr_matrix(right.multiply(entries))
+	result = (left - left_hub) * (right - right_hub).T
+	if sample is not None:
+		left_sample, right_sample = csr_matrix(left.multiply(sample)), csr_matrix(right.multiply(sample))
+		result = result + left_hub * right_sample.T + left_sample * (right_hub - right_sample).T
+
+	return result
+
+def volume(biadjacency, layer, hub_degree=None, hub_policy='sample'):
+	"""
+	Two-hopes volume of a layer, i.e., the number of pairs expanded through
+	each counterpart vertex, and the volume kept with the hub policy.
+	"""
+
+	degree = numpy.bincount(pattern(biadjacency, layer).indices, minlength=biadjacency.shape[1 - layer]).astype(numpy.int64)
+	total = int((degree * degree).sum())
+	if hub_degree is None:
+		return total, total
+	hub = degree > hub_degree
+	kept = (degree[~hub] * degree[~hub]).sum()
+	if hub_policy == 'sample':
+		size = hub_sizes(degree[hub], hub_degree)
+		kept += (2 * degree[hub] * size - size * size).sum()
+
+	return total, int(kept)
+
+def offdiagonal(matrix):
+	"""
+	Sorted csr copy of a square matrix without its diagonal.
+	"""
+
+	coo = matrix.tocoo()
+	keep = coo.row != coo.col
+	result = csr_matrix((coo.data[keep], (coo.row[keep], coo.col[keep])), shape=coo.shape)
+	result.sort_indices()
+
+	return result
+
+def truncate(matrix, topk):
+	"""
+	Keep the topk largest entries of each row, ties broken by the lowest
+	column id. Columns of the kept entries remain sorted.
+	"""
+
+	rows = numpy.repeat(numpy.arange(matrix.shape[0]), numpy.diff(matrix.indptr))
+	order = numpy.lexsort((matrix.indices, -matrix.data, rows))
+	rank = numpy.empty(len(order), dtype=numpy.int64)
+	rank[order] = numpy.arange(len(order)) - matrix.indptr[rows[order]]
+	keep = rank < topk
+	result = csr_matrix((matrix.data[keep], (rows[keep], matrix.indices[keep])), shape=matrix.shape)
+	result.sort_indices()
+
+	return result
+
+def disparity(matrix, significance):
+	"""
+	Backbone of a weighted matrix by the disparity filter: an entry w of a
+	row with strength s and degree k is kept if (1 - w / s)^(k - 1) is
+	below the significance level, i.e., it is unlikely under a uniform
+	split of the row strength. Rows with a single entry keep nothing.
+	"""
+
+	rows = numpy.repeat(numpy.arange(matrix.shape[0]), numpy.diff(matrix.indptr))
+	degree = numpy.diff(matrix.indptr)[rows]
+	strength = numpy.asarray(matrix.sum(axis=1), dtype=numpy.float64).ravel()[rows]
+	alpha = (1.0 - matrix.data / strength) ** (degree - 1)
+	keep = (degree > 1) & (alpha < significance)
+	result = csr_matrix((matrix.data[keep], (rows[keep], matrix.indices[keep])), shape=matrix.shape)
+	result.sort_indices()
+
+	return result
+
+class TwoHopIndex(object):
+
+	def __init__(self, biadjacency, topk=None, hub_degree=None, hub_policy='sample'):
+		"""
+		Index over the layers of a n0 x n1 biadjacency. If topk is given,
+		only the topk two-hopes neighbors with most common neighbors are
+		kept for each vertex. Hubs are handled as in cooccurrence.
+		"""
+
+		self.biadjacency = biadjacency
+		self.topk = topk
+		self.hub_degree = hub_degree
+		self.hub_policy = hub_policy
+		self.start = [0, biadjacency.shape[0]]
+		self.layers = [None, None]
+		self.splits = {}
+		# Total and kept two-hopes volume of the built layers
+		self.volume = [None, None]
+
+	def layer_of(self, vertex):
+		return 0 if vertex < self.start[1] else 1
+
+	def counts(self, layer):
+		"""
+		Co-occurrence matrix of a layer, built on first use.
+		"""
+
+		if self.layers[layer] is None:
+			matrix = cooccurrence(self.biadjacency, layer, self.split(layer))
+			self.volume[layer] = volume(self.biadjacency, layer, self.hub_degree, self.hub_policy)
+			if self.topk is not None:
+				matrix = truncate(matrix, self.topk)
+			self.layers[layer] = matrix
+		return self.layers[layer]
+
+	def split(self, layer):
+		"""
+		Hub entries of a layer and their sample, built on first use, so the
+		counts and the products of a layer use the same sample.
+		"""
+
+		if self.hub_degree is None:
+			return None
+		if layer not in self.splits:
+			self.splits[layer] = hub_split(pattern(self.biadjacency, layer), self.hub_degree, self.hub_policy)
+		return self.splits[layer]
+
+	def product(self, layer, left, right):
+		"""
+		Product left * right^T of matrices with the pattern of a layer, with
+		the hub policy of the index.
+		"""
+
+		return hub_product(left, right, self.split(layer))
+
+	def row(self, vertex):
+		"""
+		Two-hopes neighbors of a vertex, as global ids, and the number of
+		common neighbors with each one.
+		"""
+
+		layer = self.layer_of(vertex)
+		matrix = self.counts(layer)
+		local = vertex - self.start[layer]
+		begin, end = matrix.indptr[local], matrix.indptr[local + 1]
+
+		return matrix.indices[begin:end] + self.start[layer], matrix.data[begin:end]
+
+	def twohops(self, vertex):
+		"""
+		Two-hopes neighbors of a vertex as a list of global ids.
+		"""
+
+		layer = self.layer_of(vertex)
+		matrix = self.counts(layer)
+		local = vertex - self.start[layer]
+		twohops = matrix.indices[matrix.indptr[local]:matrix.indptr[local + 1]]
+
+		return (twohops + self.start[layer]).tolist()
+
+	def nnz(self):
+		""" Number of stored pairs over the built layers. """
+
+		return sum(matrix.nnz for matrix in self.layers if matrix is not None)
@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Viewer json
+=====================================================
+
+Json of a level as read by the viewer, the same graphInfo, nodes and links
+that gmlToJson4.py converts from the gml of coarsening.py, with all values
+as strings. The level is streamed straight from its arrays, in blocks of
+vertices and edges, without writing and parsing the gml.
+
+This file is part of MOB.
+
+MOB is a free software and non-commercial use only: you can be use it for
+creating unlimited applications, distribute in binary or object form only,
+modify source-code and distribute modifications (derivative works). Please,
+giving credit to the author by citing the papers. License will expire in 2018,
+July, and will be renewed.
+
+Owner or contributors are not liable for any direct, indirect, incidental,
+special, exemplary, or consequential damages, (such as loss of data or profits,
+and others) arising in any way out of the use of this software,
+even if advised of the possibility of such damage.
+"""
+
+import json
+import numpy
+
+from bigraph import BGraph
+from scipy.sparse import csr_matrix
+
+__maintainer__ = 'Alan Valejo'
+__credits__ = ['Alan Valejo', 'Vinicius Ferreira', 'Maria Cristina Ferreira de Oliveira', 'Alneu de Andrade Lopes']
+__homepage__ = 'http://www.alanvalejo.com.br/software?name=MOB'
+__version__ = '0.1'
+__date__ = '2026-10-17'
+
+# Vertices or edges formatted and written at a time
+BLOCK = 1 << 16
+# Attributes that are not saved, as in the gml of coarsening.py
+HIDDEN = ['adjlist', 'similarity', 'lineage', 'twohop']
+
+def number(value):
+	"""
+	String of a number, without decimals if it is integral, as str of a
+	float; float32 weights are not widened, so 0.464 stays 0.464.
+	"""
+
+	if value == int(value):
+		return str(int(value))
+	if isinstance(value, numpy.float32):
+		return str(value)
+	return str(float(value))
+
+def quote(values):
+	""" Json strings of strings that need no escaping, e.g., numbers. """
+
+	return ['"' + value + '"' for value in values]
+
+def string(value):
+	""" Json string of any value, escaped, decoded as utf-8 or latin-1. """
+
+	if not isinstance(value, basestring):
+		value = str(value)
+	if isinstance(value, str):
+		try:
+			value = value.decode('utf-8')
+		except UnicodeDecodeError:
+			value = value.decode('latin-1')
+	return json.dumps(value)
+
+def block(f, records, fields):
+	"""
+	Write a block of records, each a list of json strings of the fields, one
+	field per line.
+	"""
+
+	template = '\n\t{\n\t\t' + ',\n\t\t'.join(string(field).replace('%', '%%') + ': %s' for field in fields) + '\n \t}'
+	f.write(','.join([template % tuple(record) for record in records]))
+
+def columns(graph):
+	""" Names and json string values of the vertex attributes of a level. """
+
+	lineage = graph['lineage']
+	if isinstance(graph, BGraph):
+		types = graph.type.tolist()
+		successor = [None] * graph.vcount() if graph.successor is None else graph.successor.tolist()
+		extra = []
+	else:
+		types = graph.vs['type']
+		successor = graph.vs['successor']
+		extra = sorted(set(graph.vs.attributes()) - set(['type', 'weight', 'successor', 'name', 'source', 'predecessor']))
+
+	ids = quote(map(str, xrange(graph.vcount())))
+	names = ['id', 'name', 'type', 'weight', 'successor', 'source', 'predecessor'] + extra
+	values = [ids, ids, quote(map(str, types)), quote(map(number, graph.vertex_weights())), quote(map(str, successor))]
+	values += [quote(lineage.flatten().to_strings(',')), quote(lineage.to_strings(','))]
+	values += [map(string, graph.vs[attr]) for attr in extra]
+
+	return names, values
+
+def write(graph, f):
+	"""
+	Write a level, a MGraph or a BGraph, to an open file.
+	"""
+
+	info = [('directed', '"0"'), ('layers', string(graph['layers']))]
+	info.append(('level', string(' '.join(map(str, graph['level'])))))
+	info.append(('vertices', string(' '.join(map(str, graph['vertices'])))))
+	for attr in sorted(set(graph.attributes()) - set(HIDDEN + ['layers', 'level', 'vertices'])):
+		info.append((attr, string(graph[attr])))
+	f.write('{\n\t"graphInfo": [')
+	block(f, [[value for name, value in info]], [name for name, value in info])
+
+	f.write('\n\t],\n\t"nodes": [')
+	names, values = columns(graph)
+	for start in xrange(0, graph.vcount(), BLOCK):
+		if start > 0:
+			f.write(',')
+		block(f, zip(*[column[start:start + BLOCK] for column in values]), names)
+	del values
+
+	f.write('\n\t],\n\t"links": [')
+	biadjacency = csr_matrix(graph.biadjacency())
+	rows = numpy.repeat(numpy.arange(biadjacency.shape[0]), numpy.diff(biadjacency.indptr))
+	cols = biadjacency.indices + biadjacency.shape[0]
+	for start in xrange(0, len(rows), BLOCK):
+		if start > 0:
+			f.write(',')
+		end = start + BLOCK
+		edges = zip(quote(rows[start:end].astype(str)), quote(cols[start:end].astype(str)), quote(map(number, biadjacency.data[start:end])))
+		block(f, edges, ['source', 'target', 'weight'])
+	f.write('\n\t]\n}')
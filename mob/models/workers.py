@@ -0,0 +1,421 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Worker pool
+=====================================================
+
+Persistent pool of matching workers, forked once per run. The graph of each
+level is published as .npy files in a shared memory directory (/dev/shm, if
+available), which the workers memory-map on their first task of the level.
+Tasks and results are small messages: the level, the layer parameters, the
+similarity configuration and a seed drawn by the master. Matchings are
+written in place into a memory-mapped membership array. With a single
+worker, LocalPool matches in the master process instead.
+
+This file is part of MOB.
+
+MOB is a free software and non-commercial use only: you can be use it for
+creating unlimited applications, distribute in binary or object form only,
+modify source-code and distribute modifications (derivative works). Please,
+giving credit to the author by citing the papers. License will expire in 2018,
+July, and will be renewed.
+
+Owner or contributors are not liable for any direct, indirect, incidental,
+special, exemplary, or consequential damages, (such as loss of data or profits,
+and others) arising in any way out of the use of this software,
+even if advised of the possibility of such damage.
+"""
+
+import os
+import numpy
+import atexit
+import random
+import shutil
+import tempfile
+import parallel
+import multiprocessing
+
+from bigraph import BGraph
+from twohop import TwoHopIndex
+from cache import SimilarityCache
+from similarity import Similarity, SimilarityMatrix
+from numpy.lib.format import open_memmap
+from scipy.sparse import csr_matrix
+
+__maintainer__ = 'Alan Valejo'
+__credits__ = ['Alan Valejo', 'Vinicius Ferreira', 'Maria Cristina Ferreira de Oliveira', 'Alneu de Andrade Lopes']
+__homepage__ = 'http://www.alanvalejo.com.br/software?name=MOB'
+__version__ = '0.1'
+__date__ = '2026-10-17'
+
+SHARED_MEMORY = '/dev/shm'
+# Counters returned by the matching tasks, in report order
+COUNTERS = ['Cache hits', 'Cache misses', 'Cache evictions', 'Two-hop volume', 'Two-hop skipped']
+# Vertex attributes rebuilt by contraction, the others are published as is
+BUILTIN_ATTRIBUTES = ['predecessor', 'id', 'successor', 'weight', 'name', 'type', 'source']
+
+# State of a worker process: graph of the current level and its similarities
+process = {}
+# Structures of the first level of a sweep, built before its runs are forked
+shared = {}
+
+def similarity(graph, measure, batch=False, cache_memory=0, cache_policy='clock'):
+	"""
+	Similarity of a layer: batch if asked and supported, otherwise pairwise
+	and, if cache_memory > 0, cached.
+	"""
+
+	if batch and SimilarityMatrix.supports(measure):
+		if (graph['twohop'], measure) in shared:
+			return shared[(graph['twohop'], measure)]
+		return SimilarityMatrix(graph['twohop'], measure)
+	result = getattr(Similarity(graph, graph['adjlist']), measure)
+	if cache_memory > 0:
+		result = SimilarityCache(result, graph.vcount(), cache_memory, cache_policy)
+	return result
+
+def load(task, name, mmap_mode='r'):
+	""" Array of the level of a task. """
+
+	path = os.path.join(task['directory'], '%d-%s.npy' % (task['level'], name))
+	return numpy.load(path, mmap_mode=mmap_mode)
+
+def vertex_attributes(graph):
+	""" Vertex attributes of a MGraph other than the builtin ones. """
+
+	if isinstance(graph, BGraph):
+		return []
+	return sorted(set(graph.vs.attributes()) - set(BUILTIN_ATTRIBUTES))
+
+def seed(task):
+	"""
+	Seed the random generators of a worker from the seed drawn by the master
+	for the task, so a run only depends on the master state, see checkpoint.
+	"""
+
+	random.seed(task['seed'])
+	numpy.random.seed(task['seed'])
+
+def share(graph, compact, parameters, measures):
+	"""
+	Build the first level of a sweep, as a worker would attach it: its graph,
+	its two-hopes index for the (topk, hub_degree, hub_policy) parameters and
+	the batch similarities of the measure of each layer. Runs forked
+	afterwards reuse them instead of rebuilding them.
+	"""
+
+	if ('graph', compact) not in shared:
+		biadjacency = csr_matrix(graph.biadjacency())
+		first = BGraph(biadjacency, numpy.asarray(graph.vertex_weights(), dtype=numpy.int64))
+		if not compact:
+			first = first.to_mgraph()
+			for name in vertex_attributes(graph):
+				first.vs[name] = graph.vs[name]
+		shared[('graph', compact)] = first
+	if ('twohop',) + parameters not in shared:
+		index = TwoHopIndex(shared[('graph', compact)].biadjacency(), *parameters)
+		for layer in range(2):
+			index.counts(layer)
+		shared[('twohop',) + parameters] = index
+	index = shared[('twohop',) + parameters]
+	for layer, measure in enumerate(measures):
+		if SimilarityMatrix.supports(measure):
+			shared.setdefault((index, measure), SimilarityMatrix(index, measure)).scores(layer)
+
+def attach(task):
+	"""
+	Graph of the level of a task, memory-mapped on the first task of the
+	level, as a MGraph unless compact. The first level of a sweep is taken
+	from shared, see share.
+	"""
+
+	key = (task['directory'], task['level'])
+	if process.get('key') != key:
+		parameters = (task['topk'], task['hub_degree'], task['hub_policy'])
+		first = task['level'] == 1 and ('graph', task['compact']) in shared
+		if first:
+			graph = shared[('graph', task['compact'])]
+		else:
+			shape = tuple(task['shape'])
+			biadjacency = csr_matrix((load(task, 'data'), load(task, 'indices'), load(task, 'indptr')), shape=shape)
+			graph = BGraph(biadjacency, load(task, 'weight'))
+			if not task['compact']:
+				graph = graph.to_mgraph()
+				# Attributes may hold None, so they are not memory-mapped
+				for name in task['attributes']:
+					graph.vs[name] = load(task, 'vertex-' + name, None).tolist()
+		if first and ('twohop',) + parameters in shared:
+			graph['twohop'] = shared[('twohop',) + parameters]
+		else:
+			graph['twohop'] = TwoHopIndex(graph.biadjacency(), *parameters)
+		process.clear()
+		process.update(key=key, graph=graph, similarities={})
+
+	return process['graph']
+
+def run(task):
+	"""
+	Match a layer in a worker, see match.
+	"""
+
+	seed(task)
+	graph = attach(task)
+	membership = numpy.asarray(numpy.load(task['membership'], mmap_mode='r+'))
+
+	return match(task, graph, membership)
+
+def match(task, graph, membership):
+	"""
+	Match the layer of a task in the graph, writing into membership. Return
+	its counters, see COUNTERS: the cache counters, if any, and the
+	two-hopes volume of the layer, if built.
+	"""
+
+	graph['similarity'] = similarity(graph, *task['similarity'])
+	param = dict(task['param'])
+	if task['method'] in ['hem', 'lem', 'ldhem', 'ldlem', 'rm', 'ldrm']:
+		projection = dict((key, value) for key, value in task['projection'].iteritems() if value is not None)
+		if projection:
+			one_mode_graph = graph.sparse_projection(range(*task['vertices']), **projection)
+		else:
+			one_mode_graph = graph.weighted_one_mode_projection(range(*task['vertices']))
+		getattr(one_mode_graph, task['method'])(membership, **param)
+	else:
+		getattr(graph, task['method'])(membership, vertices=range(*task['vertices']), **param)
+
+	counters = {}
+	if isinstance(graph['similarity'], SimilarityCache):
+		graph['similarity'].publish()
+		for name, value in graph['similarity'].stats().iteritems():
+			counters['Cache ' + name] = value
+	index = graph['twohop']
+	volume = index.volume[index.layer_of(task['vertices'][0])]
+	if volume is not None:
+		counters['Two-hop volume'] = volume[0]
+		counters['Two-hop skipped'] = volume[0] - volume[1]
+
+	return counters
+
+def local(task, graph, membership):
+	"""
+	Match a layer in the master process, see match, seeded as a worker
+	would be. The random state of the master is restored afterwards, so it
+	draws the same seeds as with a WorkerPool.
+	"""
+
+	state = random.getstate(), numpy.random.get_state()
+	seed(task)
+	try:
+		return match(task, graph, membership)
+	finally:
+		random.setstate(state[0])
+		numpy.random.set_state(state[1])
+
+def propose(message):
+	"""
+	Proposals of a chunk of seeds, see parallel module. The state of a
+	session is attached on its first message.
+	"""
+
+	session, function, chunk = message
+	if process.get('session') != session['id']:
+		seed(session['task'])
+		graph = attach(session['task'])
+		configuration = session['task']['similarity']
+		if configuration not in process['similarities']:
+			process['similarities'][configuration] = similarity(graph, *configuration)
+		graph['similarity'] = process['similarities'][configuration]
+		parallel.state.clear()
+		parallel.state['graph'] = graph
+		for name, path in session['arrays'].iteritems():
+			parallel.state[name] = numpy.asarray(numpy.load(path, mmap_mode='r'))
+		parallel.state.update(session['values'])
+		process['session'] = session['id']
+
+	return getattr(parallel, function)(chunk)
+
+class Session(object):
+	"""
+	Proposal rounds of a matching run by the master, with the interface of
+	multiprocessing.Pool used by the parallel module.
+	"""
+
+	def __init__(self, workers, spec):
+		self.workers = workers
+		self.spec = spec
+
+	def map(self, function, chunks):
+		return self.workers.pool.map(propose, [(self.spec, function.__name__, chunk) for chunk in chunks])
+
+	def close(self):
+		pass
+
+	def join(self):
+		pass
+
+class WorkerPool(object):
+
+	def __init__(self, processes, compact=False, topk=None, hub_degree=None, hub_policy='sample'):
+		"""
+		Fork the workers. It should be created before loading the graph, so
+		the workers do not inherit it.
+		"""
+
+		directory = SHARED_MEMORY if os.path.isdir(SHARED_MEMORY) else None
+		self.directory = tempfile.mkdtemp(prefix='mob-', dir=directory)
+		atexit.register(shutil.rmtree, self.directory, True)
+		self.compact = compact
+		self.topk = topk
+		self.hub_degree = hub_degree
+		self.hub_policy = hub_policy
+		self.level = 0
+		self.shape = None
+		self.attributes = []
+		self.arrays = {}
+		self.sessions = 0
+		self.current = None
+		self.pool = multiprocessing.Pool(processes)
+
+	def path(self, name):
+		return os.path.join(self.directory, name + '.npy')
+
+	def publish(self, graph):
+		"""
+		Publish the biadjacency, the vertex weights and the other vertex
+		attributes of the graph of a new level.
+		"""
+
+		for name in ['data', 'indices', 'indptr', 'weight'] + ['vertex-' + name for name in self.attributes]:
+			path = self.path('%d-%s' % (self.level, name))
+			if os.path.exists(path):
+				os.remove(path)
+		self.level += 1
+		biadjacency = csr_matrix(graph.biadjacency())
+		self.shape = biadjacency.shape
+		arrays = dict(data=biadjacency.data, indices=biadjacency.indices, indptr=biadjacency.indptr)
+		arrays['weight'] = numpy.asarray(graph.vertex_weights(), dtype=numpy.int64)
+		self.attributes = vertex_attributes(graph)
+		for name in self.attributes:
+			arrays['vertex-' + name] = numpy.asarray(graph.vs[name])
+		for name, array in arrays.iteritems():
+			numpy.save(self.path('%d-%s' % (self.level, name)), array)
+
+	def array(self, name, initial, dtype):
+		"""
+		Shared array visible to the workers, with the size or the values of
+		initial, as in multiprocessing.RawArray.
+		"""
+
+		size = initial if isinstance(initial, (int, long)) else len(initial)
+		# A new file, so mappings of the previous one remain valid
+		if os.path.exists(self.path(name)):
+			os.remove(self.path(name))
+		array = numpy.asarray(open_memmap(self.path(name), mode='w+', dtype=dtype, shape=(size,)))
+		if not isinstance(initial, (int, long)):
+			array[:] = initial
+		self.arrays[name] = array
+		return array
+
+	def membership(self, size):
+		""" Membership of the current level, each vertex in its own group. """
+
+		return self.array('membership', numpy.arange(size), numpy.int64)
+
+	def task(self, **kwargs):
+		""" Message of a matching task of the current level. """
+
+		task = dict(directory=self.directory, level=self.level, shape=self.shape, compact=self.compact, topk=self.topk, attributes=self.attributes)
+		task.update(hub_degree=self.hub_degree, hub_policy=self.hub_policy)
+		task['seed'] = numpy.random.randint(2 ** 31 - 1)
+		task['membership'] = self.path('membership')
+		task.update(kwargs)
+		return task
+
+	def submit(self, task):
+		return self.pool.apply_async(run, (task,))
+
+	def session(self, **state):
+		"""
+		Proposal session of the current task. Shared arrays are attached by
+		name, other values are sent once per message.
+		"""
+
+		self.sessions += 1
+		spec = dict(id=(self.directory, self.sessions), task=self.current, arrays={}, values={})
+		for name, value in state.iteritems():
+			shared = [key for key, array in self.arrays.iteritems() if array is value]
+			if shared:
+				spec['arrays'][name] = self.path(shared[0])
+			elif name != 'graph':
+				spec['values'][name] = value
+		return Session(self, spec)
+
+	def close(self):
+		self.pool.close()
+		self.pool.join()
+		shutil.rmtree(self.directory, ignore_errors=True)
+
+class Result(object):
+	""" Result of a task run at once, as multiprocessing.AsyncResult. """
+
+	def __init__(self, value):
+		self.value = value
+
+	def get(self):
+		return self.value
+
+class LocalPool(object):
+	"""
+	Pool with the interface of WorkerPool for a single worker: each layer
+	is matched in the master process, in turn, on the graph of the level as
+	it is, so nothing is published and its vertex attributes are kept.
+	"""
+
+	def __init__(self, compact=False, topk=None, hub_degree=None, hub_policy='sample'):
+		self.compact = compact
+		self.topk = topk
+		self.hub_degree = hub_degree
+		self.hub_policy = hub_policy
+		self.level = 0
+		self.graph = None
+		self.current = None
+		self.array = None
+
+	def publish(self, graph):
+		"""
+		Set the graph of a new level and its two-hopes index, taken from
+		shared on the first level of a sweep, see share. The index of the
+		previous graph is dropped, since a given graph may be reused.
+		"""
+
+		if self.graph is not None:
+			self.graph['twohop'] = None
+		self.level += 1
+		parameters = (self.topk, self.hub_degree, self.hub_policy)
+		if self.level == 1 and ('twohop',) + parameters in shared:
+			graph['twohop'] = shared[('twohop',) + parameters]
+		else:
+			graph['twohop'] = TwoHopIndex(graph.biadjacency(), *parameters)
+		self.graph = graph
+
+	def membership(self, size):
+		""" Membership of the current level, each vertex in its own group. """
+
+		self.array = numpy.arange(size)
+		return self.array
+
+	def task(self, **kwargs):
+		""" Message of a matching task of the current level. """
+
+		task = dict(level=self.level, compact=self.compact, topk=self.topk, hub_degree=self.hub_degree, hub_policy=self.hub_policy)
+		task['seed'] = numpy.random.randint(2 ** 31 - 1)
+		task.update(kwargs)
+		return task
+
+	def submit(self, task):
+		return Result(local(task, self.graph, self.array))
+
+	def close(self):
+		if self.graph is not None:
+			self.graph['twohop'] = None
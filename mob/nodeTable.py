@@ -0,0 +1,144 @@
+####################################################################################
+# Shared node-attribute table of a coarsened graph, and lookup of its rows.        #
+# Date: 17 october 2026                                                            #
+####################################################################################
+import os
+import sys
+import json
+import numpy
+import argparse
+
+# @desc Writes the nodes of the original graph as a table, <table>.jsonl with one node per line, in the given order, <table>.idx with the byte offset of each line and of the end of the file, and <table>.rank with the row of each node id, both as little-endian int64. Rows of the table are read by position, see rows. <table>.rank is written last, so a table is complete if it exists.
+# @param {List} nodes Nodes of the original .json graph.
+# @param {List} order Node ids in table order; repeated ids are skipped and nodes not in it are appended.
+# @param {String} table Table file name, without extension.
+# @returns {Array} Row of each node id in the table.
+def write(nodes, order, table):
+    rank = numpy.full(len(nodes), -1, dtype=numpy.int64)
+    order = numpy.asarray(order, dtype=numpy.int64)
+    order = order[(order >= 0) & (order < len(nodes))]
+    order = order[numpy.sort(numpy.unique(order, return_index=True)[1])].tolist()
+    rank[order] = numpy.arange(len(order))
+    missing = numpy.flatnonzero(rank < 0)
+    rank[missing] = numpy.arange(len(order), len(nodes))
+    offsets = numpy.zeros(len(nodes) + 1, dtype='<i8')
+    tableFile = open(table + '.jsonl', 'wb', 1 << 20)
+    for row, i in enumerate(order + missing.tolist()):
+        line = json.dumps(nodes[i]) + '\n'
+        tableFile.write(line)
+        offsets[row + 1] = offsets[row] + len(line)
+    tableFile.close()
+    offsets.tofile(table + '.idx')
+    rank.astype('<i8').tofile(table + '.rank')
+    return rank
+
+# @desc Table shared by the coarsened graphs of a dataset. The table is written, see write, only if it does not exist, has another number of nodes or is older than the original .json file; otherwise it is reused and the row of each node id is read from <table>.rank.
+# @param {List} nodes Nodes of the original .json graph.
+# @param {List} order Node ids in table order, if the table is written.
+# @param {String} table Table file name, without extension.
+# @param {String} original Original .json file name.
+# @returns {Array} Row of each node id in the table.
+def share(nodes, order, table, original):
+    try:
+        if os.path.getmtime(table + '.rank') >= os.path.getmtime(original):
+            rank = numpy.fromfile(table + '.rank', dtype='<i8').astype(numpy.int64)
+            if len(rank) == len(nodes):
+                return rank
+    except OSError:
+        pass
+    return write(nodes, order, table)
+
+# @desc Parses the "source" strings of the nodes of a coarsened graph.
+# @param {List} sources Node ids of each super-vertex, separated by sep.
+# @param {String} sep Separator of the node ids.
+# @returns {Array, Array} Node ids, concatenated, and number of ids of each super-vertex.
+def parse(sources, sep=','):
+    if sep == ' ':
+        sources = [' '.join(str(source).split()) for source in sources]
+    else:
+        sources = [str(source).strip() for source in sources]
+    ids = numpy.fromstring(sep.join(sources), dtype=numpy.int64, sep=sep)
+    sizes = numpy.array([source.count(sep) + 1 for source in sources], dtype=numpy.int64)
+    if ids.size != sizes.sum():
+        raise ValueError('Malformed sources of the coarsened graph.')
+    return ids, sizes
+
+# @desc Ranges of table rows holding the sources of each super-vertex, as [start, end) pairs. The sources of a super-vertex are a single range when the table follows the hierarchy, see setProperties.py, and may be several in a table shared with other levels, see share.
+# @param {Array} rank Row of each node id, as returned by write.
+# @param {List} sources Node ids of each super-vertex, separated by sep; ids out of the table are skipped.
+# @param {String} sep Separator of the node ids.
+# @returns {List} [start, end] pairs of each super-vertex, in increasing order.
+def ranges(rank, sources, sep=','):
+    ids, sizes = parse(sources, sep)
+    owner = numpy.repeat(numpy.arange(len(sizes)), sizes)
+    valid = (ids >= 0) & (ids < len(rank))
+    rows, owner = rank[ids[valid]], owner[valid]
+    order = numpy.lexsort((rows, owner))
+    rows, owner = rows[order], owner[order]
+    # A range starts at each new super-vertex or row gap, repeated rows are dropped
+    repeated = numpy.r_[False, (owner[1:] == owner[:-1]) & (rows[1:] == rows[:-1])]
+    rows, owner = rows[~repeated], owner[~repeated]
+    starts = numpy.flatnonzero(numpy.r_[True, (owner[1:] != owner[:-1]) | (rows[1:] != rows[:-1] + 1)])
+    ends = numpy.r_[starts[1:], len(rows)] - 1
+    pairs = numpy.column_stack([rows[starts], rows[ends] + 1]).tolist()
+    offsets = numpy.r_[0, numpy.cumsum(numpy.bincount(owner[starts], minlength=len(sizes)))]
+    return [pairs[offsets[i]:offsets[i + 1]] for i in xrange(len(sizes))]
+
+# @desc Reads rows of a table, one read per range, without loading the table.
+# @param {String} table Table file name, without extension.
+# @param {List} rowRanges [start, end] pairs of rows.
+# @returns {List} Nodes of the rows, in order.
+def rows(table, rowRanges):
+    index = numpy.memmap(table + '.idx', dtype='<i8', mode='r')
+    nodes = []
+    tableFile = open(table + '.jsonl', 'rb')
+    for start, end in rowRanges:
+        if not 0 <= start <= end < len(index):
+            raise ValueError('Rows ' + str(start) + '-' + str(end) + ' are out of the table.')
+        tableFile.seek(index[start])
+        data = tableFile.read(index[end] - index[start])
+        nodes.extend(json.loads('[' + ','.join(data.splitlines()) + ']'))
+    tableFile.close()
+    return nodes
+
+# @desc Writes a coarsened graph as a .json file. Graphs with a table are only read by programs, so they are written without indentation or sorted keys, which is much faster.
+# @param {Object} graph Graph with "graphInfo", "nodes" and "links".
+# @param {String} fileName .json file name.
+# @param {Boolean} table Whether the nodes store "members" ranges of a table.
+def writeGraph(graph, fileName, table):
+    indent = None if table else 4
+    graphFile = open(fileName, 'w')
+    graphFile.write("{\n\t\"graphInfo\":\n")
+    graphFile.write(json.dumps(graph['graphInfo'], indent=indent, sort_keys=not table))
+    graphFile.write(",\n\t\"nodes\":\n")
+    graphFile.write(json.dumps(graph['nodes'], indent=indent, sort_keys=not table))
+    graphFile.write(",\n\t\"links\":\n")
+    graphFile.write(json.dumps(graph['links'], indent=indent, sort_keys=not table))
+    graphFile.write("\n}")
+    graphFile.close()
+
+if __name__ == "__main__":
+    # Instantiate argument parser
+    description = 'Program to print the nodes of rows of a node-attribute table, such as the "members" of a super-vertex.'
+    parser = argparse.ArgumentParser(description=description)
+    parser._action_groups.pop()
+
+    # Add argument group (required)
+    required = parser.add_argument_group('required arguments')
+    required.add_argument('-t', '--table', required=True, dest='table', action='store', type=str, default=None, help='Table file name, without extension.');
+    required.add_argument('-r', '--rows', required=True, dest='rows', action='store', type=int, nargs='+', default=None, help='Start and end of each range of rows.');
+
+    # Add arguments to parser
+    parser._action_groups.append(required)
+
+    # Run the parser
+    options = parser.parse_args()
+    if len(options.rows) % 2 != 0:
+        print "Rows must be start and end pairs. Program exiting with -1"
+        sys.exit(-1)
+    try:
+        nodes = rows(options.table, zip(options.rows[0::2], options.rows[1::2]))
+    except (ValueError, IOError) as error:
+        print str(error) + " Program exiting with -1"
+        sys.exit(-1)
+    json.dump(nodes, sys.stdout)
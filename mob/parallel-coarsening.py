@@ -33,13 +33,13 @@ Required:
 
 import sys
 import os
-import sharedmem
 import argparse
 import igraph
 import logging
 
 from timing import Timing
 from multiprocessing import Process
+from multiprocessing.sharedctypes import RawArray
 from similarity import Similarity
 from mob import load
 
@@ -152,7 +152,7 @@ def main():
 
 			graph['similarity'] = getattr(Similarity(graph, graph['adjlist']), options.similarity)
 			matching_method = getattr(graph, options.matching)
-			matching = sharedmem.full(graph.vcount(), range(graph.vcount()), dtype='int')
+			matching = RawArray('l', range(graph.vcount()))
 			processes = []
 			levels = graph['level']
 
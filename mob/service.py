@@ -0,0 +1,334 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Service
+=====================================================
+
+Resident coarsening service. Loaded graphs and their hierarchies are kept in
+memory, keyed by dataset, so repeated requests on the same upload, e.g.,
+slider-driven recoarsening, skip the interpreter startup, the imports and
+the graph load, and a hierarchy already built is only saved again.
+
+Operations are json POST requests to a local HTTP server, listening on a
+localhost port or on a Unix domain socket:
+
+	/coarsen    options as in a -cnf file of coarsening.py, and optionally
+	            the dataset name, by default the input file
+	/convert    input .gml and output .json files, as gmlToJson4.py
+	/uncoarsen  hierarchy, level and membership of its vertices, projected
+	            to the original vertices
+	/query      hierarchy, level and vertices, their weights and sources,
+	            or the loaded datasets and hierarchies if no hierarchy
+	/members    node-attribute table and [start, end] ranges of its rows,
+	            e.g., the members of a super-vertex, see nodeTable.py
+
+The response of /coarsen holds the hierarchy key used by the other
+operations. Levels are positions in the hierarchy, the last one by default.
+
+This file is part of MOB.
+
+MOB is a free software and non-commercial use only: you can be use it for
+creating unlimited applications, distribute in binary or object form only,
+modify source-code and distribute modifications (derivative works). Please,
+giving credit to the author by citing the papers. License will expire in 2018,
+July, and will be renewed.
+
+Owner or contributors are not liable for any direct, indirect, incidental,
+special, exemplary, or consequential damages, (such as loss of data or profits,
+and others) arising in any way out of the use of this software,
+even if advised of the possibility of such damage.
+"""
+
+import os
+import sys
+import copy
+import json
+import numpy
+import signal
+import hashlib
+import argparse
+import traceback
+import collections
+import SocketServer
+import BaseHTTPServer
+
+import nodeTable
+import coarsening
+import gmlToJson4
+
+import models.args as args
+import models.helper as helper
+
+from models.timing import Timing
+from models.bigraph import BGraph
+
+__maintainer__ = 'Alan Valejo'
+__credits__ = ['Alan Valejo', 'Geraldo Pereira Rocha Filho', 'Maria Cristina Ferreira de Oliveira', 'Alneu de Andrade Lopes']
+__homepage__ = 'https://github.com/alanvalejo/mob'
+__license__ = 'GNU'
+__docformat__ = 'markdown en'
+__version__ = '0.1'
+__date__ = '2026-10-17'
+
+OPERATIONS = ['coarsen', 'convert', 'uncoarsen', 'query', 'members']
+# Options that change the hierarchy of a dataset, the others only change
+# its output files or how it is computed
+HIERARCHY_OPTIONS = ['vertices', 'reduction_factor', 'max_levels', 'global_min_vertices', 'matching',
+'similarity', 'itr', 'tolerance', 'upper_bound', 'synchronous', 'twohop_topk', 'gmb_topk',
+'hub_degree', 'hub_policy', 'projection_topk', 'projection_threshold', 'projection_backbone',
+'compact', 'batch_similarity', 'contract_sparse']
+# Options that change how the input is read
+INPUT_OPTIONS = ['input', 'vertices', 'combine', 'compact']
+
+class RequestError(Exception):
+	pass
+
+def compact(graph):
+	""" Compact copy of a level, kept after its files are saved. """
+
+	if isinstance(graph, BGraph):
+		return graph
+	result = BGraph.from_mgraph(graph)
+	if None not in graph.vs['successor']:
+		result.successor = numpy.array(graph.vs['successor'], dtype=numpy.int64)
+	return result
+
+class Service(object):
+
+	def __init__(self, log, max_hierarchies=8):
+		current_path = os.path.dirname(os.path.abspath(__file__))
+		self.parser = args.setup_parser(current_path + '/args/coarsening.json')
+		self.log = log
+		self.datasets = {}
+		# Least recently used first
+		self.hierarchies = collections.OrderedDict()
+		self.max_hierarchies = max_hierarchies
+
+	def options(self, request):
+		""" Coarsening options of a request, validated as in coarsening.py. """
+
+		options = self.parser.parse_args([])
+		vars(options).update(request)
+		if options.sweep or options.resume:
+			raise RequestError('Sweeps and resumed runs are not supported by the service.')
+		if options.input is None:
+			raise RequestError('Input is required.')
+		try:
+			args.check_output(options)
+			coarsening.validate(options, self.log)
+		except SystemExit:
+			raise RequestError('Invalid options, see the log.')
+		return options
+
+	def dataset(self, name, options):
+		"""
+		Loaded graph of a dataset, reloaded if its input changed. Its
+		hierarchies are dropped on reload.
+		"""
+
+		stat = os.stat(options.input)
+		key = [getattr(options, option) for option in INPUT_OPTIONS] + [stat.st_mtime, stat.st_size]
+		dataset = self.datasets.get(name)
+		if dataset is None or dataset['key'] != key:
+			if dataset is not None:
+				for hierarchy in dataset['hierarchies']:
+					del self.hierarchies[hierarchy]
+			graph, source_ecount = coarsening.load(options)
+			dataset = dict(key=key, graph=graph, source_ecount=source_ecount, hierarchies=[])
+			self.datasets[name] = dataset
+		return dataset
+
+	def use(self, key, hierarchy=None):
+		"""
+		Mark a hierarchy as the most recently used one, adding it if given,
+		and drop the least recently used ones beyond max_hierarchies.
+		"""
+
+		if hierarchy is None:
+			hierarchy = self.hierarchies.pop(key)
+		self.hierarchies[key] = hierarchy
+		while len(self.hierarchies) > self.max_hierarchies:
+			old_key, old = self.hierarchies.popitem(last=False)
+			self.datasets[old['dataset']]['hierarchies'].remove(old_key)
+			self.log.info('Dropped hierarchy ' + old_key + ' of ' + old['dataset'])
+		return hierarchy
+
+	def hierarchy(self, request):
+		""" Levels and graphs of a hierarchy by key. """
+
+		if request.get('hierarchy') not in self.hierarchies:
+			raise RequestError('Unknown hierarchy, coarsen it first.')
+		hierarchy = self.use(request['hierarchy'])
+		level = request.get('level', -1)
+		if not -len(hierarchy['graphs']) <= level < len(hierarchy['graphs']):
+			raise RequestError('Level is out of the hierarchy.')
+		return hierarchy['levels'][level], hierarchy['graphs'][level]
+
+	def coarsen(self, request):
+		"""
+		Coarsen a dataset, or reuse its hierarchy if it was already built
+		with the same options, and save the files asked.
+		"""
+
+		request = dict(request)
+		name = request.pop('dataset', None)
+		options = self.options(request)
+		name = name or os.path.abspath(options.input)
+		dataset = self.dataset(name, options)
+		signature = json.dumps([name] + [getattr(options, option) for option in HIERARCHY_OPTIONS])
+		key = hashlib.sha1(signature).hexdigest()[:16]
+
+		timing = Timing(coarsening.TIMING_HEADER, [])
+		cached = key in self.hierarchies
+		if not cached:
+			# All levels are kept, the files saved depend on save_hierarchy
+			build = copy.copy(options)
+			build.save_hierarchy = True
+			build.checkpoint = None
+			levels, graphs, source_ecount, counters = coarsening.hierarchy(build, timing, dataset['graph'], dataset['source_ecount'])
+			# Saving a gml changes the attributes of the graphs, compact first
+			hierarchy = dict(dataset=name, levels=levels, graphs=[compact(graph) for graph in graphs])
+			dataset['hierarchies'].append(key)
+			self.use(key, hierarchy)
+			with timing.timeit_context_add('Save'):
+				coarsening.save(options, levels, graphs, source_ecount)
+		else:
+			hierarchy = self.use(key)
+			with timing.timeit_context_add('Save'):
+				coarsening.save(options, hierarchy['levels'], hierarchy['graphs'], dataset['source_ecount'])
+
+		timings = dict(zip(timing.rows, timing.get_array_sec()))
+		vertices = [graph['vertices'] for graph in hierarchy['graphs']]
+		return dict(hierarchy=key, cached=cached, output=options.output, levels=hierarchy['levels'], vertices=vertices, timing=timings)
+
+	def convert(self, request):
+		""" Convert a .gml file to the .json format of the viewer. """
+
+		if 'input' not in request or 'output' not in request:
+			raise RequestError('Input and output are required.')
+		gmlToJson4.convert(request['input'], request['output'])
+		return dict(output=request['output'])
+
+	def uncoarsen(self, request):
+		"""
+		Project the membership of the vertices of a level, a list or a file
+		with one value per line, to the original vertices. The result is
+		written to the output file, if given, or returned.
+		"""
+
+		levels, graph = self.hierarchy(request)
+		if 'membership' in request:
+			membership = numpy.asarray(request['membership'], dtype=numpy.int64)
+		elif 'membership_file' in request:
+			membership = numpy.loadtxt(request['membership_file'], dtype=numpy.int64, ndmin=1)
+		else:
+			raise RequestError('Membership is required.')
+		if len(membership) != graph.vcount():
+			raise RequestError('Membership size does not match the level.')
+
+		source = graph['lineage'].flatten()
+		result = numpy.empty(len(source.indices), dtype=numpy.int64)
+		result[source.indices] = numpy.repeat(membership, source.sizes())
+		if 'output' in request:
+			numpy.savetxt(request['output'], result, fmt='%d')
+			return dict(output=request['output'])
+		return dict(membership=result.tolist())
+
+	def query(self, request):
+		"""
+		Size of a level and, for the given vertices, their weights and
+		original vertices. Without hierarchy, the loaded datasets and their
+		hierarchies.
+		"""
+
+		if 'hierarchy' not in request:
+			return dict(datasets=dict((name, dataset['hierarchies']) for name, dataset in self.datasets.iteritems()))
+		levels, graph = self.hierarchy(request)
+		result = dict(level=levels, vertices=graph['vertices'], ecount=graph.ecount())
+		if 'vertices' in request:
+			vertices = numpy.asarray(request['vertices'], dtype=numpy.int64)
+			if len(vertices) > 0 and (vertices.min() < 0 or vertices.max() >= graph.vcount()):
+				raise RequestError('Vertices are out of the level.')
+			offsets, indices = graph['lineage'].expand_many(vertices)
+			result['weight'] = numpy.asarray(graph.vertex_weights())[vertices].tolist()
+			result['source'] = [indices[offsets[i]:offsets[i + 1]].tolist() for i in xrange(len(vertices))]
+		return result
+
+	def members(self, request):
+		""" Nodes of ranges of rows of a node-attribute table. """
+
+		if 'table' not in request or 'rows' not in request:
+			raise RequestError('Table and rows are required.')
+		return dict(nodes=nodeTable.rows(request['table'], request['rows']))
+
+class Handler(BaseHTTPServer.BaseHTTPRequestHandler):
+
+	def do_POST(self):
+		operation = self.path.strip('/')
+		try:
+			if operation not in OPERATIONS:
+				raise RequestError('Unknown operation ' + operation + '.')
+			length = int(self.headers.getheader('content-length', 0))
+			request = json.loads(self.rfile.read(length) or '{}')
+			if not isinstance(request, dict):
+				raise RequestError('Requests must be json objects.')
+			status, response = 200, getattr(self.server.service, operation)(request)
+		except (RequestError, ValueError, IOError, OSError) as error:
+			status, response = 400, dict(error=str(error))
+		except Exception as error:
+			self.server.service.log.error(traceback.format_exc())
+			status, response = 500, dict(error=str(error))
+
+		body = json.dumps(response)
+		self.send_response(status)
+		self.send_header('Content-Type', 'application/json')
+		self.send_header('Content-Length', str(len(body)))
+		self.end_headers()
+		self.wfile.write(body)
+
+	def log_message(self, format, *args):
+		self.server.service.log.debug(format % args)
+
+class UnixHTTPServer(SocketServer.UnixStreamServer):
+
+	def get_request(self):
+		# The handler expects a (host, port) client address
+		request, address = self.socket.accept()
+		return request, ('localhost', 0)
+
+def main():
+	"""
+	Main entry point for the application when run from the command line.
+	"""
+
+	description = 'Resident coarsening service.'
+	parser = argparse.ArgumentParser(description=description, formatter_class=lambda prog: argparse.HelpFormatter(prog, max_help_position=50, width=150))
+	parser.add_argument('-p', '--port', dest='port', action='store', type=int, default=8500, help='localhost port (default: %(default)s)')
+	parser.add_argument('-u', '--socket', dest='socket', action='store', type=str, metavar='FILE', default=None, help='listen on a Unix domain socket instead of a port')
+	parser.add_argument('-k', '--max_hierarchies', dest='max_hierarchies', action='store', type=int, default=8, help='hierarchies kept in memory, the least recently used are dropped (default: %(default)s)')
+	options = parser.parse_args()
+
+	log = helper.initialize_logger(dir='log', output='log')
+
+	# Requests are served one at a time, coarsening forks its own workers
+	if options.socket:
+		if os.path.exists(options.socket):
+			os.remove(options.socket)
+		server = UnixHTTPServer(options.socket, Handler)
+	else:
+		server = BaseHTTPServer.HTTPServer(('127.0.0.1', options.port), Handler)
+	server.service = Service(log, options.max_hierarchies)
+	signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+	log.info('Listening on ' + (options.socket or 'localhost:' + str(options.port)))
+	try:
+		server.serve_forever()
+	except KeyboardInterrupt:
+		pass
+	finally:
+		server.server_close()
+		if options.socket and os.path.exists(options.socket):
+			os.remove(options.socket)
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -10,6 +10,7 @@ import argparse
 import json
 import os
 import sys
+import nodeTable
 
 # Converts a float character to string, assigning "0" if float is 0.0.
 # @param {float} num Floating point number to be converted.
@@ -34,8 +35,13 @@ if __name__ == "__main__":
     required.add_argument('-l', '--nLevels', required=True, dest='nLevels', action='store', type=float, metavar=('float', 'float'), nargs='+', default=None, help='Number of coarsened graphs for each layer.');
     required.add_argument('-r', '--rf', required=True, dest='reductionFactor', action='store', type=float, metavar=('float', 'float'), nargs='+', default=None, help='Reduction factor for each layer.')
 
+    # Add argument group (optional)
+    optional = parser.add_argument_group('optional arguments')
+    optional.add_argument('-t', '--table', dest='table', action='store_true', default=False, help='Write the original nodes once, in a table read by nodeTable.py, and store in each super-vertex the "members" ranges of its rows instead of copies of its nodes in "vertexes".');
+
     # Add arguments to parser
     parser._action_groups.append(required)
+    parser._action_groups.append(optional)
 
     # Run the parser
     options = parser.parse_args()
@@ -48,7 +54,8 @@ if __name__ == "__main__":
     reductionFactor2 = convert2String(options.reductionFactor[1])
     # fileName = options.name.split(".")[0] + "Coarsened" + "l" + reductionFactor1 + 'r' + ''.join(str(options.reductionFactor[1]).split("."))
     fileName = options.name.split(".")[0] + "Coarsened" + "l" + reductionFactor1 + 'r' + reductionFactor2
-    # Step 3: Iterate through all coarsened graphs and write new properties to .json file #
+    # Levels of each layer of the coarsened graphs, from the first to the most coarsened
+    levels = []
     nl = nr = 0
     # for level in range(1, int(options.nLevels)+1):
     for level in range(0, max(int(options.nLevels[0]), int(options.nLevels[1]))):
@@ -57,32 +64,37 @@ if __name__ == "__main__":
             nl = nl + 1
         if(nr < options.nLevels[1]):
             nr = nr + 1
+        levels.append((nl, nr))
+    # Step 3 (table only): Write original nodes once per dataset, in the order of the sources of the most coarsened graph, so the sources of a super-vertex of any level are consecutive rows, and reuse them if they were already written #
+    if(options.table and levels):
+        coarsestJson = open(options.folder + fileName + "nl" + str(levels[-1][0]) + "nr" + str(levels[-1][1]) + ".json", 'r')
+        order, sizes = nodeTable.parse([node['source'] for node in json.load(coarsestJson)['nodes']])
+        coarsestJson.close()
+        tableName = options.name.split(".")[0] + "Nodes"
+        rank = nodeTable.share(originalGraph['nodes'], order, options.folder + tableName, options.folder + options.name)
+    # Step 4: Iterate through all coarsened graphs and write new properties to .json file #
+    for nl, nr in levels:
         coarsenedFileName = fileName + "nl" + str(nl) + "nr" + str(nr) + ".json"
-        # Step 3.1: Open coarsened .json graph #
+        # Step 4.1: Open coarsened .json graph #
         coarsenedJson = open(options.folder + coarsenedFileName, 'r')
         coarsenedGraph = json.load(coarsenedJson)
         coarsenedJson.close()
-        # Step 3.2: Iterate through every node of .json file and create array of vertexes, composing super-vertex #
-        for node in coarsenedGraph['nodes']:
-            # Create a list of concatenated vertexes
-            node['vertexes'] = []
-            for source in node['source'].split(","):
-                if int(source) < len(originalGraph['nodes']):
-                    node['vertexes'].append(originalGraph['nodes'][int(source)])
-                # node['vertexes'].append(originalGraph['nodes'][int(source)])
-        # Step 3.3: Open a new .json file for writing
+        # Step 4.2: Iterate through every node of .json file and create array of vertexes, composing super-vertex #
+        if(options.table):
+            # Store rows of the sources of the super-vertex instead, and the table name in graph info
+            coarsenedGraph['graphInfo'][0]['nodeTable'] = tableName
+            members = nodeTable.ranges(rank, [node['source'] for node in coarsenedGraph['nodes']])
+            for node, nodeMembers in zip(coarsenedGraph['nodes'], members):
+                node['members'] = nodeMembers
+        else:
+            for node in coarsenedGraph['nodes']:
+                # Create a list of concatenated vertexes
+                node['vertexes'] = []
+                for source in node['source'].split(","):
+                    if int(source) < len(originalGraph['nodes']):
+                        node['vertexes'].append(originalGraph['nodes'][int(source)])
+                    # node['vertexes'].append(originalGraph['nodes'][int(source)])
+        # Step 4.3: Write the new .json file
         # newCoarsenedJson = open(options.folder + fileName + "n" + str(level) + "Weighted.json", 'w')
         # newCoarsenedJson = open(options.folder + fileName + "n" + str(level) + ".json", 'w')
-        newCoarsenedJson = open(options.folder + fileName + "nl" + str(nl) + "nr" + str(nr) + ".json", 'w')
-        # Write graph info
-        newCoarsenedJson.write("{\n\t\"graphInfo\":\n")
-        json.dump(coarsenedGraph['graphInfo'], newCoarsenedJson, indent=4, sort_keys=True)
-        # Write nodes
-        newCoarsenedJson.write(",\n\t\"nodes\":\n")
-        json.dump(coarsenedGraph['nodes'], newCoarsenedJson, indent=4, sort_keys=True)
-        # Write links
-        newCoarsenedJson.write(",\n\t\"links\":\n")
-        json.dump(coarsenedGraph['links'], newCoarsenedJson, indent=4, sort_keys=True)
-        # Finish writing JSON file
-        newCoarsenedJson.write("\n}")
-        newCoarsenedJson.close()
+        nodeTable.writeGraph(coarsenedGraph, options.folder + fileName + "nl" + str(nl) + "nr" + str(nr) + ".json", options.table)
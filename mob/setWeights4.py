@@ -10,6 +10,7 @@ import argparse
 import json
 import os
 import sys
+import nodeTable
 from pprint import pprint
 
 # Removes any unnecessary characters from line, defined by 'junkCharacters', returning a new line.
@@ -63,8 +64,13 @@ if __name__ == "__main__":
     required.add_argument('-c', '--coarsened', required=True, dest='coarsened', action='store', type=str, default=None, help='.json coarsened file name.');
     required.add_argument('-g', '--cluster', required=True, dest='cluster', action='store', type=str, default=None, help='.cluster file name containing newly grouped vertices.');
 
+    # Add argument group (optional)
+    optional = parser.add_argument_group('optional arguments')
+    optional.add_argument('-t', '--table', dest='table', action='store_true', default=False, help='Write the original nodes once per dataset, in a table read by nodeTable.py and shared by its coarsened graphs, and store in each super-vertex the "members" ranges of its rows instead of copies of its nodes in "vertexes".');
+
     # Add arguments to parser
     parser._action_groups.append(required)
+    parser._action_groups.append(optional)
 
     # Run the parser
     options = parser.parse_args()
@@ -72,7 +78,6 @@ if __name__ == "__main__":
     # Step 1 - Open files #
     originalJson = open(options.original, 'r')
     coarsenedJson = open(options.coarsened, 'r')
-    newCoarsenedJson = open(options.coarsened.split(".")[0]+"Weighted.json", 'w')
     clusterJson = open(options.cluster, 'r')
 
     # Step 2 - Save clustered vertices in array #
@@ -98,19 +103,26 @@ if __name__ == "__main__":
                 weights[i] = weights[i] + 1.0
     # print weights
 
-    # Step 4 - load coarsened .json file in memory, open newCoarsenedJson, and start writing .json with new weights #
+    # Step 3.1 (table only) - Write original nodes once per dataset, in the order of the clustered vertices of the first level written, and reuse them for the other levels #
+    if(options.table):
+        tableName = options.original.split(".")[0] + "Nodes"
+        order, sizes = nodeTable.parse(clusteredVertices, ' ')
+        rank = nodeTable.share(jason['nodes'], order, tableName, options.original)
+        members = nodeTable.ranges(rank, clusteredVertices, ' ')
+
+    # Step 4 - load coarsened .json file in memory, and create its nodes with new weights #
     coarsenedJason = json.load(coarsenedJson)
-    # Store graphInfo
-    newCoarsenedJson.write("{\n\t\"graphInfo\":\n")
-    json.dump(coarsenedJason['graphInfo'], newCoarsenedJson, indent=4, sort_keys=True)
+    if(options.table):
+        coarsenedJason['graphInfo'][0]['nodeTable'] = os.path.basename(tableName)
     # Eliminate old nodes information
     del coarsenedJason['nodes']
     # Create a list of dictionaries, so nodes information can be stored
     nodes = []
-    # newCoarsenedJson.write(",\n\t\"nodes\":\n\t[")
-    newCoarsenedJson.write(",\n\t\"nodes\":\n")
-    # Start writing new nodes with respective weights
+    # Start creating new nodes with respective weights
     for i in range(len(clusteredVertices)): # "i" corresponds to clustered vertice
+        if(options.table): # Store rows of the clustered vertices instead of "vertexes"
+            nodes.append({'id': str(clusteredVertices[i].split(" ")[0]), 'weight': str(weights[i]), 'members': members[i]})
+            continue
         for j in range(len(clusteredVertices[i].split(" "))):
             if(j == 0): # First node is id node; for every first node, store a property called "vertexes", containing array of concatenated vertexes
                 nodes.append(dict())
@@ -129,17 +141,8 @@ if __name__ == "__main__":
                 # print json.dumps()
     # Assign node information to dictionary structure
     coarsenedJason['nodes'] = nodes
-    # Store nodes
-    json.dump(coarsenedJason['nodes'], newCoarsenedJson, indent=4, sort_keys=True)
-    # newCoarsenedJson.write("\n\t]")
-    # Store links
-    # newCoarsenedJson.write(",\n\t\"links\":\n\t[")
-    newCoarsenedJson.write(",\n\t\"links\":\n")
-    json.dump(coarsenedJason['links'], newCoarsenedJson, indent=4, sort_keys=True)
-    # newCoarsenedJson.write("\n\t]")
-    # Finish writing JSON file
-    newCoarsenedJson.write("\n}")
+    # Store graphInfo, nodes and links
+    nodeTable.writeGraph(coarsenedJason, options.coarsened.split(".")[0] + "Weighted.json", options.table)
 
     # Step 5 - Close files and exit program cleanly #
     coarsenedJson.close()
-    newCoarsenedJson.close()
@@ -0,0 +1,108 @@
+####################################################
+### Script to add proper weights from original   ###
+### .json file graph and add them to newly       ###
+### coarsened graph, with numpy arrays.          ###
+### Based on setWeights4.py by                   ###
+### Diego S. Cintra.                             ###
+### Date: 17 october 2026                        ###
+####################################################
+
+import argparse
+import json
+import os
+import sys
+import numpy
+import nodeTable
+
+# @desc Reads a .cluster file, with the vertices grouped in each super-vertex in a line.
+# @param {String} clusterName .cluster file name.
+# @returns {List, Array, Array} Lines of the file, grouped vertices, concatenated, and offset of the vertices of each super-vertex, plus their end.
+def readCluster(clusterName):
+    clusterFile = open(clusterName, 'r')
+    lines = clusterFile.read().splitlines()
+    clusterFile.close()
+    vertices, sizes = nodeTable.parse(lines, ' ')
+    offsets = numpy.r_[0, numpy.cumsum(sizes)]
+    return lines, vertices, offsets
+
+# @desc Sums an attribute of the original nodes over each super-vertex.
+# @param {List} nodes Nodes of the original .json graph.
+# @param {String} attribute Numeric attribute of the nodes.
+# @param {float} default Value of nodes without the attribute.
+# @param {Array} vertices Grouped vertices, as returned by readCluster.
+# @param {Array} offsets Offsets of the vertices of each super-vertex, as returned by readCluster.
+# @returns {List} Sum of the attribute of each super-vertex.
+def aggregate(nodes, attribute, default, vertices, offsets):
+    values = numpy.array([float(node.get(attribute, default)) for node in nodes])
+    if len(vertices) == 0:
+        return []
+    return numpy.add.reduceat(values[vertices], offsets[:-1]).tolist()
+
+if __name__ == "__main__":
+    # Instantiate argument parser
+    description = 'Program to add proper weights to original .json file graph and add them to newly coarsened graph.'
+    parser = argparse.ArgumentParser(description=description)
+    parser._action_groups.pop()
+
+    # Add argument group (required)
+    required = parser.add_argument_group('required arguments')
+    required.add_argument('-o', '--original', required=True, dest='original', action='store', type=str, default=None, help='Original .json input file name.');
+    required.add_argument('-c', '--coarsened', required=True, dest='coarsened', action='store', type=str, default=None, help='.json coarsened file name.');
+    required.add_argument('-g', '--cluster', required=True, dest='cluster', action='store', type=str, default=None, help='.cluster file name containing newly grouped vertices.');
+    # Add argument group (optional)
+    optional = parser.add_argument_group('optional arguments')
+    optional.add_argument('-a', '--attributes', dest='attributes', action='store', type=str, nargs='+', default=[], help='Numeric node attributes also summed over each super-vertex, 0 for nodes without them.');
+    optional.add_argument('-t', '--table', dest='table', action='store_true', default=False, help='Write the original nodes once per dataset, in a table read by nodeTable.py and shared by its coarsened graphs, and store in each super-vertex the "members" ranges of its rows instead of copies of its nodes in "vertexes".');
+
+    # Add arguments to parser
+    parser._action_groups.append(required)
+    parser._action_groups.append(optional)
+
+    # Run the parser
+    options = parser.parse_args()
+
+    # Step 1 - Read clustered vertices into arrays #
+    try:
+        lines, vertices, offsets = readCluster(options.cluster)
+    except ValueError as error:
+        print str(error) + " Program exiting with -1"
+        sys.exit(-1)
+
+    # Step 2 - Save .json file in memory #
+    originalJson = open(options.original, 'r')
+    jason = json.load(originalJson)
+    originalJson.close()
+    if len(vertices) > 0 and (vertices.min() < 0 or vertices.max() >= len(jason['nodes'])):
+        print "Clustered vertices out of the original graph. Program exiting with -1"
+        sys.exit(-1)
+
+    # Step 3 - Sum weights, 1.0 for nodes without weight, and attributes of the clustered vertices #
+    weights = aggregate(jason['nodes'], 'weight', 1.0, vertices, offsets)
+    attributes = [(attribute, aggregate(jason['nodes'], attribute, 0.0, vertices, offsets)) for attribute in options.attributes]
+
+    # Step 4 - Create nodes, with the clustered vertices or, with a table shared by the levels of the dataset, the ranges of their rows #
+    if(options.table):
+        tableName = options.original.split(".")[0] + "Nodes"
+        rank = nodeTable.share(jason['nodes'], vertices, tableName, options.original)
+        members = nodeTable.ranges(rank, lines, ' ')
+    else:
+        originalNodes = [jason['nodes'][vertex] for vertex in vertices.tolist()]
+        members = [originalNodes[offsets[i]:offsets[i + 1]] for i in range(len(lines))]
+    first = vertices[offsets[:-1]].tolist()
+    nodes = []
+    for i in range(len(lines)): # "i" corresponds to clustered vertice
+        node = {'id': str(first[i]), 'weight': str(weights[i])}
+        for attribute, values in attributes:
+            node[attribute] = str(values[i])
+        node['members' if options.table else 'vertexes'] = members[i]
+        nodes.append(node)
+    del jason
+
+    # Step 5 - Load coarsened .json file in memory and write it with new nodes #
+    coarsenedJson = open(options.coarsened, 'r')
+    coarsenedJason = json.load(coarsenedJson)
+    coarsenedJson.close()
+    coarsenedJason['nodes'] = nodes
+    if(options.table):
+        coarsenedJason['graphInfo'][0]['nodeTable'] = os.path.basename(tableName)
+    nodeTable.writeGraph(coarsenedJason, options.coarsened.split(".")[0] + "Weighted.json", options.table)
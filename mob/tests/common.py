@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Shared fixtures of the regression tests: small random bipartite graphs
+written as ncol files in a temporary directory.
+"""
+
+import os
+import sys
+import random
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+class TemporaryTestCase(unittest.TestCase):
+	""" Test case with a temporary directory, removed after each test. """
+
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+
+	def tearDown(self):
+		shutil.rmtree(self.directory)
+
+	def path(self, name):
+		return os.path.join(self.directory, name)
+
+	def write(self, name, text):
+		with open(self.path(name), 'w') as f:
+			f.write(text)
+		return self.path(name)
+
+def random_edges(n0, n1, degree, seed, weighted=True):
+	"""
+	Edges of a random bipartite graph, each vertex of the first layer
+	linked to degree vertices of the second, as (u, v, weight) with global
+	ids and weights of three decimals.
+	"""
+
+	rng = random.Random(seed)
+	edges = []
+	for u in range(n0):
+		for v in rng.sample(range(n1), degree):
+			edges.append((u, n0 + v, round(rng.uniform(0.1, 2.0), 3) if weighted else 1))
+	return edges
+
+def ncol(edges):
+	""" Text of an ncol file with the given edges. """
+
+	return ''.join('%d %d %s\n' % (u, v, weight) for u, v, weight in edges)
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Regression tests of the vectorized contractions, MGraph.contract_sparse and
+BGraph.contract, against the original MGraph.contract.
+"""
+
+import random
+import unittest
+
+from common import TemporaryTestCase, random_edges, ncol
+
+import models.helperigraph as helperigraph
+
+from models.bigraph import BGraph
+
+def random_matching(graph, seed):
+	""" Matching of random pairs and triples of vertices of the same layer. """
+
+	rng = random.Random(seed)
+	matching = range(graph.vcount())
+	start = 0
+	for size in graph['vertices']:
+		vertices = range(start, start + size)
+		rng.shuffle(vertices)
+		for group in [vertices[i:i + rng.choice([1, 2, 3])] for i in range(0, size, 3)]:
+			for vertex in group:
+				matching[vertex] = group[0]
+		start += size
+	return matching
+
+def summary(graph):
+	""" Vertices, vertex weights, edges with weights and sources of a level. """
+
+	if isinstance(graph, BGraph):
+		graph = graph.to_mgraph()
+	edges = dict((edge.tuple, round(edge['weight'], 4)) for edge in graph.es())
+	return graph['vertices'], list(graph.vs['type']), list(graph.vs['weight']), edges, graph['lineage'].to_strings(',')
+
+class ContractionTest(TemporaryTestCase):
+
+	def setUp(self):
+		TemporaryTestCase.setUp(self)
+		self.filename = self.write('graph.ncol', ncol(random_edges(30, 20, 4, seed=21)))
+
+	def load(self):
+		return helperigraph.load(self.filename, [30, 20])
+
+	def test_contract_sparse(self):
+		for seed in range(3):
+			graph, other = self.load(), self.load()
+			matching = random_matching(graph, seed)
+			coarse = graph.contract(matching)
+			sparse = other.contract_sparse(matching)
+			self.assertEqual(summary(coarse), summary(sparse))
+			self.assertEqual(graph.vs['successor'], other.vs['successor'])
+
+	def test_compact(self):
+		for seed in range(3):
+			graph = self.load()
+			compact = BGraph.from_mgraph(graph)
+			matching = random_matching(graph, seed)
+			self.assertEqual(summary(graph.contract(matching)), summary(compact.contract(matching)))
+			self.assertEqual(graph.vs['successor'], compact.successor.tolist())
+
+	def test_two_levels(self):
+		graph, other = self.load(), self.load()
+		compact = BGraph.from_mgraph(other)
+		for seed in range(2):
+			matching = random_matching(graph, seed)
+			graph, compact = graph.contract(matching), compact.contract(matching)
+		self.assertEqual(summary(graph), summary(compact))
+
+if __name__ == '__main__':
+	unittest.main()
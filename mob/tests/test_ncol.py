@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Regression tests of the chunked ncol reader, models.helperigraph.read_ncol,
+against a dense biadjacency built edge by edge.
+"""
+
+import numpy
+import unittest
+
+from common import TemporaryTestCase, random_edges, ncol
+
+import models.helperigraph as helperigraph
+
+def dense(edges, n0, n1, combine='last'):
+	""" Biadjacency of edges given with global ids, merged by combine. """
+
+	matrix = numpy.zeros((n0, n1))
+	seen = numpy.zeros((n0, n1), dtype=bool)
+	for u, v, weight in edges:
+		row, col = min(u, v), max(u, v) - n0
+		if seen[row, col] and combine == 'sum':
+			matrix[row, col] += weight
+		elif seen[row, col] and combine == 'max':
+			matrix[row, col] = max(matrix[row, col], weight)
+		else:
+			matrix[row, col] = weight
+		seen[row, col] = True
+	return matrix
+
+class ReadNcolTest(TemporaryTestCase):
+
+	def check(self, text, edges, n0, n1, combine='last', chunk_size=64):
+		filename = self.write('graph.ncol', text)
+		biadjacency = helperigraph.read_ncol(filename, [n0, n1], chunk_size, combine)
+		numpy.testing.assert_allclose(biadjacency.toarray(), dense(edges, n0, n1, combine), rtol=1e-6)
+		return biadjacency
+
+	def test_weighted(self):
+		edges = random_edges(30, 20, 4, seed=1)
+		biadjacency = self.check(ncol(edges), edges, 30, 20)
+		self.assertEqual(biadjacency.dtype, helperigraph.WEIGHT)
+
+	def test_unweighted(self):
+		edges = random_edges(30, 20, 4, seed=2, weighted=False)
+		text = ''.join('%d %d\n' % (u, v) for u, v, weight in edges)
+		self.check(text, edges, 30, 20)
+
+	def test_reversed_edges(self):
+		edges = [(v, u, weight) for u, v, weight in random_edges(10, 10, 3, seed=3)]
+		self.check(ncol(edges), edges, 10, 10)
+
+	def test_combine(self):
+		edges = random_edges(10, 8, 3, seed=4)
+		edges = edges + [(u, v, weight * 2) for u, v, weight in edges[::2]] + edges[1::3]
+		for combine in ['sum', 'max', 'last']:
+			self.check(ncol(edges), edges, 10, 8, combine)
+
+	def test_comments_and_blank_lines(self):
+		edges = random_edges(10, 8, 3, seed=5)
+		text = '# header\n\n' + ncol(edges[:10]) + '   \n# middle\n' + ncol(edges[10:])
+		self.check(text, edges, 10, 8)
+
+	def test_trailing_blank_line_and_comment(self):
+		edges = random_edges(10, 8, 3, seed=8)
+		for tail in ['\n   ', '\n\t', '\n  # end']:
+			self.check(ncol(edges).rstrip('\n') + tail, edges, 10, 8)
+		# Chunks smaller than a line leave blank blocks
+		self.check(ncol(edges) + '  \t  ', edges, 10, 8, chunk_size=0.00001)
+
+	def test_small_chunks(self):
+		edges = random_edges(40, 30, 5, seed=6)
+		# Chunks of about 100 bytes, cut inside lines
+		self.check(ncol(edges), edges, 40, 30, chunk_size=0.0001)
+
+	def test_cache(self):
+		edges = random_edges(30, 20, 4, seed=7)
+		filename = self.write('graph.ncol', ncol(edges))
+		written = helperigraph.read_ncol(filename, [30, 20], cache=True)
+		mapped = helperigraph.read_ncol(filename, [30, 20], cache=True)
+		self.assertEqual((written != mapped).nnz, 0)
+		numpy.testing.assert_allclose(mapped.toarray(), dense(edges, 30, 20), rtol=1e-6)
+
+	def test_malformed(self):
+		filename = self.write('graph.ncol', '0 10 1\n1 11\n')
+		self.assertRaises(ValueError, helperigraph.read_ncol, filename, [10, 10])
+
+if __name__ == '__main__':
+	unittest.main()
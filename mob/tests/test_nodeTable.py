@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Regression tests of the node-attribute table of nodeTable.py: rows of the
+ranges of each super-vertex read back its nodes.
+"""
+
+import os
+import json
+import time
+import random
+import unittest
+
+from common import TemporaryTestCase
+
+import nodeTable
+
+class NodeTableTest(TemporaryTestCase):
+
+	def setUp(self):
+		TemporaryTestCase.setUp(self)
+		self.nodes = [{'id': str(i), 'label': u'n"\\%d\xe9' % i} for i in range(40)]
+		rng = random.Random(31)
+		ids = range(40)
+		rng.shuffle(ids)
+		# Super-vertices of one to four nodes, separated by commas as "source"
+		self.groups = []
+		while ids:
+			size = rng.randint(1, 4)
+			self.groups.append(ids[:size])
+			ids = ids[size:]
+		self.sources = [','.join(map(str, group)) for group in self.groups]
+
+	def check(self, table, rank, sources, sep):
+		members = nodeTable.ranges(rank, sources, sep)
+		for group, ranges in zip(self.groups, members):
+			nodes = nodeTable.rows(table, ranges)
+			self.assertEqual(sorted(nodes, key=lambda node: int(node['id'])), [self.nodes[i] for i in sorted(group)])
+		return members
+
+	def test_round_trip(self):
+		table = self.path('table')
+		order, sizes = nodeTable.parse(self.sources)
+		rank = nodeTable.write(self.nodes, order, table)
+		members = self.check(table, rank, self.sources, ',')
+		# Written in the order of the super-vertices, each one is a single range
+		self.assertTrue(all(len(ranges) == 1 for ranges in members))
+
+	def test_other_order(self):
+		table = self.path('table')
+		rank = nodeTable.write(self.nodes, range(39, -1, -1), table)
+		self.check(table, rank, [source.replace(',', ' ') for source in self.sources], ' ')
+
+	def test_missing_and_repeated(self):
+		table = self.path('table')
+		rank = nodeTable.write(self.nodes, [3, 3, 1, 99, -1], table)
+		self.assertEqual(sorted(rank.tolist()), range(40))
+		self.assertEqual(rank[3], 0)
+		self.assertEqual(rank[1], 1)
+
+	def test_share(self):
+		table = self.path('table')
+		original = self.write('original.json', '{}')
+		os.utime(original, (time.time() - 10, time.time() - 10))
+		order, sizes = nodeTable.parse(self.sources)
+		rank = nodeTable.share(self.nodes, order, table, original)
+		written = os.path.getmtime(table + '.rank')
+		# Reused, not written again in the other order
+		shared = nodeTable.share(self.nodes, range(40), table, original)
+		self.assertEqual(shared.tolist(), rank.tolist())
+		self.assertEqual(os.path.getmtime(table + '.rank'), written)
+		# Written again for another number of nodes
+		self.assertEqual(len(nodeTable.share(self.nodes[:10], range(10), table, original)), 10)
+
+	def test_write_graph(self):
+		graph = {'graphInfo': [{'vertices': '3 2'}], 'nodes': self.nodes[:5], 'links': [{'source': '0', 'target': '3'}]}
+		for table in [False, True]:
+			filename = self.path('graph.json')
+			nodeTable.writeGraph(graph, filename, table)
+			with open(filename) as f:
+				text = f.read()
+			self.assertEqual(json.loads(text), graph)
+			# Only graphs without a table are indented
+			self.assertEqual('\n    ' in text, not table)
+
+	def test_malformed(self):
+		self.assertRaises(ValueError, nodeTable.parse, ['1,2', '3,,4'])
+		table = self.path('table')
+		nodeTable.write(self.nodes, [], table)
+		self.assertRaises(ValueError, nodeTable.rows, table, [[30, 41]])
+
+if __name__ == '__main__':
+	unittest.main()
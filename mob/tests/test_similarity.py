@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Regression tests of the batch similarities, models.similarity.SimilarityMatrix,
+against the pairwise measures of models.similarity.Similarity, and of the
+similarity cache, models.cache.SimilarityCache.
+"""
+
+import unittest
+
+from common import TemporaryTestCase, random_edges, ncol
+
+import models.helperigraph as helperigraph
+
+from models.cache import SimilarityCache
+from models.twohop import TwoHopIndex
+from models.similarity import Similarity, SimilarityMatrix
+
+class SimilarityMatrixTest(TemporaryTestCase):
+
+	def setUp(self):
+		TemporaryTestCase.setUp(self)
+		filename = self.write('graph.ncol', ncol(random_edges(25, 15, 3, seed=11)))
+		self.graph = helperigraph.load(filename, [25, 15])
+		self.index = TwoHopIndex(self.graph.biadjacency())
+
+	def test_measures(self):
+		pairwise = Similarity(self.graph, self.graph['adjlist'])
+		for measure in SimilarityMatrix.measures:
+			batch = SimilarityMatrix(self.index, measure)
+			for u in range(self.graph.vcount()):
+				for v in self.index.twohops(u):
+					self.assertAlmostEqual(batch(u, v), getattr(pairwise, measure)(u, v), places=6, msg='%s of (%d, %d)' % (measure, u, v))
+
+	def test_row(self):
+		batch = SimilarityMatrix(self.index, 'jaccard')
+		for u in [0, 24, 25, 39]:
+			twohops, scores = batch.row(u)
+			self.assertEqual(twohops.tolist(), self.index.twohops(u))
+			self.assertEqual(scores.tolist(), [batch(u, v) for v in twohops])
+
+	def test_not_twohops(self):
+		batch = SimilarityMatrix(self.index, 'common_neighbors')
+		# Vertices of different layers are never two-hopes neighbors
+		self.assertEqual(batch(0, 30), 0.0)
+
+class SimilarityCacheTest(unittest.TestCase):
+
+	def setUp(self):
+		self.calls = []
+
+	def score(self, u, v):
+		self.calls.append((u, v))
+		return float(u * 100 + v)
+
+	def test_values(self):
+		for policy in ['lru', 'clock']:
+			cache = SimilarityCache(self.score, 10, 1.0, policy)
+			self.assertEqual(cache(2, 3), 203.0)
+			# Pairs are unordered, the score is computed in the first order asked
+			self.assertEqual(cache(3, 2), 203.0)
+			cache.publish()
+			self.assertEqual(cache.stats(), dict(hits=1, misses=1, evictions=0))
+
+	def test_lru_eviction(self):
+		cache = SimilarityCache(self.score, 10, 1.0, 'lru')
+		cache.capacity = 2
+		cache(0, 1)
+		cache(0, 2)
+		cache(0, 1)
+		# (0, 2) is the least recently used
+		cache(0, 3)
+		del self.calls[:]
+		cache(0, 1)
+		cache(0, 2)
+		self.assertEqual(self.calls, [(0, 2)])
+		self.assertEqual(cache.evictions, 2)
+
+	def test_clock_eviction(self):
+		cache = SimilarityCache(self.score, 10, 1.0, 'clock')
+		cache.capacity = 2
+		cache(0, 1)
+		cache(0, 2)
+		cache(0, 1)
+		# (0, 1) was referenced, so it gets a second chance and (0, 2) is evicted
+		cache(0, 3)
+		del self.calls[:]
+		cache(0, 1)
+		cache(0, 2)
+		self.assertEqual(self.calls, [(0, 2)])
+		self.assertEqual(len(cache.keys), 2)
+
+	def test_policy(self):
+		self.assertRaises(ValueError, SimilarityCache, self.score, 10, 1.0, 'fifo')
+
+if __name__ == '__main__':
+	unittest.main()
@@ -32,7 +32,6 @@ Required:
 
 import sys
 import os
-import sharedmem
 import argparse
 import igraph
 import logging
@@ -67,6 +67,71 @@ function addMinAndMaxNode(data)
   return JSON.stringify(jason);
 }
 
+/**
+ * @desc Read rows of a node-attribute table written by nodeTable.py, one read per range, without loading the table.
+ * @param {string} table Table file name, without extension.
+ * @param {Array} ranges [start, end] pairs of rows.
+ * @returns {Array} Nodes of the rows, in order.
+ */
+function readTableRows(table, ranges)
+{
+  var index = indexController.fs.readFileSync(table + '.idx');
+  /** Offsets are little-endian int64 */
+  var offset = function(row) {
+    return index.readUInt32LE(row * 8) + index.readUInt32LE(row * 8 + 4) * 4294967296;
+  };
+  var nodes = [];
+  var fd = indexController.fs.openSync(table + '.jsonl', 'r');
+  try
+  {
+    for(var i = 0; i < ranges.length; i++)
+    {
+      var start = ranges[i][0], end = ranges[i][1];
+      if(start < 0 || start > end || (end + 1) * 8 > index.length)
+      {
+        throw new Error('Rows ' + start + '-' + end + ' are out of the table.');
+      }
+      var buffer = Buffer.alloc(offset(end) - offset(start));
+      indexController.fs.readSync(fd, buffer, 0, buffer.length, offset(start));
+      var lines = buffer.toString('utf8').split('\n');
+      for(var j = 0; j < lines.length; j++)
+      {
+        if(lines[j].length > 0) nodes.push(JSON.parse(lines[j]));
+      }
+    }
+  }
+  finally
+  {
+    indexController.fs.closeSync(fd);
+  }
+  return nodes;
+}
+
+/**
+ * @desc Add "vertexes" to nodes of a graph written with a node-attribute table, i.e., with "nodeTable" in graph info and "members" ranges of table rows in its nodes, so they are read as graphs with copies of their nodes.
+ * @param {string} data .json string containing graph data.
+ * @param {string} path Path of the .json file; the table lies in the same folder.
+ * @returns {string} data .json string containing graph data.
+ */
+function addVertexes(data, path)
+{
+  var jason = JSON.parse(data);
+  if(jason.graphInfo[0].nodeTable == undefined)
+  {
+    return data;
+  }
+  var table = indexController.path.join(indexController.path.dirname(path), jason.graphInfo[0].nodeTable);
+  for(var i = 0; i < jason.nodes.length; i++)
+  {
+    if(jason.nodes[i].members != undefined)
+    {
+      jason.nodes[i].vertexes = readTableRows(table, jason.nodes[i].members);
+      delete jason.nodes[i].members;
+    }
+  }
+  return JSON.stringify(jason);
+}
+
 /**
 * Read .json file stored on server-side, sending it to client side.
 * @public
@@ -88,6 +153,15 @@ exports.readJsonFile = function(path, fs, req, res)
     }
     else
     {
+      /* Read nodes of super-vertices stored in a node-attribute table */
+      try
+      {
+        data = addVertexes(data, path);
+      }
+      catch(err)
+      {
+        return console.log(err);
+      }
       /* Store graph size */
       if(indexController.graphSize.length == 0) JSON.parse(data).graphInfo[0].vlayer != undefined ? indexController.graphSize = JSON.parse(data).graphInfo[0].vlayer : indexController.graphSize = JSON.parse(data).graphInfo[0].vertices;
       /* Send data to client */
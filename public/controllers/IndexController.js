@@ -18,6 +18,9 @@ function addFolderPath()
 exports.path = require('path');
 exports.fs = require('fs');
 exports.nodeCmd = require('node-cmd');
+exports.http = require('http');
+/** Resident coarsening service (mob/service.py), on a Unix socket if MOB_SERVICE_SOCKET is set, on a localhost port otherwise */
+exports.service = process.env.MOB_SERVICE_SOCKET ? { socketPath: process.env.MOB_SERVICE_SOCKET } : { host: '127.0.0.1', port: process.env.MOB_SERVICE_PORT || 8500 };
 exports.fileName = "";
 exports.graphSize = [];
 exports.pyName = "";
@@ -13,6 +13,79 @@ var graphController = require('./GraphController');
 
 /** Logic callback functions */
 
+/**
+ * Send an operation to the resident coarsening service (mob/service.py), as a json POST request.
+ * @public
+ * @param {string} operation Service operation, e.g. 'coarsen' or 'convert'.
+ * @param {Object} body Operation parameters.
+ * @param {Function} callback Called with an error, if the service is not running or the operation failed, and the service response.
+ */
+function requestService(operation, body, callback)
+{
+  var data = JSON.stringify(body);
+  var options = Object.assign({ method: 'POST', path: '/' + operation, headers: { 'Content-Type': 'application/json', 'Content-Length': Buffer.byteLength(data) } }, indexController.service);
+  var request = indexController.http.request(options, function(response) {
+    var chunks = [];
+    response.on('data', function(chunk) { chunks.push(chunk); });
+    response.on('end', function() {
+      var result = {};
+      try
+      {
+        result = JSON.parse(Buffer.concat(chunks).toString());
+      }
+      catch(err)
+      {
+        return callback(err, result);
+      }
+      callback(response.statusCode == 200 ? null : new Error(result.error), result);
+    });
+  });
+  request.on('error', function(err) { callback(err, {}); });
+  request.end(data);
+}
+
+/**
+ * Run an operation in the resident coarsening service, or, if it is not running or the operation fails, run the equivalent python command.
+ * @public
+ * @param {string} operation Service operation, e.g. 'coarsen' or 'convert'.
+ * @param {Object} body Operation parameters.
+ * @param {string} command Equivalent python command.
+ * @param {Function} callback Called with an error, if both failed, as node-cmd callbacks.
+ */
+function runPython(operation, body, command, callback)
+{
+  requestService(operation, body, function(err, result) {
+    if(!err)
+    {
+      callback(null);
+    }
+    else
+    {
+      /** Service not running (or the operation failed); start a python process instead */
+      if(err.code !== 'ECONNREFUSED' && err.code !== 'ENOENT') console.log("python service error: " + err.message);
+      console.log(command);
+      indexController.nodeCmd.get(command, function(data, err, stderr) {
+        callback(err);
+      });
+    }
+  });
+}
+
+/**
+ * Absolute paths of the files of a coarsening configuration, so the service does not depend on its working directory.
+ * @public
+ * @param {Object} jsonInput Coarsening configuration, as in a -cnf file.
+ * @returns {Object} Copy of the configuration with absolute paths.
+ */
+function serviceOptions(jsonInput)
+{
+  var options = Object.assign({}, jsonInput);
+  ['input', 'directory', 'attr'].forEach(function(key) {
+    if(options[key] !== undefined) options[key] = indexController.path.resolve(options[key]);
+  });
+  return options;
+}
+
 /**
  * Create .ncol file and perform coarsening.
  * @public
@@ -25,8 +98,8 @@ var graphController = require('./GraphController');
 function ncolAndCoarse(pyPath, pyProg, fs, req, res)
 {
   /** Convert to .ncol format */
-  console.log('python ' + pyPath + 'jsonToNcol3.py --input uploads' + indexController.folderChar + indexController.fileName.split(".")[0] + indexController.folderChar + indexController.fileName.split(".")[0] + '.json --output uploads' + indexController.folderChar + indexController.fileName.split(".")[0] + indexController.folderChar + indexController.fileName.split(".")[0] + '.ncol');
-  indexController.nodeCmd.get('python ' + pyPath + 'jsonToNcol3.py --input uploads' + indexController.folderChar + indexController.fileName.split(".")[0] + indexController.folderChar + indexController.fileName.split(".")[0] + '.json --output uploads' + indexController.folderChar + indexController.fileName.split(".")[0] + indexController.folderChar + indexController.fileName.split(".")[0] + '.ncol', function(data, err, stderr) {
+  console.log('python ' + pyPath + 'jsonToNcol4.py --binary_cache --input uploads' + indexController.folderChar + indexController.fileName.split(".")[0] + indexController.folderChar + indexController.fileName.split(".")[0] + '.json --output uploads' + indexController.folderChar + indexController.fileName.split(".")[0] + indexController.folderChar + indexController.fileName.split(".")[0] + '.ncol');
+  indexController.nodeCmd.get('python ' + pyPath + 'jsonToNcol4.py --binary_cache --input uploads' + indexController.folderChar + indexController.fileName.split(".")[0] + indexController.folderChar + indexController.fileName.split(".")[0] + '.json --output uploads' + indexController.folderChar + indexController.fileName.split(".")[0] + indexController.folderChar + indexController.fileName.split(".")[0] + '.ncol', function(data, err, stderr) {
     if(!err)
     {
       req.body.jsonInput.attr = 'uploads/' + req.body.jsonInput.filename.split(".")[0].split("/")[req.body.jsonInput.filename.split(".")[0].split("/").length-1] + '/' + req.body.jsonInput.filename.split(".")[0] + ".json";
@@ -34,6 +107,8 @@ function ncolAndCoarse(pyPath, pyProg, fs, req, res)
       req.body.jsonInput.directory = 'uploads/' + req.body.jsonInput.filename.split(".")[0].split("/")[req.body.jsonInput.filename.split(".")[0].split("/").length-1];
       req.body.jsonInput.output = req.body.jsonInput.filename.split(".")[0].split("/")[req.body.jsonInput.filename.split(".")[0].split("/").length-1] + 'Coarsened';
       req.body.jsonInput.save_conf = true;
+      /** Reuse the binary cache of the .ncol while its content does not change */
+      req.body.jsonInput.binary_cache = true;
       if(req.body.jsonInput.filename.split("/").length <= 1) req.body.jsonInput.filename = 'uploads/' + req.body.jsonInput.filename.split(".")[0].split("/")[req.body.jsonInput.filename.split(".")[0].split("/").length-1] + '/' + req.body.jsonInput.filename;
       req.body.jsonInput.input = req.body.jsonInput.filename;
       /** Save JSON input information in a file - from https://stackoverflow.com/questions/34156282/how-do-i-save-json-to-local-text-file */
@@ -44,9 +119,8 @@ function ncolAndCoarse(pyPath, pyProg, fs, req, res)
         }
         else
         {
-          /** Execute coarsening with a given reduction factor */
-          console.log('python ' + pyPath + pyProg + " -cnf input.json");
-          indexController.nodeCmd.get('python ' + pyPath + pyProg + " -cnf input.json", function(data, err, stderr) {
+          /** Execute coarsening with a given reduction factor, in the coarsening service if it is running */
+          runPython('coarsen', serviceOptions(req.body.jsonInput), 'python ' + pyPath + pyProg + " -cnf input.json", function(err) {
             if (!err)
             {
               /** Coarsening was successfully executed; get number of levels from .conf file */
@@ -101,13 +175,13 @@ function ncolAndCoarse(pyPath, pyProg, fs, req, res)
 function createCoarsenedGraph(nodeCmd, folderChar, pyName, pyCoarsening, fs, req, res)
 {
   /* Convert .json file to .ncol */
-  nodeCmd.get('python mob' + folderChar + 'jsonToNcol3.py --input uploads' + folderChar + indexController.fileName.split(".")[0] + folderChar + indexController.fileName.split(".")[0] + '.json --output uploads' + folderChar + indexController.fileName.split(".")[0] + folderChar + indexController.fileName.split(".")[0] + '.ncol', function(data, err, stderr) {
+  nodeCmd.get('python mob' + folderChar + 'jsonToNcol4.py --binary_cache --input uploads' + folderChar + indexController.fileName.split(".")[0] + folderChar + indexController.fileName.split(".")[0] + '.json --output uploads' + folderChar + indexController.fileName.split(".")[0] + folderChar + indexController.fileName.split(".")[0] + '.ncol', function(data, err, stderr) {
     if(!err)
     {
       /* Build python parameters string */
       var pyPath = "mob" + folderChar;
       var pyProg = "coarsening.py";
-      var pyParams = "-f uploads" + folderChar + indexController.fileName.split(".")[0] + folderChar + indexController.fileName.split(".")[0] + ".ncol -d uploads" + folderChar + indexController.fileName.split(".")[0] + folderChar + " -o " + pyName + " -v " + parseInt(indexController.graphSize.split(" ")[0]) + " " + parseInt(indexController.graphSize.split(" ")[1]) + " " + pyCoarsening + " --save_gml";
+      var pyParams = "-f uploads" + folderChar + indexController.fileName.split(".")[0] + folderChar + indexController.fileName.split(".")[0] + ".ncol -d uploads" + folderChar + indexController.fileName.split(".")[0] + folderChar + " -o " + pyName + " -v " + parseInt(indexController.graphSize.split(" ")[0]) + " " + parseInt(indexController.graphSize.split(" ")[1]) + " " + pyCoarsening + " --save_gml -bc";
       if(req.body.coarsening == 0 || req.body.coarseningSecondSet == 0)
       {
         req.body.firstSet == 1 ? pyParams = pyParams + " -m " + req.body.nLevels + " 0 " : pyParams = pyParams + " -m 0 " + req.body.nLevels;
@@ -199,7 +273,7 @@ exports.upload = function(req, res) {
         if(file.name.split(".")[1] === "gml")
         {
           /** Convert to .json and move it to upload folder with same name */
-          indexController.nodeCmd.get('python mob' + indexController.folderChar + 'gmlToJson3.py uploads' + indexController.folderChar + file.name + ' uploads' + indexController.folderChar + file.name.split(".")[0] + indexController.folderChar + file.name.split(".")[0] + '.json', function(data, err, stderr) {
+          runPython('convert', { input: indexController.path.resolve('uploads', file.name), output: indexController.path.resolve('uploads', file.name.split(".")[0], file.name.split(".")[0] + '.json') }, 'python mob' + indexController.folderChar + 'gmlToJson4.py uploads' + indexController.folderChar + file.name + ' uploads' + indexController.folderChar + file.name.split(".")[0] + indexController.folderChar + file.name.split(".")[0] + '.json', function(err) {
                             if (!err)
                             {
                               /** Python script executed successfully; read .json file */
@@ -270,7 +344,7 @@ exports.coarse = function(req, res) {
         if(file.name.split(".")[1] === "gml")
         {
           /** Convert to .json and move it to upload folder with same name */
-          indexController.nodeCmd.get('python mob' + indexController.folderChar + 'gmlToJson3.py uploads' + indexController.folderChar + file.name + ' uploads' + indexController.folderChar + file.name.split(".")[0] + indexController.folderChar + file.name.split(".")[0] + '.json', function(data, err, stderr) {
+          runPython('convert', { input: indexController.path.resolve('uploads', file.name), output: indexController.path.resolve('uploads', file.name.split(".")[0], file.name.split(".")[0] + '.json') }, 'python mob' + indexController.folderChar + 'gmlToJson4.py uploads' + indexController.folderChar + file.name + ' uploads' + indexController.folderChar + file.name.split(".")[0] + indexController.folderChar + file.name.split(".")[0] + '.json', function(err) {
                             if (!err)
                             {
                                 ncolAndCoarse(pyPath, pyProg, indexController.fs, req, res);
@@ -343,10 +417,11 @@ exports.convert = function(req, res){
   pyName = indexController.fileName.split(".")[0] + "Coarsened" + "l" + req.body.coarsening.split(".").join("") + "r" + req.body.coarseningSecondSet.split(".").join("");
   let hierarchicalPyName = pyName + "nl" + req.body.firstSetLevel + "nr" + req.body.secondSetLevel;
   /** Execute .gml to .json conversion */
-  indexController.nodeCmd.get('python ' + pyPath + 'gmlToJson3.py uploads' + indexController.folderChar + indexController.fileName.split(".")[0] + indexController.folderChar + hierarchicalPyName + '.gml uploads' + indexController.folderChar + indexController.fileName.split(".")[0] + indexController.folderChar + hierarchicalPyName + ".json", function(data, err, stderr) {
+  var gmlFile = 'uploads' + indexController.folderChar + indexController.fileName.split(".")[0] + indexController.folderChar + hierarchicalPyName + '.gml';
+  var jsonFile = 'uploads' + indexController.folderChar + indexController.fileName.split(".")[0] + indexController.folderChar + hierarchicalPyName + ".json";
+  runPython('convert', { input: indexController.path.resolve(gmlFile), output: indexController.path.resolve(jsonFile) }, 'python ' + pyPath + 'gmlToJson4.py ' + gmlFile + ' ' + jsonFile, function(err) {
     if(!err)
     {
-      console.log('python ' + pyPath + 'gmlToJson3.py uploads' + indexController.folderChar + indexController.fileName.split(".")[0] + indexController.folderChar + hierarchicalPyName + '.gml uploads' + indexController.folderChar + indexController.fileName.split(".")[0] + indexController.folderChar + hierarchicalPyName + ".json");
       /** Finished conversion, return to client-side */
       res.type('text');
       res.end();